@@ -0,0 +1,108 @@
+# bench/audio_handoff.py
+"""AudioCapture.frames() blok teslim gecikmesi ve CPU: executor vs async.
+
+Çalıştır:  python -m bench.audio_handoff --seconds 10 --load 16
+Cihaz açılmaz; sahte bir PortAudio thread'i ``_callback``'i gerçek zamanlı çağırır.
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from src.audio.capture import AudioCapture, CaptureConfig
+
+
+def _producer(cap: AudioCapture, n_blocks: int, stamps: list, done: threading.Event):
+    fpb = cap.cfg._frames_per_block
+    block_s = cap.cfg.block_ms / 1000.0
+    block = np.zeros((fpb, cap.cfg.channels), dtype=np.int16)
+    next_t = time.perf_counter()
+    for seq in range(n_blocks):
+        # sıra numarasını ilk iki örneğe göm
+        block[0, :] = seq & 0x7FFF
+        block[1, :] = seq >> 15
+        stamps[seq] = time.perf_counter()
+        cap._callback(block, fpb, None, None)
+        next_t += block_s
+        delay = next_t - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    done.set()
+    # tüketici son bloğu kaçırdıysa frames() döngüsünü bitir
+    time.sleep(1.0)
+    cap._running = False
+
+
+async def _executor_load(n: int, stop: asyncio.Event):
+    # LLM/whisper benzeri bloklayan iş: default executor'ı meşgul et
+    loop = asyncio.get_running_loop()
+
+    async def one():
+        while not stop.is_set():
+            await loop.run_in_executor(None, time.sleep, 0.05)
+
+    await asyncio.gather(*(one() for _ in range(n)))
+
+
+async def run_mode(mode: str, seconds: float, load: int) -> dict:
+    cfg = CaptureConfig(block_ms=40, device_rate="off")
+    cap = AudioCapture(cfg)
+    cap.delivery = mode
+    cap._running = True
+    cap._last_put = time.monotonic()
+
+    n_blocks = int(seconds * 1000 / cfg.block_ms)
+    stamps = [0.0] * n_blocks
+    lat = []
+    done = threading.Event()
+    stop = asyncio.Event()
+    loader = asyncio.create_task(_executor_load(load, stop)) if load else None
+
+    prod = threading.Thread(target=_producer, args=(cap, n_blocks, stamps, done), daemon=True)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    prod.start()
+    async for view in cap.frames():
+        now = time.perf_counter()
+        head = np.frombuffer(view, dtype=np.int16, count=2)
+        seq = int(head[0]) | (int(head[1]) << 15)
+        lat.append((now - stamps[seq]) * 1000.0)
+        if seq >= n_blocks - 1 or (done.is_set() and cap._ring.backlog() == 0):
+            break
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    cap._running = False
+    stop.set()
+    if loader:
+        await loader
+
+    arr = np.asarray(lat)
+    st = cap.stats()
+    return {
+        "mode": mode,
+        "frames": len(lat),
+        "p50": float(np.percentile(arr, 50)),
+        "p95": float(np.percentile(arr, 95)),
+        "p99": float(np.percentile(arr, 99)),
+        "max": float(arr.max()),
+        "cpu_pct": 100.0 * cpu / wall,
+        "overruns": st["overruns"],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--load", type=int, default=0, help="executor'ı meşgul eden eşzamanlı iş sayısı")
+    args = ap.parse_args()
+
+    print(f"{'mode':<9} {'frames':>6} {'p50ms':>7} {'p95ms':>7} {'p99ms':>7} {'maxms':>7} "
+          f"{'cpu%':>6} {'ovr':>4}")
+    for mode in ("executor", "async"):
+        r = asyncio.run(run_mode(mode, args.seconds, args.load))
+        print(f"{r['mode']:<9} {r['frames']:>6} {r['p50']:>7.3f} {r['p95']:>7.3f} {r['p99']:>7.3f} "
+              f"{r['max']:>7.3f} {r['cpu_pct']:>6.1f} {r['overruns']:>4}")
+
+
+if __name__ == "__main__":
+    main()
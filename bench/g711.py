@@ -0,0 +1,68 @@
+# bench/g711.py
+"""pcm16 vs g711_ulaw: blok başına kodlama maliyeti ve saniye başına hat baytı.
+
+Çalıştır:  python -m bench.g711 --seconds 60
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.audio.g711 import UlawEncoder, ulaw_decode
+from src.audio.resample import PolyphaseResampler
+from src.stt.sender import append_message
+
+
+def _speechlike(n: int, sr: int, rng) -> np.ndarray:
+    t = np.arange(n) / sr
+    env = 0.5 + 0.5 * np.sin(2 * np.pi * 3.0 * t)
+    x = env * (np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 660 * t))
+    x = x * 8000 + rng.normal(0, 300, n)
+    return np.clip(x, -32768, 32767).astype(np.int16)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=60.0)
+    ap.add_argument("--rate", type=int, default=24000)
+    ap.add_argument("--block-ms", type=int, default=40)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    blk = int(args.rate * args.block_ms / 1000)
+    n_blocks = int(args.seconds * 1000 / args.block_ms)
+    audio = _speechlike(blk * n_blocks, args.rate, rng)
+    blocks = [memoryview(audio[i * blk:(i + 1) * blk]).cast("B") for i in range(n_blocks)]
+
+    t0 = time.perf_counter()
+    pcm_wire = sum(len(append_message(b)) for b in blocks)
+    t_pcm = time.perf_counter() - t0
+
+    enc = UlawEncoder(args.rate)
+    t0 = time.perf_counter()
+    ulaw_wire = 0
+    coded = []
+    for b in blocks:
+        u = enc.encode(b)
+        ulaw_wire += len(append_message(u))
+        coded.append(bytes(u))
+    t_ulaw = time.perf_counter() - t0
+
+    # kalite: 8 kHz referansa göre SNR (bant sınırlaması hariç, yalnız kuantalama)
+    ref = np.frombuffer(PolyphaseResampler(args.rate, 8000).process_pcm16(audio.tobytes()),
+                        dtype=np.int16).astype(np.float64)
+    dec = ulaw_decode(b"".join(coded)).astype(np.float64)
+    m = min(len(ref), len(dec))
+    snr = 10 * np.log10(np.sum(ref[:m] ** 2) / max(1e-9, np.sum((ref[:m] - dec[:m]) ** 2)))
+
+    us = 1e6 / n_blocks
+    print(f"{'format':<10} {'us/block':>9} {'wire B/s':>10} {'kbit/s':>8}")
+    print(f"{'pcm16':<10} {t_pcm * us:>9.1f} {pcm_wire / args.seconds:>10.0f} "
+          f"{pcm_wire * 8 / args.seconds / 1000:>8.1f}")
+    print(f"{'g711_ulaw':<10} {t_ulaw * us:>9.1f} {ulaw_wire / args.seconds:>10.0f} "
+          f"{ulaw_wire * 8 / args.seconds / 1000:>8.1f}")
+    print(f"wire ratio ulaw/pcm16 = {ulaw_wire / pcm_wire:.3f}   quantization SNR = {snr:.1f} dB")
+
+
+if __name__ == "__main__":
+    main()
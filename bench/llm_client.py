@@ -0,0 +1,140 @@
+# bench/llm_client.py
+"""short_reply taşıması: eski bloklayan http.client (çağrı başına yeni bağlantı)
+vs kalıcı havuzlu httpx istemcisi, yerel stand-in uç noktasına karşı.
+
+Çağrı başına gecikme, açılan bağlantı sayısı ve olay döngüsünün bloklandığı
+süre (10 ms'lik ticker'ın gecikmesi) raporlanır. Ardından akışlı cevap
+(stream_reply) için ilk token, ilk tam cümle (TTS başlangıcı) ve toplam süre.
+
+Çalıştır:  python -m bench.llm_client --calls 20 --latency-ms 300 --handshake-ms 80
+           python -m bench.llm_client --fail-rate 0.2       (yeniden deneme yolu)
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import re
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from bench.llm_standin import LLMStandin, add_llm_standin_args, config_from_args
+
+
+def pct(xs, p):
+    return float(np.percentile(xs, p)) if xs else float("nan")
+
+
+async def ticker(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        t = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - t - 0.01) * 1000)
+
+
+class LegacyClient:
+    """Önceki short_reply taşıması: async fonksiyon içinde bloklayan istek, her çağrıda yeni bağlantı."""
+
+    def __init__(self, base_url: str):
+        u = urlsplit(base_url)
+        self.host, self.port, self.prefix = u.hostname, u.port, u.path
+
+    async def short_reply(self, context: str, question: str, lang: str) -> str:
+        conn = http.client.HTTPConnection(self.host, self.port)
+        try:
+            conn.request("POST", self.prefix + "/chat/completions",
+                         body=json.dumps({"messages": [{"role": "user", "content": question}]}),
+                         headers={"Content-Type": "application/json"})
+            data = conn.getresponse().read().decode("utf-8")
+        finally:
+            conn.close()
+        return json.loads(data)["choices"][0]["message"]["content"]
+
+
+async def run(client, calls: int, gap: float) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    lat = []
+    for _ in range(calls):
+        t = time.perf_counter()
+        await client.short_reply("we discussed the release plan", "when can we ship this", "EN")
+        lat.append((time.perf_counter() - t) * 1000)
+        await asyncio.sleep(gap)    # sorular arası sessizlik
+    stop.set()
+    await tick
+    return {"lat": lat, "lags": lags}
+
+
+async def run_stream(client, calls: int, gap: float) -> dict:
+    ttft, sentence, total = [], [], []
+    for _ in range(calls):
+        t = time.perf_counter()
+        text, first = "", None
+        deltas = client.stream_reply("we discussed the release plan", "when can we ship this", "EN")
+        async for delta in deltas:
+            now = (time.perf_counter() - t) * 1000
+            if not text:
+                ttft.append(now)
+            text += delta
+            if first is None and re.search(r"[.!?](?=\s)", text):
+                first = now
+        total.append((time.perf_counter() - t) * 1000)
+        sentence.append(first if first is not None else total[-1])
+        await asyncio.sleep(gap)
+    return {"ttft": ttft, "sentence": sentence, "total": total}
+
+
+def report(name: str, r: dict, conns: int):
+    lat, lags = r["lat"], r["lags"]
+    blocked = sum(x for x in lags if x > 5.0)
+    print(f"{name:>8}{pct(lat, 50):>9.1f}{pct(lat, 90):>9.1f}{max(lat):>9.1f}"
+          f"{max(lags) if lags else 0:>12.1f}{blocked:>13.0f}{conns:>7}")
+
+
+async def main_async(args):
+    server = LLMStandin(config_from_args(args))
+    url = server.start_in_thread()   # bloklayan istemci döngüyü kilitlese de sunucu cevap verir
+    os.environ.setdefault("OPENAI_API_KEY", "standin")
+    from src.llm.openai_client import OpenAIClient
+
+    print(f"{'':>8}{'p50 ms':>9}{'p90 ms':>9}{'max ms':>9}{'max lag ms':>12}{'blocked ms':>13}{'conns':>7}")
+    try:
+        if not args.pooled_only:
+            before = server.connections
+            r = await run(LegacyClient(url), args.calls, args.gap)
+            report("legacy", r, server.connections - before)
+
+        client = OpenAIClient(base_url=url)
+        before = server.connections
+        t = time.perf_counter()
+        await client.warm_up()
+        warm_ms = (time.perf_counter() - t) * 1000
+        r = await run(client, args.calls, args.gap)
+        report("pooled", r, server.connections - before)
+        full = r["lat"]
+        s = await run_stream(client, args.calls, args.gap)
+        await client.aclose()
+        print(f"\n{'':>8}{'ttft ms':>10}{'1st sent ms':>13}{'total ms':>10}   (p50)")
+        print(f"{'full':>8}{pct(full, 50):>10.1f}{pct(full, 50):>13.1f}{pct(full, 50):>10.1f}")
+        print(f"{'stream':>8}{pct(s['ttft'], 50):>10.1f}{pct(s['sentence'], 50):>13.1f}"
+              f"{pct(s['total'], 50):>10.1f}")
+        print(f"pooled warm-up {warm_ms:.0f} ms (off the critical path), client={client.stats()}")
+    finally:
+        server.stop_thread()
+    print(f"server={server.stats()}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=20)
+    ap.add_argument("--gap", type=float, default=0.2, help="çağrılar arası bekleme (sn)")
+    ap.add_argument("--pooled-only", action="store_true")
+    add_llm_standin_args(ap)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# bench/llm_hedge.py
+"""Hedge'li akışlı cevap: birincil sağlayıcıda ara sıra gecikme sıçraması varken ilk-token
+kuyruğu (p90/p99) hedge'siz ve hedge'li nasıl değişiyor, kaç istek boşa gidiyor.
+
+İki yerel taklit sunucu: sıçramalı birincil ve biraz daha yavaş ama kararlı yedek
+(örn. yerel çıkarım sunucusu). İki koşu aynı tohumla, aynı sıçrama dizisini görür.
+
+Çalıştır:  python -m bench.llm_hedge --calls 60 --spike-rate 0.1 --spike-ms 2500
+"""
+import argparse
+import asyncio
+import time
+
+from bench.llm_standin import LLMStandin, LLMStandinConfig
+from src.llm.providers import ProviderConfig, pct
+
+
+async def run(args, hedge: bool) -> dict:
+    from src.llm.openai_client import OpenAIClient
+
+    primary = LLMStandin(LLMStandinConfig(latency_ms=args.latency_ms, token_ms=args.token_ms,
+                                          jitter_ms=args.jitter_ms, spike_rate=args.spike_rate,
+                                          spike_ms=args.spike_ms, seed=args.seed))
+    alternate = LLMStandin(LLMStandinConfig(latency_ms=args.alt_latency_ms, token_ms=args.token_ms,
+                                            jitter_ms=args.jitter_ms, seed=args.seed + 1))
+    client = OpenAIClient(providers=[
+        ProviderConfig("primary", await primary.start(), "standin", "x"),
+        ProviderConfig("alternate", await alternate.start(), "standin", ""),
+    ], hedge=hedge)
+    ttft, total = [], []
+    try:
+        await client.warm_up()
+        for _ in range(args.calls):
+            t0 = time.perf_counter()
+            first = None
+            async for _delta in client.stream_reply("ctx", "Ne zaman yayınlıyoruz?", "tr"):
+                if first is None:
+                    first = (time.perf_counter() - t0) * 1000
+            ttft.append(first)
+            total.append((time.perf_counter() - t0) * 1000)
+            await asyncio.sleep(args.gap)
+        stats = client.stats()
+    finally:
+        await client.aclose()
+        await primary.close()
+        await alternate.close()
+    return {"ttft": ttft, "total": total, "stats": stats}
+
+
+def report(name: str, r: dict, calls: int):
+    s = r["stats"]
+    extra = sum(p["calls"] for p in s["providers"].values()) - calls   # boşa giden istek
+    ttft = r["ttft"]
+    print(f"{name:>8}{pct(ttft, 0.5):>9.1f}{pct(ttft, 0.9):>9.1f}{pct(ttft, 0.99):>9.1f}"
+          f"{pct(r['total'], 0.99):>11.1f}{s['hedges']:>8}{s['hedge_wins']:>6}"
+          f"{extra:>8}")
+
+
+async def main_async(args):
+    print(f"{'':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'tot p99':>11}{'hedges':>8}{'wins':>6}"
+          f"{'extra':>8}   (ttft)")
+    base = await run(args, hedge=False)
+    report("single", base, args.calls)
+    hedged = await run(args, hedge=True)
+    report("hedged", hedged, args.calls)
+    s = hedged["stats"]
+    print(f"hedge delay now {s['hedge_delay_ms']} ms, losers cancelled={s['cancelled']}")
+    for name, ps in s["providers"].items():
+        print(f"  {name:>10}: {ps}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=60)
+    ap.add_argument("--gap", type=float, default=0.05, help="çağrılar arası bekleme (sn)")
+    ap.add_argument("--latency-ms", type=int, default=300, help="birincil ilk token")
+    ap.add_argument("--alt-latency-ms", type=int, default=450, help="yedek ilk token")
+    ap.add_argument("--token-ms", type=int, default=10)
+    ap.add_argument("--jitter-ms", type=int, default=80)
+    ap.add_argument("--spike-rate", type=float, default=0.1)
+    ap.add_argument("--spike-ms", type=int, default=2500)
+    ap.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# bench/llm_standin.py
+"""OpenAI chat completions uç noktasının yerel HTTP/1.1 taklidi (keep-alive).
+
+Desteklenen: GET /v1/models, POST /v1/chat/completions (``"stream": true`` ise
+SSE, kelime başına bir parça). Yeni bağlantının ilk isteği ``handshake_ms``
+kadar bekletilir (TCP+TLS el sıkışmasının taklidi); ilk token süresi, token
+aralığı, jitter, 503 hata oranı ve ara sıra gelen gecikme sıçraması (p99
+kuyruğu) ayarlanabilir. Akışsız istek tüm tokenları bekler.
+
+Çalıştır:  python -m bench.llm_standin --port 8766 --latency-ms 300
+İstemci:   OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=x python -m src.main
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class LLMStandinConfig:
+    latency_ms: int = 300            # istek → ilk token
+    token_ms: int = 25               # tokenlar arası
+    jitter_ms: int = 0               # yanıta eklenen rastgele 0..jitter
+    handshake_ms: int = 60           # yeni bağlantıda ilk istekten önce
+    fail_rate: float = 0.0           # istek başına 503 olasılığı
+    spike_rate: float = 0.0          # istek başına gecikme sıçraması olasılığı
+    spike_ms: int = 0                # sıçramada ilk tokena eklenen
+    reply: str = "Sure, we can ship it next week. The rollback plan is already tested."
+    seed: int = 0
+
+
+class LLMStandin:
+    def __init__(self, cfg: Optional[LLMStandinConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.cfg = cfg or LLMStandinConfig()
+        self.host = host
+        self.port = port
+        self._server = None
+        self._rng = random.Random(self.cfg.seed)
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connections = 0
+        self.requests = 0
+        self.failures = 0
+        self.spikes = 0
+
+    async def _sleep_ms(self, ms: float):
+        if self.cfg.jitter_ms:
+            ms += self._rng.uniform(0, self.cfg.jitter_ms)
+        if ms > 0:
+            await asyncio.sleep(ms / 1000.0)
+
+    async def _respond(self, writer, status: int, obj: dict, keep: bool):
+        body = json.dumps(obj).encode()
+        reason = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}[status]
+        head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep else 'close'}\r\n\r\n")
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+    async def _stream(self, writer, keep: bool):
+        head = ("HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                f"Transfer-Encoding: chunked\r\nConnection: {'keep-alive' if keep else 'close'}\r\n\r\n")
+        writer.write(head.encode())
+
+        def chunk(data: str):
+            b = f"data: {data}\n\n".encode()
+            writer.write(f"{len(b):x}\r\n".encode() + b + b"\r\n")
+
+        words = self.cfg.reply.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(self.cfg.token_ms / 1000.0)
+            delta = word if i == 0 else " " + word
+            chunk(json.dumps({"choices": [{"index": 0, "delta": {"content": delta}}]}))
+            await writer.drain()
+        chunk("[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        first = True
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = lines[0].split(" ", 2)
+                headers = {k.strip().lower(): v.strip() for k, v in
+                           (line.split(":", 1) for line in lines[1:] if ":" in line)}
+                body = {}
+                if int(headers.get("content-length", "0")):
+                    raw = await reader.readexactly(int(headers["content-length"]))
+                    try:
+                        body = json.loads(raw)
+                    except ValueError:
+                        pass
+                keep = headers.get("connection", "").lower() != "close"
+                if first:
+                    await asyncio.sleep(self.cfg.handshake_ms / 1000.0)
+                    first = False
+                self.requests += 1
+                if method == "GET" and path.endswith("/models"):
+                    await self._respond(writer, 200, {"object": "list", "data": []}, keep)
+                elif method == "POST" and path.endswith("/chat/completions"):
+                    spike = self.cfg.spike_ms if self._rng.random() < self.cfg.spike_rate else 0
+                    if spike:
+                        self.spikes += 1
+                    await self._sleep_ms(self.cfg.latency_ms + spike)
+                    if self._rng.random() < self.cfg.fail_rate:
+                        self.failures += 1
+                        await self._respond(writer, 503, {"error": {"message": "overloaded"}}, keep)
+                    elif body.get("stream"):
+                        await self._stream(writer, keep)
+                    else:
+                        words = len(self.cfg.reply.split(" "))
+                        await asyncio.sleep(self.cfg.token_ms * (words - 1) / 1000.0)
+                        await self._respond(writer, 200, {"choices": [
+                            {"index": 0, "message": {"role": "assistant", "content": self.cfg.reply}}]}, keep)
+                else:
+                    await self._respond(writer, 404, {"error": {"message": path}}, keep)
+                if not keep:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:   # kapanışta yarım kalan (örn. iptal edilmiş hedge) istek
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def start_in_thread(self) -> str:
+        """Ayrı thread + döngüde çalıştır (döngüyü bloklayan istemcileri ölçmek için)."""
+        ready = threading.Event()
+        url = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            url.append(self._loop.run_until_complete(self.start()))
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return url[0]
+
+    def stop_thread(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def stats(self) -> dict:
+        return {"connections": self.connections, "requests": self.requests, "failures": self.failures,
+                "spikes": self.spikes}
+
+
+def add_llm_standin_args(ap: argparse.ArgumentParser):
+    ap.add_argument("--latency-ms", type=int, default=300)
+    ap.add_argument("--token-ms", type=int, default=25)
+    ap.add_argument("--jitter-ms", type=int, default=0)
+    ap.add_argument("--handshake-ms", type=int, default=60)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--spike-rate", type=float, default=0.0)
+    ap.add_argument("--spike-ms", type=int, default=0)
+
+
+def config_from_args(args) -> LLMStandinConfig:
+    return LLMStandinConfig(latency_ms=args.latency_ms, token_ms=args.token_ms, jitter_ms=args.jitter_ms,
+                            handshake_ms=args.handshake_ms, fail_rate=args.fail_rate,
+                            spike_rate=args.spike_rate, spike_ms=args.spike_ms)
+
+
+async def _serve_forever(cfg: LLMStandinConfig, host: str, port: int):
+    srv = LLMStandin(cfg, host, port)
+    url = await srv.start()
+    print(f"[llm-standin] listening on {url}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"[llm-standin] {srv.stats()}")
+    finally:
+        await srv.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8766)
+    add_llm_standin_args(ap)
+    args = ap.parse_args()
+    try:
+        asyncio.run(_serve_forever(config_from_args(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
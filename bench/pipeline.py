@@ -0,0 +1,124 @@
+# bench/pipeline.py
+"""Tek döngü (cevabı bekleyip bloklayarak okuyan) ile aşamalı işlem hattının altyazı
+gecikmesi: olayın konuşmadaki zamanı → altyazıya yazıldığı an.
+
+Sentetik STT her ``--gap`` sn'de bir kısmi/final metin üretir, her ``--every``. final bir
+sorudur. LLM ``--llm-ms`` süren bir bekleme, TTS ``--tts-ms`` süren bloklayan bir çağrıdır
+(pyttsx3 ``runAndWait`` gibi). Aşamalı hatta TTS kendi thread'inde okunur.
+
+Çalıştır:  python -m bench.pipeline --events 200 --llm-ms 1500 --tts-ms 800
+"""
+import argparse
+import asyncio
+import threading
+import queue
+import time
+
+from src.pipeline import Stage
+
+
+def pct(xs, p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))] if xs else 0.0
+
+
+async def stt(args):
+    """(metin, final, konuşma zamanı) üretir. Zaman, olayın sesteki yeridir (başlangıç +
+    i * gap); tüketici geride kalırsa olaylar birikir ve gecikme olarak görünür."""
+    t0 = time.perf_counter()
+    for i in range(args.events):
+        due = t0 + i * args.gap
+        if due > time.perf_counter():
+            await asyncio.sleep(due - time.perf_counter())
+        final = i % args.words == args.words - 1
+        question = final and (i // args.words) % args.every == 0
+        yield (f"utterance {i // args.words}{'?' if question else ''}", final, due)
+
+
+async def legacy(args) -> dict:
+    lat, answers = [], 0
+    async for text, final, t in stt(args):
+        lat.append((time.perf_counter() - t) * 1000)     # show_subtitle
+        if final and text.endswith("?"):
+            await asyncio.sleep(args.llm_ms / 1000.0)      # await client.short_reply(...)
+            time.sleep(args.tts_ms / 1000.0)               # speak(reply)
+            answers += 1
+    return {"lat": lat, "answers": answers}
+
+
+async def staged(args) -> dict:
+    lat, answers = [], [0]
+    tts_q: "queue.Queue" = queue.Queue(maxsize=8)
+
+    def speaker():
+        while True:
+            tts_q.get()
+            time.sleep(args.tts_ms / 1000.0)
+
+    threading.Thread(target=speaker, daemon=True).start()
+
+    def present(reply):
+        answers[0] += 1
+        try:
+            tts_q.put_nowait(reply)
+        except queue.Full:
+            pass
+
+    async def answer(text):
+        await asyncio.sleep(args.llm_ms / 1000.0)
+        await presenter.put(text)
+
+    async def detect(item):
+        text, final, _t = item
+        if final and text.endswith("?"):
+            await llm.put(text)
+
+    async def display(item):
+        lat.append((time.perf_counter() - item[2]) * 1000)
+        await detector.put(item)
+
+    presenter = Stage("present", present, 32, "block").start()
+    llm = Stage("llm", answer, 4, "drop_oldest", concurrency=8).start()
+    detector = Stage("detect", detect, 64, "drop_oldest", coalesce=lambda x: not x[1]).start()
+    displayer = Stage("display", display, 64, "drop_oldest", coalesce=lambda x: not x[1]).start()
+    stages = (displayer, detector, llm, presenter)
+    async for item in stt(args):
+        await displayer.put(item)
+    await asyncio.sleep(args.llm_ms / 1000.0 + 0.2)     # uçuştaki cevaplar
+    for s in stages:
+        await s.close()
+    return {"lat": lat, "answers": answers[0], "stages": {s.name: s.stats() for s in stages}}
+
+
+def report(name: str, r: dict, wall: float):
+    lat = r["lat"]
+    print(f"{name:>8}{pct(lat, 0.5):>10.1f}{pct(lat, 0.99):>10.1f}{max(lat):>10.1f}"
+          f"{len(lat):>7}{r['answers']:>9}{wall:>9.1f}")
+
+
+async def main_async(args):
+    print(f"{'':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'shown':>7}{'answers':>9}"
+          f"{'wall s':>9}   (subtitle latency)")
+    t = time.perf_counter()
+    r = await legacy(args)
+    report("legacy", r, time.perf_counter() - t)
+    t = time.perf_counter()
+    r = await staged(args)
+    report("staged", r, time.perf_counter() - t)
+    for name, s in r["stages"].items():
+        print(f"  {name:>8}: {s}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=200)
+    ap.add_argument("--gap", type=float, default=0.05, help="STT olayları arası (sn)")
+    ap.add_argument("--words", type=int, default=5, help="final başına olay (kısmiler + final)")
+    ap.add_argument("--every", type=int, default=2, help="her N. final soru")
+    ap.add_argument("--llm-ms", type=int, default=1500)
+    ap.add_argument("--tts-ms", type=int, default=800)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
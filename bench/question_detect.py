@@ -0,0 +1,98 @@
+# bench/question_detect.py
+"""Soru tespiti: eski alt-dizgi döngüsü vs derlenmiş kelime sınırlı regex.
+
+Etiketli korpusta doğruluk ve yanlış pozitif (= gereksiz LLM çağrısı) sayısı,
+ardından metin/sn verimi.
+
+Çalıştır:  python -m bench.question_detect
+           python -m bench.question_detect --corpus my.tsv --repeat 2000 -v
+"""
+import argparse
+import os
+import time
+
+from src.nlu.question_detect import QuestionDetector
+
+CORPUS = os.path.join(os.path.dirname(__file__), "question_corpus.tsv")
+
+# Önceki davranış: küçük harf + her kalıp için `in` taraması
+LEGACY_PATTERNS = [
+    " mı", " mi", " mu", " mü", " mısın", " misin", " misiniz",
+    " olur mu", " olabilir mi", " anlatır mısınız", " nedir", " nasıl", " ne zaman",
+    "ne", "neden", "nasıl", "kim", "nerede", "ne zaman", "hangi", "kaç"
+]
+
+
+def legacy_is_question(txt: str) -> bool:
+    t = (txt or "").strip().lower()
+    if not t:
+        return False
+    if t.endswith("?"):
+        return True
+    return any(pattern in t for pattern in LEGACY_PATTERNS)
+
+
+def load(path: str) -> list:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            label, text = line.rstrip("\n").split("\t", 1)
+            rows.append((label == "1", text))
+    return rows
+
+
+def score(fn, rows, verbose: bool, name: str) -> dict:
+    tp = fp = fn_ = tn = 0
+    for label, text in rows:
+        got = fn(text)
+        if got and label:
+            tp += 1
+        elif got:
+            fp += 1
+            if verbose:
+                print(f"  [{name}] FP: {text}")
+        elif label:
+            fn_ += 1
+            if verbose:
+                print(f"  [{name}] FN: {text}")
+        else:
+            tn += 1
+    return {"tp": tp, "fp": fp, "fn": fn_, "tn": tn,
+            "precision": tp / (tp + fp) if tp + fp else 0.0,
+            "recall": tp / (tp + fn_) if tp + fn_ else 0.0,
+            "llm_calls": tp + fp}
+
+
+def throughput(fn, texts, repeat: int) -> float:
+    t = time.perf_counter()
+    for _ in range(repeat):
+        for x in texts:
+            fn(x)
+    return repeat * len(texts) / (time.perf_counter() - t)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", default=CORPUS)
+    ap.add_argument("--repeat", type=int, default=500)
+    ap.add_argument("-v", "--verbose", action="store_true", help="hatalı sınıflananları yaz")
+    args = ap.parse_args()
+
+    rows = load(args.corpus)
+    texts = [t for _, t in rows]
+    det = QuestionDetector()
+    n_pos = sum(1 for label, _ in rows if label)
+    print(f"corpus: {len(rows)} texts ({n_pos} questions, {len(rows) - n_pos} statements), "
+          f"langs={','.join(det.langs)}")
+    print(f"{'':>10}{'prec':>8}{'recall':>8}{'FP':>6}{'FN':>6}{'LLM calls':>11}{'texts/s':>12}")
+    for name, fn in (("legacy", legacy_is_question), ("compiled", det.is_question)):
+        s = score(fn, rows, args.verbose, name)
+        tps = throughput(fn, texts, args.repeat)
+        print(f"{name:>10}{s['precision']:>8.2f}{s['recall']:>8.2f}{s['fp']:>6}{s['fn']:>6}"
+              f"{s['llm_calls']:>11}{tps:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
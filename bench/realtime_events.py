@@ -0,0 +1,99 @@
+# bench/realtime_events.py
+"""Realtime event dağıtımı: kayıtlı event log'unu tekrar oynatıp event/sn ölçer.
+
+Kayıt:     REALTIME_EVENT_LOG=events.jsonl python -m src.main
+Çalıştır:  python -m bench.realtime_events --log events.jsonl
+           python -m bench.realtime_events --utterances 200 --deltas 400   (sentetik)
+           python -m bench.realtime_events --emit-ms 0     (her delta'da kısmi yayın)
+"""
+import argparse
+import json
+import time
+
+from src.app_types import TranscriptChunk
+from src.stt.realtime import DELTA_EVENTS, DONE_EVENTS, REALTIME_PARTIAL_EMIT_MS, EventAssembler
+
+
+def synth_log(utterances: int, deltas: int) -> list:
+    words = "bu toplantıda bir sonraki sprint için teslim tarihini konuşalım mı".split()
+    out = []
+    for u in range(utterances):
+        out.append(json.dumps({"type": "input_audio_buffer.speech_started"}))
+        out.append(json.dumps({"type": "response.created", "response": {"id": f"r{u}"}}))
+        for i in range(deltas):
+            out.append(json.dumps({"type": "response.text.delta", "delta": words[i % len(words)] + " "}))
+            if i % 10 == 0:
+                out.append(json.dumps({"type": "response.audio.delta", "delta": "AAAA"}))
+        out.append(json.dumps({"type": "response.text.done", "text": ""}))
+        out.append(json.dumps({"type": "response.done"}))
+    return out
+
+
+class LegacyAssembler:
+    """Önceki davranış: ardışık tuple kontrolleri + string += + doğrulamalı pydantic."""
+
+    def __init__(self, partial_emit_ms: int):
+        self.partial_emit_ms = partial_emit_ms
+        self.partial_buf = ""
+        self.last_emit = 0.0
+        self.in_flight = False
+
+    def feed(self, raw):
+        data = json.loads(raw)
+        t = data.get("type", "")
+        if t == "error":
+            return None
+        if t in ("response.created",):
+            self.in_flight = True
+        if t in DELTA_EVENTS:
+            delta = data.get("delta") or data.get("text") or data.get("output_text") \
+                or data.get("transcript") or ""
+            if delta:
+                self.partial_buf += delta
+                now = time.monotonic()
+                if (now - self.last_emit) * 1000 >= self.partial_emit_ms:
+                    self.last_emit = now
+                    return TranscriptChunk(text=self.partial_buf, is_final=False)
+            return None
+        if t in DONE_EVENTS:
+            text = (data.get("text") or data.get("output_text") or data.get("transcript")
+                    or self.partial_buf or "").strip()
+            self.partial_buf = ""
+            self.last_emit = 0.0
+            self.in_flight = False
+            return TranscriptChunk(text=text, is_final=True) if text else None
+        return None
+
+
+def run(asm, log: list) -> tuple:
+    chunks = 0
+    t0 = time.perf_counter()
+    for raw in log:
+        if asm.feed(raw) is not None:
+            chunks += 1
+    return time.perf_counter() - t0, chunks
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--log", default="", help="REALTIME_EVENT_LOG ile kaydedilmiş JSONL")
+    ap.add_argument("--utterances", type=int, default=100)
+    ap.add_argument("--deltas", type=int, default=300)
+    ap.add_argument("--emit-ms", type=int, default=REALTIME_PARTIAL_EMIT_MS,
+                    help="varsayılan: uygulamanın partial_emit_ms'i; 0 = her delta'da kısmi yayın (en kötü durum)")
+    args = ap.parse_args()
+
+    if args.log:
+        with open(args.log, encoding="utf-8") as f:
+            log = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        log = synth_log(args.utterances, args.deltas)
+
+    print(f"{'impl':<10} {'events':>8} {'chunks':>7} {'sec':>7} {'events/s':>10}")
+    for name, asm in (("legacy", LegacyAssembler(args.emit_ms)), ("dispatch", EventAssembler(args.emit_ms))):
+        dt, chunks = run(asm, log)
+        print(f"{name:<10} {len(log):>8} {chunks:>7} {dt:>7.3f} {len(log) / dt:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
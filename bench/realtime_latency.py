@@ -0,0 +1,152 @@
+# bench/realtime_latency.py
+"""Uçtan uca realtime gecikmesi: WAV → FileSource → stream_text → yerel stand-in sunucu.
+
+Her konuşmanın sonu yakalandıktan (dosyada çalındıktan) sonra ilk kısmi metnin ve
+final metnin tüketiciye ulaşma süresini ölçer; p50/p90/p99 raporlar.
+
+Çalıştır:  python -m bench.realtime_latency                       (sentetik konuşma)
+           python -m bench.realtime_latency a.wav b.wav --first-delta-ms 500 --jitter-ms 100
+           python -m bench.realtime_latency --drop-rate 0.002 --expire-after 8   (hata enjeksiyonu)
+
+Not: Gecikme eşlemesi oturum zamanının kaynak zamanına eşit olduğunu varsayar
+(yerel VAD kapalı, tek oturum). Oturum devrinde tekrar gönderilen ses eşlemeyi
+kaydırır; bu durumda tamlık (alınan final / beklenen konuşma) daha anlamlıdır.
+Oturum yanıt ortasında düşerse yanıtı gelmemiş konuşma yeni oturuma tekrar gider;
+``--expire-after`` ile finals beklenenin altına inmemeli (konuşma ortasında kesilen
+ses stand-in'in append başına VAD'ında iki parçaya bölünüp fazladan final verebilir).
+"""
+import argparse
+import asyncio
+import os
+import re
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from bench.realtime_standin import StandinServer, add_standin_args, config_from_args
+
+_TAG = re.compile(r"\[u(\d+)@(\d+)-(\d+)\]")
+
+
+def synth_wav(path: str, utterances: int, rate: int = 24000, seed: int = 0) -> float:
+    """Konuşma benzeri patlamalar (0.6–2 sn) + sessizlik (0.8 sn); süreyi döner."""
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(int(0.5 * rate), dtype=np.float32)]
+    for _ in range(utterances):
+        n = int(rng.uniform(0.6, 2.0) * rate)
+        t = np.arange(n) / rate
+        f0 = rng.uniform(110, 220)
+        env = np.abs(np.sin(np.pi * t / t[-1])) ** 0.3 * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+        voice = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+        parts.append((0.15 * env * voice).astype(np.float32))
+        parts.append(np.zeros(int(0.8 * rate), dtype=np.float32))
+    x = np.concatenate(parts)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes((np.clip(x, -1, 1) * 32767).astype(np.int16).tobytes())
+    return x.shape[0] / rate
+
+
+def wav_seconds(path: str) -> float:
+    with wave.open(path, "rb") as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+def pct(xs, p):
+    if not xs:
+        return float("nan")
+    return float(np.percentile(np.asarray(xs), p))
+
+
+async def run_file(realtime, path: str, tail: float) -> dict:
+    from src.audio.source import CaptureConfig, FileSource
+
+    src = FileSource(path, CaptureConfig(device_rate="off"), speed=1.0, loop=False)
+    deadline = time.monotonic() + wav_seconds(path) + tail
+    partial_ms, final_ms = [], []
+    seen_partial = set()
+    finals = 0
+    agen = realtime.stream_text(source=src)
+    try:
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            try:
+                chunk = await asyncio.wait_for(agen.__anext__(), timeout=left)
+            except asyncio.TimeoutError:
+                break
+            now = time.monotonic()
+            m = _TAG.search(chunk.text)
+            if m is None or not src._t_start:
+                continue
+            uid, end_ms = int(m.group(1)), int(m.group(3))
+            captured = src._t_start + end_ms / 1000.0
+            if chunk.is_final:
+                finals += 1
+                final_ms.append((now - captured) * 1000)
+            elif uid not in seen_partial:
+                seen_partial.add(uid)
+                partial_ms.append((now - captured) * 1000)
+    finally:
+        await agen.aclose()
+    return {"partial": partial_ms, "final": final_ms, "finals": finals}
+
+
+async def main_async(args):
+    server = StandinServer(config_from_args(args))
+    url = await server.start()
+    # realtime modülü URL/anahtarı import anında okur
+    os.environ["OPENAI_REALTIME_URL"] = url
+    os.environ.setdefault("OPENAI_API_KEY", "standin")
+    os.environ.setdefault("REALTIME_LOCAL_VAD", "0")
+    from src.stt import realtime
+
+    tmp = None
+    files = list(args.wav)
+    expected = None
+    if not files:
+        tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+        tmp.close()
+        synth_wav(tmp.name, args.utterances)
+        files = [tmp.name]
+        expected = args.utterances
+
+    partial, final, finals = [], [], 0
+    try:
+        for path in files:
+            r = await run_file(realtime, path, args.tail)
+            partial += r["partial"]
+            final += r["final"]
+            finals += r["finals"]
+    finally:
+        await server.close()
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+    print(f"{'':>10}{'n':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, xs in (("partial", partial), ("final", final)):
+        mx = max(xs) if xs else float("nan")
+        print(f"{name:>10}{len(xs):>6}{pct(xs, 50):>10.1f}{pct(xs, 90):>10.1f}"
+              f"{pct(xs, 99):>10.1f}{mx:>10.1f}")
+    done = f"{finals}/{expected}" if expected is not None else str(finals)
+    print(f"finals={done} server={server.stats()}")
+    if server.sessions > len(files):
+        print("note: session rollover happened; latencies after the first swap are offset by replayed audio")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("wav", nargs="*", help="16-bit PCM WAV dosyaları (boşsa sentetik)")
+    ap.add_argument("--utterances", type=int, default=12)
+    ap.add_argument("--tail", type=float, default=3.0, help="dosya bitince final bekleme (sn)")
+    add_standin_args(ap)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# bench/realtime_standin.py
+"""Realtime API'nin istemcinin kullandığı alt kümesini konuşan yerel websocket sunucusu.
+
+Desteklenen: session.update, input_audio_buffer.append/commit, response.create,
+server_vad benzeri konuşma tespiti (speech_started/stopped + committed),
+response.created / response.text.delta / response.text.done / response.done,
+error ve session_expired. Gecikmeler ve hata enjeksiyonu ayarlanabilir.
+
+Çalıştır:  python -m bench.realtime_standin --port 8765 --first-delta-ms 300
+İstemci:   OPENAI_REALTIME_URL=ws://127.0.0.1:8765 OPENAI_API_KEY=x python -m src.main
+
+Transcript metni ``[u<n>@<start_ms>-<end_ms>]`` etiketiyle başlar; latency bench'i
+bu etiketten konuşmanın oturum zamanındaki yerini çözer.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+import websockets
+
+from src.audio.g711 import G711_RATE, ulaw_decode
+
+
+@dataclass
+class StandinConfig:
+    first_delta_ms: int = 300        # konuşma bitişi → ilk delta
+    delta_interval_ms: int = 40      # deltalar arası
+    done_delay_ms: int = 50          # son delta → text.done
+    jitter_ms: int = 0               # her gecikmeye eklenen rastgele 0..jitter
+    vad_threshold_db: float = -40.0  # server_vad taklidi için enerji eşiği
+    expire_after_sec: float = 0.0    # >0: bu süre sonra session_expired + kapat
+    drop_rate: float = 0.0           # append başına bağlantıyı sertçe kesme olasılığı
+    error_rate: float = 0.0          # append başına sahte error event olasılığı
+    stall_rate: float = 0.0          # yanıt başına stall_ms bekleme olasılığı
+    stall_ms: int = 2000
+    script: List[str] = field(default_factory=list)  # sırayla kullanılacak transcript metinleri
+    seed: int = 0
+
+
+class _Conn:
+    def __init__(self, ws, cfg: StandinConfig, rng: random.Random, server: "StandinServer"):
+        self.ws = ws
+        self.cfg = cfg
+        self.rng = rng
+        self.server = server
+        self.fmt = "pcm16"
+        self.rate = 24000
+        self.silence_ms = 250
+        self.audio_ms = 0.0              # oturuma gelen toplam ses
+        self.speaking = False
+        self.speech_start_ms = 0.0
+        self.last_voice_ms = 0.0
+        self.tasks: set = set()
+
+    async def send(self, obj: dict):
+        await self.ws.send(json.dumps(obj))
+
+    async def _sleep_ms(self, ms: float):
+        ms += self.rng.uniform(0, self.cfg.jitter_ms) if self.cfg.jitter_ms else 0
+        if ms > 0:
+            await asyncio.sleep(ms / 1000.0)
+
+    def _pcm(self, b64: str) -> np.ndarray:
+        raw = base64.b64decode(b64)
+        if self.fmt == "g711_ulaw":
+            return ulaw_decode(raw)
+        return np.frombuffer(raw, dtype=np.int16)
+
+    def _on_audio(self, pcm: np.ndarray):
+        n = pcm.shape[0]
+        if n == 0:
+            return
+        dur_ms = 1000.0 * n / self.rate
+        f = pcm.astype(np.float32) / 32768.0
+        db = 10 * np.log10(float(np.dot(f, f)) / n + 1e-12)
+        start = self.audio_ms
+        self.audio_ms += dur_ms
+        if db > self.cfg.vad_threshold_db:
+            if not self.speaking:
+                self.speaking = True
+                self.speech_start_ms = start
+                self._spawn(self.send({"type": "input_audio_buffer.speech_started",
+                                       "audio_start_ms": int(start)}))
+            self.last_voice_ms = self.audio_ms
+        elif self.speaking and self.audio_ms - self.last_voice_ms >= self.silence_ms:
+            self.speaking = False
+            self._spawn(self._respond(self.speech_start_ms, self.last_voice_ms))
+
+    def _spawn(self, coro):
+        t = asyncio.create_task(coro)
+        self.tasks.add(t)
+        t.add_done_callback(self.tasks.discard)
+
+    async def _respond(self, start_ms: float, end_ms: float):
+        await self.send({"type": "input_audio_buffer.speech_stopped", "audio_end_ms": int(end_ms)})
+        await self.send({"type": "input_audio_buffer.committed"})
+        await self.send({"type": "response.created", "response": {"id": f"resp_{self.server.responses}"}})
+        n = self.server.responses
+        self.server.responses += 1
+        body = self.cfg.script[n % len(self.cfg.script)] if self.cfg.script else f"utterance {n}"
+        text = f"[u{n}@{int(start_ms)}-{int(end_ms)}] {body}"
+        if self.cfg.stall_rate and self.rng.random() < self.cfg.stall_rate:
+            await asyncio.sleep(self.cfg.stall_ms / 1000.0)
+        await self._sleep_ms(self.cfg.first_delta_ms)
+        words = text.split(" ")
+        for i, w in enumerate(words):
+            await self.send({"type": "response.text.delta", "delta": w + (" " if i < len(words) - 1 else "")})
+            if i < len(words) - 1:
+                await self._sleep_ms(self.cfg.delta_interval_ms)
+        await self._sleep_ms(self.cfg.done_delay_ms)
+        await self.send({"type": "response.text.done", "text": text})
+        await self.send({"type": "response.done"})
+
+    async def _expire(self):
+        await asyncio.sleep(self.cfg.expire_after_sec)
+        await self.send({"type": "error", "error": {
+            "type": "invalid_request_error", "code": "session_expired",
+            "message": "Your session hit the maximum duration of 30 minutes."}})
+        await self.ws.close()
+
+    async def run(self):
+        await self.send({"type": "session.created", "session": {"id": f"sess_{id(self)}"}})
+        if self.cfg.expire_after_sec > 0:
+            self._spawn(self._expire())
+        try:
+            async for raw in self.ws:
+                msg = json.loads(raw)
+                t = msg.get("type")
+                if t == "session.update":
+                    sess = msg.get("session", {})
+                    self.fmt = sess.get("input_audio_format", "pcm16")
+                    self.rate = G711_RATE if self.fmt == "g711_ulaw" else 24000
+                    td = sess.get("turn_detection") or {}
+                    self.silence_ms = int(td.get("silence_duration_ms", self.silence_ms))
+                    await self.send({"type": "session.updated", "session": sess})
+                elif t == "input_audio_buffer.append":
+                    self.server.appends += 1
+                    if self.cfg.drop_rate and self.rng.random() < self.cfg.drop_rate:
+                        self.server.drops += 1
+                        self.ws.transport.abort()
+                        return
+                    if self.cfg.error_rate and self.rng.random() < self.cfg.error_rate:
+                        await self.send({"type": "error", "error": {
+                            "type": "server_error", "code": "injected", "message": "injected fault"}})
+                    self._on_audio(self._pcm(msg.get("audio", "")))
+                elif t == "input_audio_buffer.commit":
+                    if self.speaking:
+                        self.speaking = False
+                        self._spawn(self._respond(self.speech_start_ms, self.audio_ms))
+                    await self.send({"type": "input_audio_buffer.committed"})
+                elif t == "response.create":
+                    pass  # server_vad yanıtı zaten üretir
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in list(self.tasks):
+                task.cancel()
+
+
+class StandinServer:
+    def __init__(self, cfg: Optional[StandinConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.cfg = cfg or StandinConfig()
+        self.host = host
+        self.port = port
+        self._server = None
+        self._rng = random.Random(self.cfg.seed)
+        self.sessions = 0
+        self.responses = 0
+        self.appends = 0
+        self.drops = 0
+        self.started = time.monotonic()
+
+    async def _handler(self, ws, path=None):
+        self.sessions += 1
+        await _Conn(ws, self.cfg, self._rng, self).run()
+
+    async def start(self) -> str:
+        self._server = await websockets.serve(self._handler, self.host, self.port, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return f"ws://{self.host}:{self.port}"
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def stats(self) -> dict:
+        return {"sessions": self.sessions, "responses": self.responses,
+                "appends": self.appends, "drops": self.drops}
+
+
+def add_standin_args(ap: argparse.ArgumentParser):
+    ap.add_argument("--first-delta-ms", type=int, default=300)
+    ap.add_argument("--delta-interval-ms", type=int, default=40)
+    ap.add_argument("--done-delay-ms", type=int, default=50)
+    ap.add_argument("--jitter-ms", type=int, default=0)
+    ap.add_argument("--expire-after", type=float, default=0.0)
+    ap.add_argument("--drop-rate", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--stall-rate", type=float, default=0.0)
+    ap.add_argument("--stall-ms", type=int, default=2000)
+    ap.add_argument("--script", default="", help="her satırı bir transcript olan dosya")
+
+
+def config_from_args(args) -> StandinConfig:
+    script = []
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = [line.strip() for line in f if line.strip()]
+    return StandinConfig(
+        first_delta_ms=args.first_delta_ms, delta_interval_ms=args.delta_interval_ms,
+        done_delay_ms=args.done_delay_ms, jitter_ms=args.jitter_ms,
+        expire_after_sec=args.expire_after, drop_rate=args.drop_rate,
+        error_rate=args.error_rate, stall_rate=args.stall_rate, stall_ms=args.stall_ms,
+        script=script,
+    )
+
+
+async def _serve_forever(cfg: StandinConfig, host: str, port: int):
+    srv = StandinServer(cfg, host, port)
+    url = await srv.start()
+    print(f"[standin] listening on {url}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"[standin] {srv.stats()}")
+    finally:
+        await srv.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    add_standin_args(ap)
+    args = ap.parse_args()
+    try:
+        asyncio.run(_serve_forever(config_from_args(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
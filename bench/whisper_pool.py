@@ -0,0 +1,127 @@
+# bench/whisper_pool.py
+"""Whisper işçi havuzu: başlangıç süresi, parça başına gecikme ve event loop takılması.
+
+Havuz (ısınmış işçi süreçleri) ile eski yol (varsayılan executor'da tembel yükleme)
+karşılaştırılır. Parçalar gerçek zaman temposunda gönderilir; aynı anda 10 ms'lik
+bir zamanlayıcı loop gecikmesini (capture/UI takılmasının göstergesi) ölçer.
+
+Çalıştır:  python -m bench.whisper_pool --chunks 10 --chunk-sec 2
+           python -m bench.whisper_pool --wav meeting.wav --workers 2 --policy skip
+           python -m bench.whisper_pool --inline       (yalnız eski executor yolu)
+"""
+import argparse
+import asyncio
+import time
+import wave
+
+import numpy as np
+
+from src.stt import whisper_local
+from src.stt.whisper_pool import WhisperPool
+
+SR = whisper_local.WHISPER_SAMPLE_RATE
+
+
+def load_chunks(path: str, n: int, chunk_sec: float) -> list:
+    per = int(SR * chunk_sec)
+    if path:
+        with wave.open(path, "rb") as wf:
+            if wf.getframerate() != SR or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                raise SystemExit("WAV must be 16 kHz mono 16-bit")
+            x = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    else:
+        rng = np.random.default_rng(0)
+        x = (rng.standard_normal(per * n) * 2000).astype(np.int16)
+    return [x[i:i + per].tobytes() for i in range(0, min(len(x), per * n) - per + 1, per)]
+
+
+def pct(xs, p):
+    return float(np.percentile(xs, p)) if xs else float("nan")
+
+
+async def ticker(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        t = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - t - 0.01) * 1000)
+
+
+async def run(submit, chunks: list, chunk_sec: float) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    lat, dropped = [], 0
+
+    async def one(pcm):
+        nonlocal dropped
+        t = time.perf_counter()
+        res = await submit(pcm)
+        if res is None:
+            dropped += 1
+        else:
+            lat.append((time.perf_counter() - t) * 1000)
+
+    t0 = time.perf_counter()
+    jobs = []
+    for i, pcm in enumerate(chunks):
+        # parça, sesi "kaydedildiği" anda gönderilir
+        delay = t0 + (i + 1) * chunk_sec - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        jobs.append(asyncio.create_task(one(pcm)))
+    await asyncio.gather(*jobs)
+    stop.set()
+    await tick
+    return {"lat": lat, "lags": lags, "dropped": dropped}
+
+
+def report(name: str, r: dict, startup: float):
+    lat, lags = r["lat"], r["lags"]
+    print(f"{name:>8}  startup={startup:6.2f}s  chunk p50={pct(lat, 50):7.1f}ms "
+          f"p95={pct(lat, 95):7.1f}ms max={max(lat) if lat else float('nan'):7.1f}ms  "
+          f"loop lag p99={pct(lags, 99):6.1f}ms max={max(lags) if lags else 0:6.1f}ms  "
+          f"dropped={r['dropped']}")
+
+
+async def main_async(args):
+    chunks = load_chunks(args.wav, args.chunks, args.chunk_sec)
+    print(f"{len(chunks)} chunks x {args.chunk_sec}s")
+
+    if not args.inline:
+        t = time.perf_counter()
+        pool = WhisperPool(workers=args.workers, queue_max=args.queue_max, policy=args.policy)
+        await pool.start()
+        startup = time.perf_counter() - t
+        try:
+            r = await run(lambda pcm: pool.submit(pcm), chunks, args.chunk_sec)
+            report("pool", r, startup)
+            print(f"          {pool.stats()}")
+        finally:
+            pool.close()
+
+    if args.inline or args.compare:
+        loop = asyncio.get_running_loop()
+
+        async def inline(pcm):
+            return await loop.run_in_executor(None, whisper_local.transcribe_audio, pcm, SR)
+
+        # eski yol: model ilk parçada yüklenir → başlangıç = ilk parçanın gecikmesine dahil
+        r = await run(inline, chunks, args.chunk_sec)
+        report("inline", r, 0.0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--wav", default="", help="16 kHz mono WAV (boşsa gürültü)")
+    ap.add_argument("--chunks", type=int, default=10)
+    ap.add_argument("--chunk-sec", type=float, default=2.0)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--queue-max", type=int, default=2)
+    ap.add_argument("--policy", choices=["drop_oldest", "skip"], default="drop_oldest")
+    ap.add_argument("--inline", action="store_true", help="yalnız eski executor yolu")
+    ap.add_argument("--compare", action="store_true", help="havuzdan sonra eski yolu da ölç")
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
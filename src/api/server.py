@@ -2,7 +2,7 @@
 import os
 import asyncio
 import json
-from typing import Set
+from typing import Dict, Optional
 from pathlib import Path
 
 import sounddevice as sd
@@ -17,20 +17,29 @@ load_dotenv(dotenv_path=ROOT / ".env", override=True)
 
 # Realtime akış fonksiyonun
 from src.stt.realtime import stream_text as realtime_stream
+from src.audio.manager import CaptureManager, ManagedStream, StreamSpec
 
 app = FastAPI(title="Meeting Copilot Backend")
 
 # ── Global durum ───────────────────────────────────────────────────────────────
-_subs: Set[WebSocket] = set()
-_runner: asyncio.Task | None = None
-_stop_evt = asyncio.Event()
+# Oda (room) başına bir pipeline; tüm odalar tek süreçte tek CaptureManager paylaşır
+DEFAULT_ROOM = "default"
+_subs: Dict[WebSocket, Optional[str]] = {}     # ws -> dinlediği oda (None = hepsi)
+_mgr = CaptureManager()
+_runners: Dict[str, asyncio.Task] = {}
+_stop_evts: Dict[str, asyncio.Event] = {}
 
 # ── Modeller ──────────────────────────────────────────────────────────────────
 class StartReq(BaseModel):
+    room: str | None = None            # oda etiketi (varsayılan "default")
     device: str | None = None          # "BlackHole 2ch" vb.
+    channel: int | None = None         # çok kanallı cihazda bu odanın kanalı
     lang: str | None = None            # örn. "en"
     translate_to: str | None = None    # örn. "tr"
 
+class StopReq(BaseModel):
+    room: str | None = None
+
 class AskReq(BaseModel):
     question: str | None = None
     context_en: str | None = None
@@ -38,64 +47,94 @@ class AskReq(BaseModel):
     target: str | None = "en"          # cevap dili (demo)
 
 # ── Yardımcılar ───────────────────────────────────────────────────────────────
-def _set_env_from_start(req: StartReq) -> None:
-    if req.device:
-        os.environ["AUDIO_INPUT_DEVICE"] = req.device
-    if req.lang:
-        os.environ["STT_LANG"] = req.lang
+def _spec_from_start(room: str, req: StartReq) -> StreamSpec:
+    """Oda ayarları akışa bağlanır; global env değişmez, diğer odaları etkilemez."""
+    spec = StreamSpec(
+        tag=room,
+        device=req.device or os.getenv("AUDIO_INPUT_DEVICE") or None,
+        channel=req.channel,
+        lang=req.lang,
+    )
     if req.translate_to:
-        # EN -> TR canlı çeviri için asgari env
-        os.environ["REALTIME_ONLY_TEXT"] = "1"
-        os.environ["STT_LANG"] = "en"
-        os.environ["REALTIME_PARTIAL_EMIT_MS"] = "200"
+        # EN -> TR canlı çeviri
+        spec.translate_to = req.translate_to
+        spec.lang = "en"
+        spec.partial_emit_ms = 200
+    return spec
 
 def _has_api_key() -> bool:
     return bool(os.getenv("OPENAI_API_KEY"))
 
-async def _broadcast(msg: dict) -> None:
+def _running(room: str) -> bool:
+    t = _runners.get(room)
+    return t is not None and not t.done()
+
+async def _broadcast(msg: dict, room: Optional[str] = None) -> None:
+    if room is not None:
+        msg = {**msg, "room": room}
     payload = json.dumps(msg, ensure_ascii=False)
     dead = []
-    for s in list(_subs):
+    for s, want in list(_subs.items()):
+        if want is not None and room is not None and want != room:
+            continue
         try:
             await s.send_text(payload)
         except Exception:
             dead.append(s)
     for s in dead:
-        _subs.discard(s)
+        _subs.pop(s, None)
+
+def _release_stream(room: str, source: Optional[ManagedStream] = None) -> None:
+    # yalnız bu odaya ait akış: bu arada /start yenisini eklediyse ona dokunma
+    s = _mgr.streams.get(room)
+    if s is not None and (source is None or s is source):
+        _mgr.remove(room)
+
+async def _run_pipeline(room: str, source: ManagedStream):
+    try:
+        await _pump_room(room, source)
+    finally:
+        # çöken runner da cihaz grubundaki rotasını bırakır
+        _release_stream(room, source)
 
-async def _run_pipeline():
+async def _pump_room(room: str, source: ManagedStream):
     # Anahtar yoksa kullanıcıya bildirip çık
     if not _has_api_key():
-        await _broadcast({"type": "error", "text": "OPENAI_API_KEY missing"})
+        await _broadcast({"type": "error", "text": "OPENAI_API_KEY missing"}, room)
         return
 
+    stop_evt = _stop_evts[room]
     backoff = 1
-    while not _stop_evt.is_set():
+    while not stop_evt.is_set():
         try:
-            async for chunk in realtime_stream():
+            async for chunk in realtime_stream(source=source):
                 await _broadcast({
                     "type": "final" if getattr(chunk, "is_final", False) else "partial",
                     "text": getattr(chunk, "text", "") or "",
-                })
-                if _stop_evt.is_set():
+                }, room)
+                if stop_evt.is_set():
                     break
             break  # generator normal bitti
         except Exception as e:
             msg = str(e)
-            await _broadcast({"type": "error", "text": msg})
+            await _broadcast({"type": "error", "text": msg}, room)
+            # realtime backend oturumu kendisi yeniler; bu dal yalnız yedek
             if "session_expired" in msg or "maximum duration of 30 minutes" in msg:
-                await _broadcast({"type": "info", "text": "restarting_session"})
+                await _broadcast({"type": "info", "text": "restarting_session"}, room)
                 continue
             await asyncio.sleep(min(backoff, 10))
             backoff = min(backoff * 2, 10)
 
-    await _broadcast({"type": "info", "text": "pipeline_stopped"})
+    await _broadcast({"type": "info", "text": "pipeline_stopped"}, room)
 
 # ── HTTP API ──────────────────────────────────────────────────────────────────
 @app.get("/status")
 async def status():
-    return {"running": _runner is not None and not _runner.done(),
-            "subscribers": len(_subs)}
+    rooms = {room: _running(room) for room in _runners}
+    return {"running": any(rooms.values()),
+            "rooms": rooms,
+            "subscribers": len(_subs),
+            "audio": _mgr.stats()}
 
 @app.get("/devices")
 async def devices():
@@ -110,28 +149,35 @@ async def devices():
 
 @app.post("/start")
 async def start(req: StartReq):
-    global _runner, _stop_evt
-    if _runner and not _runner.done():
-        return JSONResponse({"ok": True, "already": True})
+    room = req.room or DEFAULT_ROOM
+    if _running(room):
+        return JSONResponse({"ok": True, "room": room, "already": True})
 
     if not _has_api_key():
         return JSONResponse({"ok": False, "error": "OPENAI_API_KEY missing"}, status_code=400)
 
-    _set_env_from_start(req)
-    _stop_evt = asyncio.Event()
-    _runner = asyncio.create_task(_run_pipeline())
-    return {"ok": True}
+    source = _mgr.add(_spec_from_start(room, req))
+    _stop_evts[room] = asyncio.Event()
+    _runners[room] = asyncio.create_task(_run_pipeline(room, source))
+    return {"ok": True, "room": room}
 
 @app.post("/stop")
-async def stop():
-    global _runner
-    if _runner and not _runner.done():
-        _stop_evt.set()
-        try:
-            await _runner
-        finally:
-            _runner = None
-    return {"ok": True}
+async def stop(req: StopReq | None = None):
+    # oda verilmezse hepsini durdur
+    rooms = [req.room] if req and req.room else list(_runners)
+    for room in rooms:
+        task = _runners.get(room)
+        if task and not task.done():
+            _stop_evts[room].set()
+            try:
+                await task
+            finally:
+                _runners.pop(room, None)
+        else:
+            _runners.pop(room, None)
+        _stop_evts.pop(room, None)
+        _release_stream(room)
+    return {"ok": True, "stopped": rooms}
 
 @app.get("/diag")
 def diag():
@@ -149,9 +195,9 @@ async def ask(req: AskReq):
 
 # ── WebSocket (tek tanım) ─────────────────────────────────────────────────────
 @app.websocket("/ws/transcript")
-async def ws_transcript(ws: WebSocket):
+async def ws_transcript(ws: WebSocket, room: Optional[str] = None):
     await ws.accept()
-    _subs.add(ws)
+    _subs[ws] = room
     try:
         await ws.send_text(json.dumps({"type": "info", "text": "connected"}))
         while True:
@@ -162,4 +208,4 @@ async def ws_transcript(ws: WebSocket):
     except WebSocketDisconnect:
         pass
     finally:
-        _subs.discard(ws)
+        _subs.pop(ws, None)
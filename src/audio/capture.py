@@ -1,67 +1,106 @@
 import os
-import queue
 import time
-from dataclasses import dataclass
 from typing import AsyncGenerator, Optional
 
 import numpy as np
 import sounddevice as sd
 import asyncio
 
+from .ring import AsyncRingReader, PcmRingBuffer
+from .resample import PolyphaseResampler
+from .source import AudioSource, CaptureConfig, open_source, record_wav  # noqa: F401 (re-export)
+
 # ---- Ayarlanabilir parametreler (dotenv ile de verebilirsin) ----
 STALL_SECONDS = float(os.getenv("AUDIO_STALL_SECONDS", "1.5"))   # Kaç sn sessizlikte restart
-QUEUE_MAX     = int(os.getenv("AUDIO_QUEUE_MAX", "200"))         # Callback->consumer tampon
+QUEUE_MAX     = int(os.getenv("AUDIO_QUEUE_MAX", "200"))         # Callback->consumer halka (blok)
 REOPEN_BACKOFF_MAX = float(os.getenv("AUDIO_REOPEN_BACKOFF_MAX", "3.0"))  # sn
+# "async": callback event loop'u doğrudan uyandırır; "executor": eski thread-pool okuma
+DELIVERY_MODE = os.getenv("AUDIO_DELIVERY", "async").lower()
+WAIT_TIMEOUT  = 0.5   # sn; bu aralıkla stall kontrolüne dönülür
+
+# ---- Cihaz adından index çöz ----
+def resolve_device(name: Optional[str]) -> Optional[int]:
+    devs = sd.query_devices()
+    candidates = [(i, d) for i, d in enumerate(devs) if int(d.get("max_input_channels", 0)) > 0]
+    if not name or name.strip().lower() in ("", "default", "auto"):
+        return None  # default input
+    name = name.strip()
+    if name.startswith("#") and name[1:].isdigit():
+        return int(name[1:])
+    lname = name.lower()
+    # tam eşleşme
+    for i, d in candidates:
+        if str(d.get("name", "")).lower() == lname:
+            return i
+    # kısmi eşleşme
+    for i, d in candidates:
+        if lname in str(d.get("name", "")).lower():
+            return i
+    return None
 
-@dataclass
-class CaptureConfig:
-    device_name: Optional[str] = os.getenv("AUDIO_INPUT_DEVICE") or None
-    samplerate: int = int(os.getenv("AUDIO_SAMPLE_RATE", "24000"))  # Realtime için 24kHz
-    channels: int = 1
-    block_ms: int = int(os.getenv("AUDIO_BLOCK_MS", "50"))  # Daha büyük blok
-    dtype: str = "int16"
-    _frames_per_block: int = 0  # Alt çizgi ekleyin
+def input_device_names() -> list:
+    return [f"#{i} {d['name']}" for i, d in enumerate(sd.query_devices())
+            if int(d.get('max_input_channels', 0)) > 0]
 
-    def __post_init__(self):
-        self._frames_per_block = max(1, int(self.samplerate * self.block_ms / 1000))
+def native_rate(device_index: Optional[int], fallback: int) -> int:
+    try:
+        info = sd.query_devices(device_index, "input")
+        return int(round(float(info["default_samplerate"])))
+    except Exception:
+        return fallback
 
-class AudioCapture:
+class AudioCapture(AudioSource):
     def __init__(self, cfg: CaptureConfig):
         self.cfg = cfg
-        self._q: "queue.Queue[np.ndarray]" = queue.Queue(maxsize=QUEUE_MAX)
+        # Tek seferde ayrılan halka; callback karışımı doğrudan buraya yazar
+        self._ring = PcmRingBuffer(QUEUE_MAX, cfg._frames_per_block, cfg.channels)
+        # Cihaz hızı != cfg.samplerate ise frames() çıkışında yeniden örnekle
+        self.device_rate = cfg.samplerate
+        self._device_block = cfg._frames_per_block
+        self._resampler: Optional[PolyphaseResampler] = None
         self._stream: Optional[sd.InputStream] = None
         self._running = False
         self._device_index: Optional[int] = None
         self._last_put = time.monotonic()
         self._reopen_backoff = 0.1  # artan gecikme (maks REOPEN_BACKOFF_MAX)
+        self.delivery = DELIVERY_MODE
+        # async teslim: frames() çalışırken halkayı event loop'tan bekler
+        self._reader: Optional[AsyncRingReader] = None
 
     # ---- Cihaz adından index çöz ----
     def _resolve_device(self, name: Optional[str]) -> Optional[int]:
-        devs = sd.query_devices()
-        candidates = [(i, d) for i, d in enumerate(devs) if int(d.get("max_input_channels", 0)) > 0]
-        if not name or name.strip().lower() in ("", "default", "auto"):
-            return None  # default input
-        name = name.strip()
-        if name.startswith("#") and name[1:].isdigit():
-            return int(name[1:])
-        lname = name.lower()
-        # tam eşleşme
-        for i, d in candidates:
-            if str(d.get("name", "")).lower() == lname:
-                return i
-        # kısmi eşleşme
-        for i, d in candidates:
-            if lname in str(d.get("name", "")).lower():
-                return i
-        return None
+        return resolve_device(name)
+
+    # ---- Cihaz hızı / yeniden örnekleme ----
+    def _native_rate(self) -> int:
+        pref = (self.cfg.device_rate or "native").strip().lower()
+        if pref == "off":
+            return self.cfg.samplerate
+        if pref not in ("native", "auto"):
+            return int(float(pref))
+        return native_rate(self._device_index, self.cfg.samplerate)
+
+    def _configure_rate(self, rate: int):
+        if rate != self.device_rate:
+            self.device_rate = rate
+            self._device_block = max(1, int(rate * self.cfg.block_ms / 1000))
+            self._ring = PcmRingBuffer(QUEUE_MAX, self._device_block, self.cfg.channels)
+            if self._reader is not None:
+                self._reader.attach(self._ring)
+        if rate == self.cfg.samplerate:
+            self._resampler = None
+        elif self._resampler is None or self._resampler.in_rate != rate:
+            self._resampler = PolyphaseResampler(rate, self.cfg.samplerate)
+        else:
+            self._resampler.reset()
 
     def _make_stream(self) -> sd.InputStream:
         return sd.InputStream(
             device=self._device_index,
             channels=self.cfg.channels,
-            samplerate=self.cfg.samplerate,
+            samplerate=self.device_rate,
             dtype=self.cfg.dtype,
-            blocksize=self.cfg._frames_per_block,
+            blocksize=self._device_block,
             latency="low",
             callback=self._callback,
             dither_off=True,
@@ -70,23 +109,36 @@ class AudioCapture:
     def start(self):
         self._device_index = self._resolve_device(self.cfg.device_name)
         if self.cfg.device_name and self._device_index is None:
-            names = [f"#{i} {d['name']}" for i, d in enumerate(sd.query_devices())
-                     if int(d.get('max_input_channels', 0)) > 0]
+            names = input_device_names()
             raise RuntimeError(
                 f"Input device not found: {self.cfg.device_name}\n"
                 f"Available inputs:\n  - " + "\n  - ".join(names) +
                 "\nTip: Use exact name, a substring (e.g. 'blackhole'), or '#index'."
             )
+        self._running = True
         self._open_stream(initial=True)
 
     def _open_stream(self, initial=False):
-        self._stream = self._make_stream()
-        self._stream.start()
+        rate = self._native_rate()
+        self._configure_rate(rate)
+        try:
+            self._stream = self._make_stream()
+            self._stream.start()
+        except Exception as e:
+            if rate == self.cfg.samplerate:
+                raise
+            # native hız açılmadı → host resample'a geri dön
+            print(f"[audio] open at {rate}Hz failed ({e}); falling back to {self.cfg.samplerate}Hz")
+            self._close_stream()
+            self._configure_rate(self.cfg.samplerate)
+            self._stream = self._make_stream()
+            self._stream.start()
         self._last_put = time.monotonic()
         self._reopen_backoff = 0.1
+        rs = f" -> {self.cfg.samplerate}Hz (polyphase)" if self._resampler else ""
         print(f"[audio] {'started' if initial else 'reopened'} device="
               f"{self.cfg.device_name or '(default)'} idx={self._device_index} "
-              f"sr={self.cfg.samplerate}Hz ch={self.cfg.channels} block={self.cfg.block_ms}ms")
+              f"sr={self.device_rate}Hz{rs} ch={self.cfg.channels} block={self.cfg.block_ms}ms")
 
     def _close_stream(self):
         if self._stream:
@@ -114,24 +166,21 @@ class AudioCapture:
     def _callback(self, indata, frames, time_info, status):
         if status:  # overflow/underflow vs.
             print(f"[audio][status] {status!s}")
-        # mono mix
-        if indata.ndim == 2 and indata.shape[1] > 1:
-            x = indata.astype(np.int32).mean(axis=1).astype(np.int16)
-        else:
-            x = indata.reshape(-1).astype(np.int16)
-        try:
-            self._q.put_nowait(x.copy())
-            self._last_put = time.monotonic()
-        except queue.Full:
-            try:
-                _ = self._q.get_nowait()
-                self._q.put_nowait(x.copy())
-                self._last_put = time.monotonic()
-            except queue.Empty:
-                pass
+        # mono mix halkaya yerinde yazılır (blok başına ayırma yok)
+        self._ring.write(indata)
+        self._last_put = time.monotonic()
+
+    def stats(self) -> dict:
+        """Halka doluluğu ve taşma (overrun) sayaçları."""
+        return {**self._ring.stats(), "device_rate": self.device_rate,
+                "samplerate": self.cfg.samplerate}
 
-    async def frames(self) -> AsyncGenerator[bytes, None]:
-        loop = asyncio.get_event_loop()
+    async def frames(self) -> AsyncGenerator[memoryview, None]:
+        """int16 PCM blokları; görünüm bir sonraki bloğa kadar geçerlidir (kopya yok)."""
+        loop = asyncio.get_running_loop()
+        use_async = self.delivery != "executor"
+        if use_async:
+            self._reader = AsyncRingReader(self._ring, loop)
         consecutive_stalls = 0
         while self._running:
             stalled = (time.monotonic() - self._last_put) > STALL_SECONDS
@@ -145,21 +194,37 @@ class AudioCapture:
                 consecutive_stalls = 0
 
             try:
-                arr = await loop.run_in_executor(None, self._q.get, True, 0.5)
-                yield arr.tobytes()
+                if use_async:
+                    view = await self._reader.next(WAIT_TIMEOUT)
+                else:
+                    view = await loop.run_in_executor(None, self._ring.read, WAIT_TIMEOUT)
+            except asyncio.CancelledError:
+                raise
             except Exception:
+                continue
+            if view is None:
                 # timeout: döngü başına dön → stall kontrolü tekrar yapılır
                 continue
+            rs = self._resampler
+            if rs is not None:
+                view = rs.process_pcm16(view)
+                if not len(view):
+                    continue
+            yield view
 
     def stop(self):
         self._running = False
         self._close_stream()
+        if self._reader is not None:
+            self._reader.detach()
 
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--list", action="store_true")
     parser.add_argument("--monitor", type=int, default=0)
+    parser.add_argument("--record", type=float, default=0, help="saniye")
+    parser.add_argument("--out", default="capture.wav")
     args = parser.parse_args()
 
     if args.list:
@@ -171,16 +236,28 @@ if __name__ == "__main__":
     if args.monitor > 0:
         cfg = CaptureConfig()
         cap = AudioCapture(cfg)
-        cap._running = True
         cap.start()
         t0 = time.time()
         try:
             while time.time() - t0 < args.monitor:
-                try:
-                    arr = cap._q.get(timeout=0.2)
-                    rms = float(np.sqrt(np.mean(arr.astype(np.float32) ** 2)))
-                    print(f"RMS: {rms:.1f}")
-                except queue.Empty:
+                view = cap._ring.read(timeout=0.2)
+                if view is None:
                     print("RMS: (yok)")
+                    continue
+                arr = np.frombuffer(view, dtype=np.int16)
+                rms = float(np.sqrt(np.mean(arr.astype(np.float32) ** 2)))
+                print(f"RMS: {rms:.1f}")
         finally:
+            st = cap.stats()
+            print(f"[audio] overruns={st['overruns']} dropped_frames={st['dropped_frames']}")
             cap.stop()
+
+    if args.record > 0:
+        # AUDIO_SOURCE bir dosyaysa bu komut dosyayı hedef hıza çevirip yazar
+        src = open_source(CaptureConfig())
+        src.start()
+        try:
+            n = asyncio.run(record_wav(src, args.record, args.out))
+        finally:
+            src.stop()
+        print(f"[audio] recorded {n / src.samplerate:.2f}s -> {args.out}")
@@ -0,0 +1,60 @@
+# src/audio/g711.py
+import numpy as np
+
+from .resample import PolyphaseResampler
+
+G711_RATE = 8000          # G.711 her zaman 8 kHz
+_BIAS = 0x84
+_CLIP = 32635
+
+
+def _build_ulaw_table() -> np.ndarray:
+    """Tüm int16 değerleri için μ-law baytı (65536 girişli tablo, bir kez)."""
+    x = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    sign = (x < 0).astype(np.int32) << 7
+    mag = np.minimum(np.abs(x), _CLIP) + _BIAS
+    exponent = np.floor(np.log2(mag >> 7)).astype(np.int32)
+    exponent = np.clip(exponent, 0, 7)
+    mantissa = (mag >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def _build_ulaw_decode_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (u >> 4) & 0x07
+    mantissa = u & 0x0F
+    mag = (((mantissa << 3) + _BIAS) << exponent) - _BIAS
+    return np.where(u & 0x80, -mag, mag).astype(np.int16)
+
+
+ULAW_ENCODE = _build_ulaw_table()
+ULAW_DECODE = _build_ulaw_decode_table()
+
+
+def ulaw_encode(pcm: np.ndarray) -> np.ndarray:
+    """int16 → μ-law (uint8), tüm blok tek tablo indekslemesi."""
+    return ULAW_ENCODE[pcm.view(np.uint16)]
+
+
+def ulaw_decode(data) -> np.ndarray:
+    return ULAW_DECODE[np.frombuffer(data, dtype=np.uint8)]
+
+
+class UlawEncoder:
+    """PCM16 blokları → 8 kHz μ-law; yeniden örnekleyici durumu bloklar arası korunur."""
+
+    def __init__(self, in_rate: int):
+        self.in_rate = in_rate
+        self._resampler = PolyphaseResampler(in_rate, G711_RATE) if in_rate != G711_RATE else None
+        self._out = np.zeros(0, dtype=np.uint8)
+
+    def encode(self, block) -> memoryview:
+        if self._resampler is not None:
+            block = self._resampler.process_pcm16(block)
+        x = np.frombuffer(block, dtype=np.int16)
+        n = x.shape[0]
+        if self._out.shape[0] < n:
+            self._out = np.zeros(n, dtype=np.uint8)
+        out = self._out[:n]
+        np.take(ULAW_ENCODE, x.view(np.uint16), out=out)
+        return memoryview(out)
@@ -0,0 +1,272 @@
+# src/audio/manager.py
+import os
+import time
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import AsyncGenerator, Dict, List, Optional
+
+import sounddevice as sd
+
+from .capture import (
+    QUEUE_MAX, STALL_SECONDS, REOPEN_BACKOFF_MAX, WAIT_TIMEOUT,
+    input_device_names, native_rate, resolve_device,
+)
+from .ring import AsyncRingReader, PcmRingBuffer
+from .resample import PolyphaseResampler
+from .source import AudioSource, CaptureConfig
+
+
+@dataclass
+class StreamSpec:
+    """Tek bir etiketli akış: bir cihaz ya da çok kanallı cihazın tek kanalı."""
+    tag: str
+    device: Optional[str] = None        # ad / alt dizgi / "#index"; None = varsayılan giriş
+    channel: Optional[int] = None       # None = grubun açık kanallarının mono karışımı
+    samplerate: int = int(os.getenv("AUDIO_SAMPLE_RATE", "24000"))
+    block_ms: int = int(os.getenv("AUDIO_BLOCK_MS", "50"))
+    # Akış başına STT ayarları; None = backend'in env varsayılanı
+    lang: Optional[str] = None
+    translate_to: Optional[str] = None
+    partial_emit_ms: Optional[int] = None
+
+
+class ManagedStream(AudioSource):
+    """``CaptureManager`` içindeki bir akış; STT backend'lerine ``source`` olarak verilir."""
+
+    def __init__(self, mgr: "CaptureManager", spec: StreamSpec):
+        self.mgr = mgr
+        self.spec = spec
+        self.tag = spec.tag
+        self.cfg = CaptureConfig(device_name=spec.device, samplerate=spec.samplerate,
+                                 channels=1, block_ms=spec.block_ms)
+        self.group: Optional["_DeviceGroup"] = None
+        self.ring: Optional[PcmRingBuffer] = None
+        self._resampler: Optional[PolyphaseResampler] = None
+        self._reader: Optional[AsyncRingReader] = None
+        self._running = False
+
+    def _bind(self, group: "_DeviceGroup"):
+        # grup (yeniden) açılınca halka/yeniden örnekleyici grubun hızına göre kurulur;
+        # kanal seçilmediyse karışım ara tamponu da halkada önceden ayrılır
+        self.group = group
+        channels = group.channels if self.spec.channel is None else 1
+        self.ring = PcmRingBuffer(QUEUE_MAX, group.block_frames, channels)
+        if self._reader is not None:
+            self._reader.attach(self.ring)
+        self._resampler = PolyphaseResampler(group.rate, self.spec.samplerate) \
+            if group.rate != self.spec.samplerate else None
+
+    def start(self):
+        self._running = True
+        self.mgr._acquire(self)
+
+    def stop(self):
+        self._running = False
+        if self._reader is not None:
+            self._reader.detach()
+            self._reader = None
+        self.mgr._release(self)
+
+    async def frames(self) -> AsyncGenerator[memoryview, None]:
+        self._reader = AsyncRingReader(self.ring, asyncio.get_running_loop())
+        while self._running:
+            group = self.group
+            if group is not None:
+                group.check_stall()
+            view = await self._reader.next(WAIT_TIMEOUT)
+            if view is None:
+                continue
+            rs = self._resampler
+            if rs is not None:
+                view = rs.process_pcm16(view)
+                if not len(view):
+                    continue
+            yield view
+
+    def stats(self) -> dict:
+        st = self.ring.stats() if self.ring is not None else {}
+        return {**st, "tag": self.tag, "channel": self.spec.channel,
+                "device_rate": self.group.rate if self.group else None,
+                "samplerate": self.spec.samplerate}
+
+
+class _DeviceGroup:
+    """Bir fiziksel cihaz için tek PortAudio akışı; callback kanalları etiketlere dağıtır."""
+
+    def __init__(self, device_index: Optional[int], device_name: Optional[str], block_ms: int):
+        self.device_index = device_index
+        self.device_name = device_name
+        self.block_ms = block_ms
+        self.members: List[ManagedStream] = []
+        self.rate = 0
+        self.block_frames = 0
+        self.channels = 1
+        self._stream: Optional[sd.InputStream] = None
+        # callback yalnız okur; üyelik değişince kilit altında yeni demet yayımlanır
+        self._routes: tuple = ()
+        self.lock = threading.Lock()
+        self._last_put = time.monotonic()
+        self._next_restart = 0.0
+        self._backoff = 0.1
+        self.restarts = 0
+
+    def _layout(self):
+        try:
+            info = sd.query_devices(self.device_index, "input")
+            max_ch = max(1, int(info.get("max_input_channels", 1)))
+        except Exception:
+            max_ch = 1
+        want = [m.spec.channel for m in self.members if m.spec.channel is not None]
+        # kanal istenmediyse AudioCapture gibi tek kanal
+        return min(max_ch, max(want) + 1) if want else 1
+
+    def open(self):
+        self.rate = native_rate(self.device_index, self.members[0].spec.samplerate)
+        self.block_frames = max(1, int(self.rate * self.block_ms / 1000))
+        self.channels = self._layout()
+        for m in self.members:
+            m._bind(self)
+        self.publish_routes()
+        self._stream = sd.InputStream(
+            device=self.device_index, channels=self.channels, samplerate=self.rate,
+            dtype="int16", blocksize=self.block_frames, latency="low",
+            callback=self._callback, dither_off=True,
+        )
+        self._stream.start()
+        self._last_put = time.monotonic()
+        tags = ",".join(m.tag for m in self.members)
+        print(f"[audio][mgr] opened idx={self.device_index} sr={self.rate}Hz "
+              f"ch={self.channels} tags={tags}")
+
+    @property
+    def is_open(self) -> bool:
+        return self._stream is not None
+
+    def needs_reopen(self) -> bool:
+        """Üyelerin istediği kanal sayısı açık akışınkini aşıyor mu."""
+        return self._layout() > self.channels
+
+    def publish_routes(self):
+        # callback içinde arama yapmamak için (halka, kanal) rotaları önceden
+        self._routes = tuple((m.ring, m.spec.channel) for m in self.members)
+
+    def close(self):
+        if self._stream:
+            try:
+                self._stream.stop()
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"[audio][mgr][status] idx={self.device_index} {status!s}")
+        for ring, ch in self._routes:   # tek okuma: yayımlanmış demetin anlık görüntüsü
+            if ch is None:
+                ring.write(indata)
+            elif ch < indata.shape[1]:
+                ring.write(indata[:, ch])
+        self._last_put = time.monotonic()
+
+    def check_stall(self):
+        # Aynı gruptaki akışlar aynı loop'ta çağırır → tek restart, bloklamadan backoff
+        now = time.monotonic()
+        if self._stream is None or (now - self._last_put) <= STALL_SECONDS or now < self._next_restart:
+            return
+        with self.lock:
+            if not self.members:
+                return
+            self.close()
+            self.restarts += 1
+            try:
+                self.open()
+                self._backoff = 0.1
+                print(f"[audio][mgr] idx={self.device_index} restarted after stall")
+            except Exception as e:
+                print(f"[audio][mgr][ERROR] restart failed idx={self.device_index}: {e}")
+                self._next_restart = now + self._backoff
+                self._backoff = min(REOPEN_BACKOFF_MAX, self._backoff * 2.0)
+
+
+class CaptureManager:
+    """Tek süreçte N giriş akışı (cihaz ya da kanal) — tek event loop, cihaz başına tek callback.
+
+    Örnek::
+
+        mgr = CaptureManager()
+        a = mgr.add(StreamSpec("room-a", device="BlackHole 16ch", channel=0))
+        b = mgr.add(StreamSpec("room-b", device="BlackHole 16ch", channel=1))
+        async for chunk in realtime.stream_text(source=a): ...
+    """
+
+    def __init__(self):
+        self.streams: Dict[str, ManagedStream] = {}
+        self._groups: Dict[Optional[int], _DeviceGroup] = {}
+
+    def add(self, spec: StreamSpec) -> ManagedStream:
+        old = self.streams.get(spec.tag)
+        if old is not None and old._running:
+            raise RuntimeError(f"Stream already running: {spec.tag}")
+        s = ManagedStream(self, spec)
+        self.streams[spec.tag] = s
+        return s
+
+    def stream(self, tag: str) -> ManagedStream:
+        return self.streams[tag]
+
+    def remove(self, tag: str) -> None:
+        s = self.streams.pop(tag, None)
+        if s is not None and s._running:
+            s.stop()
+
+    # ---- ManagedStream.start/stop ----
+    def _acquire(self, s: ManagedStream):
+        idx = resolve_device(s.spec.device)
+        if s.spec.device and idx is None:
+            raise RuntimeError(
+                f"Input device not found: {s.spec.device}\n"
+                f"Available inputs:\n  - " + "\n  - ".join(input_device_names())
+            )
+        group = self._groups.get(idx)
+        if group is None:
+            group = _DeviceGroup(idx, s.spec.device, s.spec.block_ms)
+            self._groups[idx] = group
+        with group.lock:
+            if s in group.members:
+                return
+            group.members.append(s)
+            if not group.is_open:
+                group.open()
+            elif group.needs_reopen():
+                # yalnız gereken kanal sayısı artınca yeniden aç (diğer odalarda kısa kesinti)
+                group.close()
+                group.open()
+            else:
+                # açık akışa yalnız rota ekle; diğer üyelerin sesi kesilmez
+                s._bind(group)
+                group.publish_routes()
+
+    def _release(self, s: ManagedStream):
+        group = s.group
+        if group is None:
+            return
+        with group.lock:
+            if s not in group.members:
+                return
+            group.members.remove(s)
+            s.group = None
+            if group.members:
+                group.publish_routes()   # kanal sayısı küçülse de yeniden açılmaz
+            else:
+                group.close()
+                self._groups.pop(group.device_index, None)
+
+    def stop(self):
+        for s in list(self.streams.values()):
+            if s._running:
+                s.stop()
+
+    def stats(self) -> dict:
+        return {tag: s.stats() for tag, s in self.streams.items()}
@@ -0,0 +1,109 @@
+# src/audio/resample.py
+from math import gcd
+from typing import Dict, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _design_filter(up: int, down: int, taps_per_phase: int, beta: float) -> np.ndarray:
+    """Kaiser pencereli sinc alçak geçiren (up kat örneklenmiş hızda)."""
+    n_taps = up * taps_per_phase
+    cutoff = 0.5 / max(up, down) * 0.92      # Nyquist'in biraz altı
+    t = np.arange(n_taps, dtype=np.float64) - (n_taps - 1) / 2.0
+    h = 2.0 * cutoff * np.sinc(2.0 * cutoff * t) * np.kaiser(n_taps, beta)
+    return h * (up / h.sum())                  # DC kazancı = 1 (her faz için ~1)
+
+
+class PolyphaseResampler:
+    """Durum tutan (bloklar arası) vektörize polifaz yeniden örnekleyici.
+
+    ``in_rate`` → ``out_rate``; oran ``up/down`` olarak sadeleştirilir. Filtre
+    geçmişi (son ``taps-1`` örnek) bloklar arasında korunur, yani ardışık
+    blokların çıktısı tek parça işlenmiş sinyalle aynıdır.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, taps_per_phase: int = 24, beta: float = 8.0):
+        g = gcd(int(in_rate), int(out_rate))
+        self.in_rate, self.out_rate = int(in_rate), int(out_rate)
+        self.up, self.down = self.out_rate // g, self.in_rate // g
+        self.taps = int(taps_per_phase)
+
+        h = _design_filter(self.up, self.down, self.taps, beta)
+        # faz p: h[p], h[p+up], ... ; pencere artan sırada geldiği için ters çevrili
+        self._phases = h.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32).copy()
+
+        self._hist = np.zeros(self.taps - 1, dtype=np.float32)
+        self._pos = 0                      # sıradaki çıktının konumu (1/up örnek biriminde)
+        self._plans: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+        self._work = np.zeros(0, dtype=np.float32)
+        self._out_f32 = np.zeros(0, dtype=np.float32)
+        self._out_i16 = np.zeros(0, dtype=np.int16)
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def reset(self) -> None:
+        self._hist[:] = 0.0
+        self._pos = 0
+
+    def _plan(self, pos0: int, n_in: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Blok boyu sabitken pos0 birkaç değer arasında döner → planı önbellekle
+        key = (pos0, n_in)
+        plan = self._plans.get(key)
+        if plan is None:
+            limit = n_in * self.up
+            k = max(0, -(-(limit - pos0) // self.down))
+            pos = pos0 + self.down * np.arange(k, dtype=np.int64)
+            plan = (pos // self.up, self._phases[pos % self.up])
+            if len(self._plans) > 64:
+                self._plans.clear()
+            self._plans[key] = plan
+        return plan
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """float32 blok → float32 çıktı (görünüm; bir sonraki çağrıya kadar geçerli)."""
+        n = int(x.shape[0])
+        if self.passthrough or n == 0:
+            return x.astype(np.float32, copy=False)
+        h = self.taps - 1
+        need = h + n
+        if self._work.shape[0] < need:
+            self._work = np.zeros(need, dtype=np.float32)
+        work = self._work[:need]
+        work[:h] = self._hist
+        work[h:] = x
+
+        idx, coefs = self._plan(self._pos, n)
+        k = idx.shape[0]
+        if self._out_f32.shape[0] < k:
+            self._out_f32 = np.zeros(k, dtype=np.float32)
+        out = self._out_f32[:k]
+        if k:
+            windows = sliding_window_view(work, self.taps)
+            np.einsum("kt,kt->k", windows[idx], coefs, out=out)
+
+        self._hist[:] = work[n:]
+        self._pos = self._pos + k * self.down - n * self.up
+        return out
+
+    def process_pcm16(self, block) -> memoryview:
+        """int16 PCM (bytes/memoryview) → hedef hızda int16 PCM bayt görünümü."""
+        x = np.frombuffer(block, dtype=np.int16)
+        if self.passthrough:
+            return memoryview(x).cast("B")
+        y = self.process(x.astype(np.float32))
+        k = y.shape[0]
+        if self._out_i16.shape[0] < k:
+            self._out_i16 = np.zeros(k, dtype=np.int16)
+        out = self._out_i16[:k]
+        np.clip(np.rint(y), -32768, 32767, out=y)
+        np.copyto(out, y, casting="unsafe")
+        return memoryview(out).cast("B")
+
+    def process_float32(self, block) -> np.ndarray:
+        """int16 PCM → [-1, 1] float32 (whisper girişi gibi)."""
+        x = np.frombuffer(block, dtype=np.int16).astype(np.float32)
+        x *= 1.0 / 32768.0
+        return self.process(x)
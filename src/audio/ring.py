@@ -0,0 +1,180 @@
+# src/audio/ring.py
+import asyncio
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+
+
+def downmix_into(src: np.ndarray, dst: np.ndarray, scratch: Optional[np.ndarray] = None) -> None:
+    """(frames[, channels]) int16 bloğu ``dst``'ye mono olarak yaz (ayırmasız)."""
+    if src.ndim == 1:
+        np.copyto(dst, src, casting="unsafe")
+    elif src.shape[1] == 1:
+        np.copyto(dst, src[:, 0], casting="unsafe")
+    else:
+        n = dst.shape[0]
+        mix = scratch[:n] if scratch is not None and n <= scratch.shape[0] \
+            else np.empty(n, dtype=np.int32)
+        np.sum(src, axis=1, dtype=np.int32, out=mix)
+        np.floor_divide(mix, src.shape[1], out=mix)
+        np.copyto(dst, mix, casting="unsafe")
+
+
+class PcmRingBuffer:
+    """PortAudio callback -> tüketici arası sabit boyutlu int16 halka tampon.
+
+    Tampon bir kez ayrılır; callback her bloğu doğrudan boş bir slota (gerekirse
+    kanalları karıştırarak) yazar. ``read()`` kopya yerine slotun ``memoryview``'unu
+    döner; görünüm bir sonraki ``read()`` çağrısına kadar geçerlidir ve o slot bu
+    sürede yazılmaz. Boş slot kalmazsa en eski bekleyen blok atılır, slotu yeni bloğa
+    verilir (drop-oldest). Bekleyen bloklar slot sırasından bağımsız, FIFO tutulur.
+    """
+
+    def __init__(self, slots: int, frames_per_slot: int, channels: int = 1):
+        # En az 3 slot: biri tüketicide, biri yazılan, biri bekleyen
+        self.slots = max(3, int(slots))
+        self.frames_per_slot = max(1, int(frames_per_slot))
+        self.channels = max(1, int(channels))
+
+        self._buf = np.zeros((self.slots, self.frames_per_slot), dtype=np.int16)
+        self._lens = [0] * self.slots
+        # Çok kanallı karışım için int32 ara tampon (taşmayı önler)
+        self._mix = np.zeros(self.frames_per_slot, dtype=np.int32) if self.channels > 1 else None
+
+        # Bekleyen slotlar: sabit boy dairesel FIFO (callback'te ayırma yok)
+        self._fifo = [0] * self.slots
+        self._head = 0
+        self._pending = 0
+        self._free = list(range(self.slots - 1, -1, -1))
+        self._held = -1            # tüketicinin elindeki (son read() edilen) slot
+        self._cond = threading.Condition(threading.Lock())
+        # Yazımdan sonra (kilit dışında) çağrılır; asyncio tüketicisini uyandırmak için
+        self.on_write: Optional[Callable[[], None]] = None
+
+        # Sayaçlar
+        self.blocks_written = 0
+        self.overruns = 0          # tüketici yetişemedi → en eski blok atıldı
+        self.dropped_frames = 0
+
+    def _pop_pending(self) -> int:
+        slot = self._fifo[self._head]
+        self._head = (self._head + 1) % self.slots
+        self._pending -= 1
+        return slot
+
+    # ---- Üretici (PortAudio thread) ----
+    def write(self, indata: np.ndarray) -> None:
+        """(frames, channels) bloğunu mono int16 olarak halkaya yaz."""
+        total = int(indata.shape[0])
+        off = 0
+        while off < total:
+            n = min(self.frames_per_slot, total - off)
+            with self._cond:
+                if self._free:
+                    slot = self._free.pop()
+                else:
+                    # tüketici yetişemedi → en eski bekleyen blok atılır (tutulan slot hariç)
+                    slot = self._pop_pending()
+                    self.dropped_frames += self._lens[slot]
+                    self.overruns += 1
+                downmix_into(indata[off:off + n], self._buf[slot, :n], self._mix)
+                self._lens[slot] = n
+                self._fifo[(self._head + self._pending) % self.slots] = slot
+                self._pending += 1
+                self.blocks_written += 1
+                self._cond.notify()
+            off += n
+        cb = self.on_write
+        if cb is not None:
+            cb()
+
+    # ---- Tüketici ----
+    def read(self, timeout: Optional[float] = None) -> Optional[memoryview]:
+        """Sıradaki bloğun bayt görünümü; zaman aşımında None."""
+        with self._cond:
+            if not self._pending:
+                if not self._cond.wait_for(lambda: self._pending > 0, timeout):
+                    return None
+            slot = self._pop_pending()
+            if self._held >= 0:
+                self._free.append(self._held)   # önceki görünüm artık geçersiz
+            self._held = slot
+            n = self._lens[slot]
+        return memoryview(self._buf[slot, :n]).cast("B")
+
+    def read_nowait(self) -> Optional[memoryview]:
+        return self.read(timeout=0)
+
+    def backlog(self) -> int:
+        with self._cond:
+            return self._pending
+
+    def clear(self) -> None:
+        with self._cond:
+            while self._pending:
+                self._free.append(self._pop_pending())
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "slots": self.slots,
+                "backlog": self._pending,
+                "blocks_written": self.blocks_written,
+                "overruns": self.overruns,
+                "dropped_frames": self.dropped_frames,
+            }
+
+
+class AsyncRingReader:
+    """Halkayı event loop'tan thread-pool'suz bekler.
+
+    Yazıcı (PortAudio thread) yalnız tüketici park etmişken loop'u
+    ``call_soon_threadsafe`` ile uyandırır.
+    """
+
+    def __init__(self, ring: PcmRingBuffer, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._parked = False
+        self.ring = ring
+        self.attach(ring)
+
+    def attach(self, ring: PcmRingBuffer) -> None:
+        """Halka değişirse (ör. cihaz hızı değişti) yeni halkaya bağlan."""
+        self.ring = ring
+        ring.on_write = self._notify
+
+    def detach(self) -> None:
+        self.ring.on_write = None
+        self.wake()
+
+    def _notify(self):
+        if self._parked:
+            self._parked = False
+            self.wake()
+
+    def wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass  # loop kapanmış
+
+    async def next(self, timeout: float) -> Optional[memoryview]:
+        view = self.ring.read_nowait()
+        if view is not None:
+            return view
+        self._wake.clear()
+        self._parked = True
+        # park etmeden önce gelen blok kaçmasın
+        view = self.ring.read_nowait()
+        if view is not None:
+            self._parked = False
+            return view
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._parked = False
+        return self.ring.read_nowait()
@@ -0,0 +1,221 @@
+# src/audio/source.py
+import os
+import time
+import wave
+import struct
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional, Tuple
+
+import numpy as np
+
+from .ring import downmix_into
+from .resample import PolyphaseResampler
+
+# ---- Kaynak seçimi ----
+# "device" (varsayılan) ya da tekrar oynatılacak .wav/.pcm dosya yolu
+AUDIO_SOURCE = os.getenv("AUDIO_SOURCE", "device")
+REPLAY_SPEED = float(os.getenv("AUDIO_REPLAY_SPEED", "1.0"))   # 1.0 = gerçek zaman, 0 = olabildiğince hızlı
+REPLAY_LOOP = os.getenv("AUDIO_REPLAY_LOOP", "0") == "1"
+REPLAY_PCM_RATE = int(os.getenv("AUDIO_REPLAY_PCM_RATE", "24000"))  # ham .pcm için
+
+
+@dataclass
+class CaptureConfig:
+    device_name: Optional[str] = os.getenv("AUDIO_INPUT_DEVICE") or None
+    samplerate: int = int(os.getenv("AUDIO_SAMPLE_RATE", "24000"))  # Realtime için 24kHz
+    channels: int = 1
+    block_ms: int = int(os.getenv("AUDIO_BLOCK_MS", "50"))  # Daha büyük blok
+    dtype: str = "int16"
+    # Cihazın açılacağı hız: "native" (cihazın varsayılanı), "off" (= samplerate) ya da sayı
+    device_rate: str = os.getenv("AUDIO_DEVICE_RATE", "native")
+    _frames_per_block: int = 0  # Alt çizgi ekleyin
+
+    def __post_init__(self):
+        self._frames_per_block = max(1, int(self.samplerate * self.block_ms / 1000))
+
+
+class AudioSource:
+    """Ses kaynağı arayüzü: ``cfg.samplerate`` hızında mono int16 PCM blokları.
+
+    ``frames()`` bayt görünümü (memoryview) üretir; görünüm bir sonraki bloğa
+    kadar geçerlidir. STT backend'leri kaynağı kendisi ``start()``/``stop()`` eder.
+    """
+
+    cfg: CaptureConfig
+
+    @property
+    def samplerate(self) -> int:
+        return self.cfg.samplerate
+
+    def start(self):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+    async def frames(self) -> AsyncGenerator[memoryview, None]:
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    def stats(self) -> dict:
+        return {}
+
+
+# ---- WAV/PCM tekrar oynatma ----
+def _wav_layout(path: str) -> Tuple[int, int, int, int]:
+    """RIFF başlığından (data_offset, n_frames, channels, samplerate)."""
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"Not a WAV file: {path}")
+        fmt = None
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                raise ValueError(f"WAV has no data chunk: {path}")
+            cid, size = struct.unpack("<4sI", head)
+            if cid == b"fmt ":
+                body = f.read(size)
+                tag, ch, rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                if tag == 0xFFFE and len(body) >= 26:  # WAVE_FORMAT_EXTENSIBLE
+                    tag = struct.unpack("<H", body[24:26])[0]
+                fmt = (tag, ch, rate, bits)
+            elif cid == b"data":
+                if fmt is None:
+                    raise ValueError(f"WAV data before fmt chunk: {path}")
+                tag, ch, rate, bits = fmt
+                if tag != 1 or bits != 16:
+                    raise ValueError(f"Only 16-bit PCM WAV is supported (tag={tag}, bits={bits})")
+                return f.tell(), size // (2 * ch), ch, rate
+            else:
+                f.seek(size + (size & 1), 1)
+
+
+def open_pcm(path: str, pcm_rate: int = REPLAY_PCM_RATE,
+             pcm_channels: int = 1) -> Tuple[np.memmap, int]:
+    """WAV ya da ham PCM → ((frames, channels) int16 memmap, samplerate)."""
+    if path.lower().endswith(".wav"):
+        offset, n_frames, ch, rate = _wav_layout(path)
+    else:
+        offset, ch, rate = 0, pcm_channels, pcm_rate
+        n_frames = (os.path.getsize(path) // (2 * ch))
+    return np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(n_frames, ch)), rate
+
+
+class FileSource(AudioSource):
+    """WAV/ham PCM dosyasını ``np.memmap`` ile cihaz yokmuş gibi oynatır.
+
+    ``speed=1.0`` gerçek zamanlı, ``speed=0`` olabildiğince hızlı; ``loop=True``
+    dosya bitince başa sarar (yük testleri için).
+    """
+
+    def __init__(self, path: str, cfg: Optional[CaptureConfig] = None,
+                 speed: float = REPLAY_SPEED, loop: bool = REPLAY_LOOP,
+                 pcm_rate: int = REPLAY_PCM_RATE, pcm_channels: int = 1):
+        self.cfg = cfg or CaptureConfig()
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self._pcm_rate = pcm_rate
+        self._pcm_channels = pcm_channels
+        self._data: Optional[np.memmap] = None
+        self.file_rate = self.cfg.samplerate
+        self._resampler: Optional[PolyphaseResampler] = None
+        self._running = False
+        self.blocks = 0
+        self.frames_read = 0
+        self._t_start = 0.0
+
+    def start(self):
+        if self._data is not None:
+            self._running = True
+            return
+        self._data, rate = open_pcm(self.path, self._pcm_rate, self._pcm_channels)
+        n_frames, ch = self._data.shape
+        self.file_rate = rate
+        self._block_frames = max(1, int(rate * self.cfg.block_ms / 1000))
+        self._block = np.zeros(self._block_frames, dtype=np.int16)
+        self._mix = np.zeros(self._block_frames, dtype=np.int32) if ch > 1 else None
+        if rate != self.cfg.samplerate:
+            self._resampler = PolyphaseResampler(rate, self.cfg.samplerate)
+        self._running = True
+        print(f"[audio] replay {self.path} sr={rate}Hz ch={ch} "
+              f"dur={n_frames / rate:.1f}s speed={'max' if self.speed <= 0 else self.speed}")
+
+    def stop(self):
+        self._running = False
+        self._data = None
+
+    async def frames(self) -> AsyncGenerator[memoryview, None]:
+        data = self._data
+        if data is None:
+            return
+        total = data.shape[0]
+        pos = 0
+        sent = 0  # dosya hızında gönderilen örnek (tempo için)
+        self._t_start = t0 = time.monotonic()
+        while self._running:
+            if pos >= total:
+                if not self.loop or total == 0:
+                    break
+                pos = 0
+            n = min(self._block_frames, total - pos)
+            blk = self._block[:n]
+            downmix_into(data[pos:pos + n], blk, self._mix)
+            pos += n
+            sent += n
+            self.blocks += 1
+            self.frames_read += n
+
+            view = memoryview(blk).cast("B")
+            if self._resampler is not None:
+                view = self._resampler.process_pcm16(view)
+
+            if self.speed > 0:
+                due = t0 + sent / self.file_rate / self.speed
+                delay = due - time.monotonic()
+                await asyncio.sleep(delay if delay > 0 else 0)
+            else:
+                await asyncio.sleep(0)
+            if len(view):
+                yield view
+
+    def stats(self) -> dict:
+        wall = max(1e-9, time.monotonic() - self._t_start) if self._t_start else 0.0
+        audio_sec = self.frames_read / self.file_rate if self.file_rate else 0.0
+        return {
+            "blocks": self.blocks,
+            "audio_sec": round(audio_sec, 2),
+            "x_realtime": round(audio_sec / wall, 2) if wall else 0.0,
+        }
+
+
+def open_source(cfg: Optional[CaptureConfig] = None, spec: Optional[str] = None) -> AudioSource:
+    """``AUDIO_SOURCE``'a göre cihaz ya da dosya kaynağı (başlatılmamış)."""
+    cfg = cfg or CaptureConfig()
+    spec = (spec if spec is not None else AUDIO_SOURCE).strip()
+    if spec.lower() in ("", "device", "mic"):
+        from .capture import AudioCapture  # sounddevice yalnız cihaz için gerekli
+        return AudioCapture(cfg)
+    return FileSource(spec, cfg)
+
+
+async def record_wav(source: AudioSource, seconds: float, path: str) -> int:
+    """Kaynağı ``seconds`` boyunca akış halinde WAV'a yazar; yazılan örnek sayısını döner."""
+    limit = int(seconds * source.samplerate)
+    written = 0
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(source.samplerate)
+        async for view in source.frames():
+            n = len(view) // 2
+            if written + n > limit:
+                view = view[:(limit - written) * 2]
+                n = limit - written
+            wf.writeframesraw(view)
+            written += n
+            if written >= limit:
+                break
+    return written
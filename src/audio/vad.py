@@ -0,0 +1,146 @@
+# src/audio/vad.py
+import os
+from dataclasses import dataclass
+from typing import AsyncGenerator, AsyncIterator, Optional
+
+import numpy as np
+
+
+@dataclass
+class VadConfig:
+    energy_db: float = float(os.getenv("VAD_ENERGY_DB", "-45"))        # dBFS mutlak eşik
+    noise_margin_db: float = float(os.getenv("VAD_NOISE_MARGIN_DB", "8"))  # gürültü tabanı + pay
+    zcr_max: float = float(os.getenv("VAD_ZCR_MAX", "0.35"))           # yüksek ZCR + düşük enerji = hışırtı
+    hangover_ms: int = int(os.getenv("VAD_HANGOVER_MS", "400"))        # konuşma bitince açık kalma
+    preroll_ms: int = int(os.getenv("VAD_PREROLL_MS", "300"))          # başlangıçtan önce gönderilecek
+    keepalive_ms: int = int(os.getenv("VAD_KEEPALIVE_MS", "5000"))     # sessizlikte arada bir sessiz blok
+
+
+class VadGate:
+    """Enerji + sıfır geçiş oranı (ZCR) ile yerel konuşma kapısı.
+
+    Yalnız konuşma bloklarını (önünde pre-roll, arkasında hangover) geçirir;
+    uzun sessizlikte ``keepalive_ms``'de bir sıfır blok yollar.
+    """
+
+    def __init__(self, samplerate: int, block_frames: int, cfg: Optional[VadConfig] = None):
+        self.cfg = cfg or VadConfig()
+        self.sr = samplerate
+        self.block_frames = max(1, block_frames)
+        block_ms = 1000.0 * self.block_frames / self.sr
+
+        self._hang_blocks = max(0, int(round(self.cfg.hangover_ms / block_ms)))
+        self._keepalive_blocks = max(1, int(round(self.cfg.keepalive_ms / block_ms))) \
+            if self.cfg.keepalive_ms > 0 else 0
+
+        # Pre-roll: önceden ayrılmış slotlar (çağrı başına ayırma yok). Yeniden örneklenen
+        # bloklar bir örnek uzun olabilir; slot bu yüzden block_frames + 1
+        self._pre_n = max(0, int(round(self.cfg.preroll_ms / block_ms)))
+        self._pre = np.zeros((max(1, self._pre_n), self.block_frames + 1), dtype=np.int16)
+        self._pre_lens = [0] * max(1, self._pre_n)
+        self._pre_head = 0
+        self._pre_count = 0
+
+        self._silence = memoryview(np.zeros(self.block_frames, dtype=np.int16)).cast("B")
+        self._f32 = np.zeros(self.block_frames + 1, dtype=np.float32)
+
+        self._noise_db = self.cfg.energy_db - self.cfg.noise_margin_db
+        self._hang = 0
+        self._since_send = 0
+        self.active = False
+
+        # Sayaçlar
+        self.passed_bytes = 0
+        self.suppressed_bytes = 0
+        self.keepalive_bytes = 0
+        self.segments = 0
+
+    # ---- Özellikler ----
+    def _features(self, x: np.ndarray):
+        n = x.shape[0]
+        f = self._f32[:n] if n <= self._f32.shape[0] else np.empty(n, dtype=np.float32)
+        np.multiply(x, 1.0 / 32768.0, out=f, casting="unsafe")
+        rms2 = float(np.dot(f, f)) / max(1, n)
+        db = 10.0 * np.log10(rms2 + 1e-12)
+        sb = np.signbit(x)
+        zcr = float(np.count_nonzero(sb[1:] != sb[:-1])) / max(1, n - 1)
+        return db, zcr
+
+    def is_speech(self, block: memoryview) -> bool:
+        x = np.frombuffer(block, dtype=np.int16)
+        if x.size == 0:
+            return False
+        db, zcr = self._features(x)
+        thr = max(self.cfg.energy_db, self._noise_db + self.cfg.noise_margin_db)
+        speech = db > thr and (zcr < self.cfg.zcr_max or db > thr + 10.0)
+        if not speech and not self.active:
+            # gürültü tabanını yavaşça takip et
+            self._noise_db = 0.95 * self._noise_db + 0.05 * db
+        return speech
+
+    # ---- Pre-roll ----
+    def _push_preroll(self, block: memoryview):
+        if self._pre_n == 0:
+            return
+        x = np.frombuffer(block, dtype=np.int16)
+        n = min(x.shape[0], self._pre.shape[1])
+        self._pre[self._pre_head, :n] = x[:n]
+        self._pre_lens[self._pre_head] = n
+        self._pre_head = (self._pre_head + 1) % self._pre_n
+        self._pre_count = min(self._pre_count + 1, self._pre_n)
+
+    def _drain_preroll(self):
+        start = (self._pre_head - self._pre_count) % max(1, self._pre_n)
+        for k in range(self._pre_count):
+            i = (start + k) % self._pre_n
+            yield memoryview(self._pre[i, :self._pre_lens[i]]).cast("B")
+        self._pre_count = 0
+
+    # ---- Kapı ----
+    async def filter(self, frames: AsyncIterator[memoryview]) -> AsyncGenerator[memoryview, None]:
+        """``AudioCapture.frames()`` çıktısını süz; gönderilecek blokları üret."""
+        async for block in frames:
+            if self.is_speech(block):
+                if not self.active:
+                    self.active = True
+                    self.segments += 1
+                    for pre in self._drain_preroll():
+                        # pre-roll zaten bastırılmış sayılmıştı → geri al
+                        self.suppressed_bytes -= len(pre)
+                        self.passed_bytes += len(pre)
+                        yield pre
+                self._hang = self._hang_blocks
+            elif self.active:
+                if self._hang > 0:
+                    self._hang -= 1
+                else:
+                    self.active = False
+
+            if self.active:
+                self.passed_bytes += len(block)
+                self._since_send = 0
+                yield block
+                continue
+
+            self.suppressed_bytes += len(block)
+            self._push_preroll(block)
+            self._since_send += 1
+            if self._keepalive_blocks and self._since_send >= self._keepalive_blocks:
+                self._since_send = 0
+                self.keepalive_bytes += len(self._silence)
+                yield self._silence
+
+    def suppressed_seconds(self) -> float:
+        return self.suppressed_bytes / 2.0 / self.sr
+
+    def stats(self) -> dict:
+        total = self.passed_bytes + self.suppressed_bytes
+        return {
+            "active": self.active,
+            "segments": self.segments,
+            "passed_bytes": self.passed_bytes,
+            "suppressed_bytes": self.suppressed_bytes,
+            "suppressed_sec": round(self.suppressed_seconds(), 2),
+            "keepalive_bytes": self.keepalive_bytes,
+            "suppressed_ratio": round(self.suppressed_bytes / total, 3) if total else 0.0,
+        }
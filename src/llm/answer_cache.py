@@ -0,0 +1,222 @@
+# src/llm/answer_cache.py
+"""Soru → cevap önbelleği: aynı (ya da az farklı sözcüklerle) tekrar sorulan soruya
+LLM'e gitmeden cevap.
+
+Anahtar: normalize edilmiş soru + yakın bağlamın SimHash parmak izi. Soru önce
+birebir (normalize) aranır, yoksa karakter 3-gram MinHash imzalarıyla tahmini
+Jaccard benzerliği ``sim`` eşiğini geçen en yakın kayıt alınır; bağlamın SimHash
+Hamming uzaklığı ``ctx_bits``'i aşıyorsa eşleşme sayılmaz (konu değişmiş). MinHash
+yalnız ön eleme; kararı ``details_match`` verir: sayılar ve olumsuzluk sözcükleri aynı
+olmalı, kip/nezaket sözcükleri (could/can, please/lütfen) tek biçime katlanır, geri
+kalan içerik sözcüklerinde en fazla bir eklenen/çıkan sözcüğe izin verilir. Böylece
+"Could you repeat the deadline?" ≈ "Can you please repeat the deadline?" eşleşir;
+"frontend/backend", "4521/4522", "onaylandı/onaylanmadı" gibi bir sözcüğün yerine
+başkası geçen sorular (iki sözcük farkı) ıskalanır.
+LRU + TTL ile sınırlı; ``path`` verilirse JSON dosyasına yazılır ve açılışta okunur.
+"""
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "0") == "1"
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+ANSWER_CACHE_TTL_SEC = float(os.getenv("ANSWER_CACHE_TTL_SEC", "1800"))
+ANSWER_CACHE_SIM = float(os.getenv("ANSWER_CACHE_SIM", "0.5"))          # tahmini Jaccard ön elemesi
+ANSWER_CACHE_CTX_BITS = int(os.getenv("ANSWER_CACHE_CTX_BITS", "20"))    # 64 = bağlamı yok say
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "")                   # boş = yalnız bellek
+
+_NGRAM = 3
+_PERMS = 64
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(0x5EED)   # sabit tohum: imzalar çalıştırmalar arasında aynı
+_A = _rng.integers(1, (1 << 31) - 1, _PERMS, dtype=np.uint64)
+_B = _rng.integers(0, (1 << 31) - 1, _PERMS, dtype=np.uint64)
+_PUNCT = re.compile(r"[^\w\s]+")
+_SPACE = re.compile(r"\s+")
+_DIGITS = re.compile(r"\d+")
+# yakın eşleşmede farklı olabilecek, anlamı değiştirmeyen sözcükler
+_FILLER = frozenset("peki acaba şey yani ya hani lütfen rica so well um uh please kindly just "
+                    "ok okay the a an".split())
+# kip sözcükleri tek biçime katlanır: "could you" = "can you" = "would you"
+_MODALS = dict.fromkeys("can could would will may might".split(), "can")
+# iki soruda aynı olmalı; "don't" normalize sonrası "don t" olur
+_NEGATION = frozenset("not no never t cannot nothing değil yok hiç".split())
+
+
+def normalize(text: str) -> str:
+    """Küçük harf, noktalamasız, tek boşluklu. "İ".lower() birleşik nokta bırakır, temizlenir."""
+    t = text.lower().replace("i\u0307", "i")
+    return _SPACE.sub(" ", _PUNCT.sub(" ", t)).strip()
+
+
+def minhash(norm: str) -> np.ndarray:
+    """Karakter n-gram kümesinin MinHash imzası (``_PERMS`` adet uint64)."""
+    padded = f" {norm} "
+    grams = {padded[i:i + _NGRAM] for i in range(max(1, len(padded) - _NGRAM + 1))}
+    h = np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+    return ((h[:, None] * _A + _B) % _PRIME).min(axis=0)
+
+
+def simhash(text: str) -> int:
+    """Kelime bazlı 64 bit SimHash; yakın bağlamlar az bitte ayrışır."""
+    words = normalize(text).split()
+    if not words:
+        return 0
+    digests = b"".join(hashlib.blake2b(w.encode(), digest_size=8).digest() for w in words)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(words), 8), axis=1)
+    return int.from_bytes(np.packbits(bits.sum(axis=0) * 2 > len(words)).tobytes(), "big")
+
+
+def _content(norm: str) -> set:
+    return {_MODALS.get(w, w) for w in norm.split()} - _FILLER
+
+
+def details_match(a: str, b: str) -> bool:
+    """İki normalize soru aynı şeyi mi soruyor. Sayılar sırasıyla ve olumsuzluk sözcükleri
+    aynı olmalı; içerik sözcükleri en fazla bir sözcük farklı olabilir (eklenen/çıkan).
+    Bir sözcüğün yerine başkası geçerse fark iki olur: olumsuz fiil (onaylanmadı)
+    olumlusundan (onaylandı) ayrı sözcük olduğundan -ma/-me farkı da böyle ıskalanır."""
+    if _DIGITS.findall(a) != _DIGITS.findall(b):
+        return False
+    ca, cb = _content(a), _content(b)
+    if ca & _NEGATION != cb & _NEGATION:
+        return False
+    return len(ca ^ cb) <= 1
+
+
+class _Entry:
+    __slots__ = ("norm", "sig", "ctx", "answer", "t")
+
+    def __init__(self, norm: str, sig: np.ndarray, ctx: int, answer: str, t: float):
+        self.norm = norm
+        self.sig = sig
+        self.ctx = ctx
+        self.answer = answer
+        self.t = t
+
+
+class AnswerCache:
+    def __init__(self, size: int = ANSWER_CACHE_SIZE, ttl_sec: float = ANSWER_CACHE_TTL_SEC,
+                 sim: float = ANSWER_CACHE_SIM, ctx_bits: int = ANSWER_CACHE_CTX_BITS,
+                 path: str = ANSWER_CACHE_PATH):
+        self.size = max(1, size)
+        self.ttl_sec = ttl_sec
+        self.sim = sim
+        self.ctx_bits = ctx_bits
+        self.path = path
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()   # norm → kayıt, LRU sırası
+
+        # Metrikler
+        self.hits_exact = 0
+        self.hits_near = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        if path:
+            self.load()
+
+    def _alive(self, e: _Entry, now: float) -> bool:
+        return self.ttl_sec <= 0 or now - e.t < self.ttl_sec
+
+    def _ctx_ok(self, e: _Entry, ctx: int) -> bool:
+        return (e.ctx ^ ctx).bit_count() <= self.ctx_bits
+
+    def _find(self, norm: str, ctx: int) -> Tuple[Optional[_Entry], bool]:
+        now = time.time()
+        e = self._entries.get(norm)
+        if e is not None and self._alive(e, now) and self._ctx_ok(e, ctx):
+            return e, True
+        sig = minhash(norm)
+        best, best_sim, dead = None, self.sim, []
+        for key, e in self._entries.items():
+            if not self._alive(e, now):
+                dead.append(key)
+                continue
+            s = float(np.count_nonzero(e.sig == sig)) / _PERMS
+            if s >= best_sim and self._ctx_ok(e, ctx) and details_match(norm, e.norm):
+                best, best_sim = e, s
+        for key in dead:
+            del self._entries[key]
+        self.expired += len(dead)
+        return best, False
+
+    def get(self, question: str, context: str = "", touch: bool = True) -> Optional[str]:
+        """Önbellekteki cevap ya da None. ``touch=False``: sayaç ve LRU sırası değişmez."""
+        norm = normalize(question)
+        if not norm:
+            return None
+        e, exact = self._find(norm, simhash(context))
+        if not touch:
+            return e.answer if e is not None else None
+        if e is None:
+            self.misses += 1
+            return None
+        if exact:
+            self.hits_exact += 1
+        else:
+            self.hits_near += 1
+        self._entries.move_to_end(e.norm)
+        return e.answer
+
+    def put(self, question: str, context: str, answer: str) -> None:
+        norm = normalize(question)
+        if not norm or not answer:
+            return
+        self._entries[norm] = _Entry(norm, minhash(norm), simhash(context), answer, time.time())
+        self._entries.move_to_end(norm)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        if self.path:
+            self.save()
+
+    # ---- Kalıcılık ----
+    def save(self) -> None:
+        rows = [{"q": e.norm, "ctx": f"{e.ctx:016x}", "a": e.answer, "t": e.t}
+                for e in self._entries.values()]
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                rows = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[cache] could not read {self.path}: {e}")
+            return
+        now = time.time()
+        for r in rows:   # dosya LRU sırasında (eskiden yeniye)
+            e = _Entry(r["q"], minhash(r["q"]), int(r["ctx"], 16), r["a"], r["t"])
+            if self._alive(e, now):
+                self._entries[e.norm] = e
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        print(f"[cache] loaded {len(self._entries)} answers from {self.path}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        hits = self.hits_exact + self.hits_near
+        total = hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": hits,
+            "hits_exact": self.hits_exact,
+            "hits_near": self.hits_near,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
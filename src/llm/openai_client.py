@@ -1,17 +1,85 @@
 # src/llm/openai_client.py
+"""OpenAI uyumlu sağlayıcılar üzerinden cevap üretimi.
+
+Akışlı cevapta hedge: birincil sağlayıcı son ilk-token sürelerinin
+``LLM_HEDGE_PERCENTILE`` yüzdeliği içinde ilk parçayı vermezse aynı istek yedek
+sağlayıcıya da gönderilir; ilk parçayı veren kazanır, diğeri iptal edilir.
+Birincil hemen hata verirse sıradaki sağlayıcıya geçilir. ``short_reply`` ve
+``summarize`` yalnız birincili kullanır (spekülatif/arka plan çağrıları ikiye katlanmasın).
+"""
 import os
 import json
-import http.client
+import time
+import asyncio
+from collections import deque
+from typing import AsyncGenerator, Deque, List, Optional
+
+from src.llm.providers import (OPENAI_BASE_URL, Provider, ProviderConfig, StreamInterrupted,
+                               pct, providers_from_env)
+
+LLM_HEDGE = os.getenv("LLM_HEDGE", "1") == "1"                              # >1 sağlayıcı varsa
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.9"))      # birincil ilk-token
+LLM_HEDGE_DEFAULT_MS = float(os.getenv("LLM_HEDGE_DEFAULT_MS", "1500"))     # yeterli örnek yokken
+LLM_HEDGE_MIN_MS = float(os.getenv("LLM_HEDGE_MIN_MS", "300"))              # alt sınır
+_HEDGE_MIN_SAMPLES = 5
+_ERROR_REPLY = "Sorry, I couldn't process that request."  # İngilizce hata mesajı
+_PARSE_ERROR_REPLY = "Sorry, I couldn't understand that."
+ERROR_REPLIES = (_ERROR_REPLY, _PARSE_ERROR_REPLY)   # önbelleğe alınmaz
+_END = object()   # akış bitti
+
+
+class _Fail:
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
 
 
 class OpenAIClient:
-    def __init__(self, api_key: str | None = None, model: str | None = None):
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY", "")
-        self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o")
-        if not self.api_key:
-            raise RuntimeError("OPENAI_API_KEY missing")
+    def __init__(self, api_key: str | None = None, model: str | None = None,
+                 base_url: str | None = None, providers: Optional[List[ProviderConfig]] = None,
+                 hedge: bool = LLM_HEDGE):
+        if providers is None:
+            if api_key or model or base_url:
+                cfg = ProviderConfig("openai", (base_url or OPENAI_BASE_URL).rstrip("/"),
+                                     model or os.getenv("OPENAI_MODEL", "gpt-4o"),
+                                     api_key or os.getenv("OPENAI_API_KEY", ""))
+                if not cfg.api_key:
+                    raise RuntimeError("OPENAI_API_KEY missing")
+                providers = [cfg]
+            else:
+                providers = providers_from_env()
+        self.providers = [Provider(cfg) for cfg in providers]
+        self.primary = self.providers[0]
+        self.model = self.primary.model
+        self.hedge = hedge and len(self.providers) > 1
 
-    async def short_reply(self, context: str, question: str, lang: str) -> str:
+        # Metrikler
+        self.calls = 0
+        self.hedges = 0            # yedeğe de gönderilen istek
+        self.hedge_wins = 0        # yedeğin kazandığı
+        self.failovers = 0         # hata sonrası sıradakine geçiş
+        self.cancelled = 0         # kaybeden (iptal edilen) istek
+        self._ttft: Deque[float] = deque(maxlen=256)     # istek → ilk token (ms), hedge dahil
+        self._total: Deque[float] = deque(maxlen=256)    # istek → son token (ms)
+
+    async def warm_up(self) -> None:
+        """Tüm sağlayıcılarda TCP/TLS (ve HTTP/2) el sıkışmasını ilk sorudan önce yap."""
+        await asyncio.gather(*(p.warm_up() for p in self.providers))
+
+    async def aclose(self) -> None:
+        for p in self.providers:
+            await p.aclose()
+
+    def hedge_delay(self) -> float:
+        """Yedeğe gönderim öncesi beklenecek süre (sn)."""
+        ttft = self.primary.ttft
+        ms = LLM_HEDGE_DEFAULT_MS
+        if len(ttft) >= _HEDGE_MIN_SAMPLES:
+            ms = pct(ttft, LLM_HEDGE_PERCENTILE)
+        return max(ms, LLM_HEDGE_MIN_MS) / 1000.0
+
+    def _body(self, context: str, question: str, lang: str) -> dict:
         system = (
             "You are a live meeting copilot.\n"
             "- You receive Turkish context/questions (translated from English speech)\n"
@@ -31,8 +99,7 @@ class OpenAIClient:
             f"3. Keep response short for speaking aloud"
         )
 
-        body = {
-            "model": self.model,
+        return {
             "messages": [
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
@@ -41,25 +108,13 @@ class OpenAIClient:
             "temperature": 0.7
         }
 
-        conn = http.client.HTTPSConnection("api.openai.com")
-        try:
-            conn.request(
-                "POST", "/v1/chat/completions",
-                body=json.dumps(body),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.api_key}",
-                },
-            )
-            resp = conn.getresponse()
-            data = resp.read().decode("utf-8")
-
-            if resp.status != 200:
-                print(f"[OpenAI API Error] Status: {resp.status}, Response: {data}")
-                return "Sorry, I couldn't process that request."  # İngilizce hata mesajı
-
-        finally:
-            conn.close()
+    async def short_reply(self, context: str, question: str, lang: str) -> str:
+        body = self._body(context, question, lang)
+        self.calls += 1
+        status, data = await self.primary.post("/chat/completions", body)
+        if status != 200:
+            print(f"[OpenAI API Error] Status: {status}, Response: {data}")
+            return _ERROR_REPLY
 
         try:
             payload = json.loads(data)
@@ -70,4 +125,141 @@ class OpenAIClient:
         except json.JSONDecodeError as e:
             print(f"[JSON Error] {e}, Raw data: {data}")
 
-        return "Sorry, I couldn't understand that."  # İngilizce hata mesajı
\ No newline at end of file
+        return _PARSE_ERROR_REPLY
+
+    async def summarize(self, summary: str, text: str, max_words: int = 90) -> str:
+        """Toplantı özetini yeni transcript parçasıyla günceller (bağlam katlaması için)."""
+        body = {
+            "messages": [
+                {"role": "system", "content": (
+                    "You maintain a running summary of a live meeting transcript.\n"
+                    "- Merge the new transcript into the current summary\n"
+                    "- Keep names, numbers, dates, decisions and open questions\n"
+                    f"- At most {max_words} words, same language as the transcript, no preamble"
+                )},
+                {"role": "user", "content": (
+                    f"Current summary: {summary or '(empty)'}\n\n"
+                    f"New transcript: {text}\n\n"
+                    f"Updated summary:"
+                )},
+            ],
+            "max_tokens": max_words * 2,
+            "temperature": 0.2
+        }
+        self.calls += 1
+        status, data = await self.primary.post("/chat/completions", body)
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}: {data[:200]}")
+        return json.loads(data)["choices"][0]["message"]["content"].strip()
+
+    async def _pump(self, provider: Provider, body: dict, queue: asyncio.Queue, first: set) -> None:
+        try:
+            async for delta in provider.stream(body):
+                first.add(provider)
+                queue.put_nowait((provider, delta))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # bozuk gövde, beklenmedik httpx/json hatası da dahil: okuyucu hep bir öğe alır
+            queue.put_nowait((provider, _Fail(e)))
+        else:
+            queue.put_nowait((provider, _END))
+
+    async def stream_reply(self, context: str, question: str, lang: str) -> AsyncGenerator[str, None]:
+        """Cevabı geldikçe parça parça üretir (SSE). İlk parçayı veren sağlayıcı kazanır;
+        hepsi hata verirse tek parça olarak hata cevabı. Kazananın akışı yarıda koparsa
+        ``StreamInterrupted`` (eksik cevap başarılı sayılmasın)."""
+        body = self._body(context, question, lang)
+        self.calls += 1
+        t0 = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = {}
+        started = {}
+        first: set = set()             # ilk parçası gelmiş sağlayıcılar (TTFT'si kayıtlı)
+        waiting = list(self.providers[1:])
+        hedged = False
+        winner: Optional[Provider] = None
+
+        def launch(p: Provider) -> None:
+            started[p] = time.perf_counter()
+            tasks[p] = asyncio.ensure_future(self._pump(p, body, queue, first))
+
+        launch(self.primary)
+        try:
+            deadline = time.perf_counter() + self.hedge_delay()
+            while winner is None:
+                timeout = None
+                if self.hedge and not hedged and waiting:
+                    timeout = max(0.0, deadline - time.perf_counter())
+                try:
+                    p, item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    hedged = True
+                    self.hedges += 1
+                    alt = waiting.pop(0)
+                    print(f"[llm] no first token from {self.primary.name} in "
+                          f"{(time.perf_counter() - t0) * 1000:.0f} ms, hedging to {alt.name}")
+                    launch(alt)
+                    continue
+                if isinstance(item, str):
+                    winner = p
+                    self._ttft.append((time.perf_counter() - t0) * 1000)
+                    p.wins += 1
+                    if p is not self.primary and hedged:
+                        self.hedge_wins += 1
+                    now = time.perf_counter()
+                    for other, task in tasks.items():
+                        if other is not p and not task.done():
+                            task.cancel()
+                            other.cancelled += 1
+                            self.cancelled += 1
+                            if other not in first:
+                                # sansürlü örnek: ilk token en az bu kadar sürecekti; yalnız
+                                # kazananlar sayılsa yavaş sağlayıcının yüzdeliği iyimser kalır
+                                other.ttft.append((now - started[other]) * 1000)
+                    yield item
+                    break
+                # parça vermeden bitti ya da hata
+                print(f"[OpenAI API Error] {p.name}: "
+                      f"{item.error if isinstance(item, _Fail) else 'empty reply'}")
+                if any(not t.done() for t in tasks.values()):
+                    continue   # diğer istek hâlâ uçuşta
+                if not waiting:
+                    yield _ERROR_REPLY
+                    return
+                self.failovers += 1
+                launch(waiting.pop(0))
+            while True:
+                p, item = await queue.get()
+                if p is not winner:
+                    continue
+                if isinstance(item, _Fail):
+                    print(f"[OpenAI API Error] {p.name}: stream interrupted: {item.error!r}")
+                    if isinstance(item.error, StreamInterrupted):
+                        raise item.error
+                    raise StreamInterrupted(f"{p.name}: {item.error!r}") from item.error
+                if not isinstance(item, str):
+                    break
+                yield item
+            self._total.append((time.perf_counter() - t0) * 1000)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": sum(p.retries for p in self.providers),
+            "failures": sum(p.failures for p in self.providers),
+            "ttft_ms_p50": pct(self._ttft, 0.5),
+            "ttft_ms_p95": pct(self._ttft, 0.95),
+            "ttft_ms_p99": pct(self._ttft, 0.99),
+            "total_ms_p50": pct(self._total, 0.5),
+            "total_ms_p95": pct(self._total, 0.95),
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "cancelled": self.cancelled,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+            "providers": {p.name: p.stats() for p in self.providers},
+        }
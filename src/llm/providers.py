@@ -0,0 +1,239 @@
+# src/llm/providers.py
+"""OpenAI uyumlu chat completions uç noktaları (OpenAI, yerel çıkarım sunucusu, ...).
+
+Her sağlayıcının kendi kalıcı httpx havuzu, yeniden deneme politikası ve gecikme
+istatistikleri vardır. Sağlayıcılar ``LLM_PROVIDERS`` ile sıralanır (ilki birincil):
+
+    LLM_PROVIDERS=openai,local
+    LLM_LOCAL_BASE_URL=http://127.0.0.1:8000/v1
+    LLM_LOCAL_MODEL=qwen2.5-7b-instruct       (boşsa OPENAI_MODEL)
+    LLM_LOCAL_API_KEY=                         (boşsa Authorization gönderilmez)
+
+``openai`` sağlayıcısı OPENAI_BASE_URL / OPENAI_API_KEY / OPENAI_MODEL okur.
+"""
+import os
+import json
+import time
+import random
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncGenerator, Deque, List, Optional, Tuple
+
+import httpx
+
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "auto").lower()                   # auto | 1 | 0
+OPENAI_POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", "4"))                 # kalıcı bağlantı sayısı
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "3"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "15"))
+OPENAI_RETRIES = int(os.getenv("OPENAI_RETRIES", "2"))
+OPENAI_RETRY_BASE_MS = int(os.getenv("OPENAI_RETRY_BASE_MS", "250"))
+LLM_PROVIDERS = os.getenv("LLM_PROVIDERS", "openai")
+_RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_RETRY_AFTER_MAX = 5.0
+
+
+class ProviderError(RuntimeError):
+    pass
+
+
+class StreamInterrupted(ProviderError):
+    """Akış ilk parçadan sonra koptu: gelen metin eksik, cevap sayılmamalı."""
+
+
+@dataclass
+class ProviderConfig:
+    name: str
+    base_url: str
+    model: str
+    api_key: str = ""
+
+
+def providers_from_env() -> List[ProviderConfig]:
+    out = []
+    for name in [x.strip().lower() for x in LLM_PROVIDERS.split(",") if x.strip()]:
+        if name == "openai":
+            cfg = ProviderConfig(name, OPENAI_BASE_URL, os.getenv("OPENAI_MODEL", "gpt-4o"),
+                                 os.getenv("OPENAI_API_KEY", ""))
+            if not cfg.api_key:
+                raise RuntimeError("OPENAI_API_KEY missing")
+        else:
+            prefix = f"LLM_{name.upper()}_"
+            base_url = os.getenv(prefix + "BASE_URL", "")
+            if not base_url:
+                raise RuntimeError(f"{prefix}BASE_URL missing for provider '{name}'")
+            model = os.getenv(prefix + "MODEL", "") or os.getenv("OPENAI_MODEL", "gpt-4o")
+            cfg = ProviderConfig(name, base_url.rstrip("/"), model, os.getenv(prefix + "API_KEY", ""))
+        out.append(cfg)
+    if not out:
+        raise RuntimeError("LLM_PROVIDERS is empty")
+    return out
+
+
+def _http2_enabled() -> bool:
+    if OPENAI_HTTP2 in ("0", "false", "off"):
+        return False
+    try:
+        import h2  # noqa: F401   httpx[http2]
+    except ImportError:
+        if OPENAI_HTTP2 in ("1", "true", "on"):
+            print("[llm] OPENAI_HTTP2=1 but h2 is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def _retry_delay(attempt: int, resp: Optional[httpx.Response] = None) -> float:
+    """Tam jitter'lı üstel geri çekilme; sunucu Retry-After verdiyse o (üst sınırlı)."""
+    retry_after = resp.headers.get("retry-after", "") if resp is not None else ""
+    if retry_after.replace(".", "", 1).isdigit():
+        return min(float(retry_after), _RETRY_AFTER_MAX)
+    return random.uniform(0, OPENAI_RETRY_BASE_MS * 2 ** attempt / 1000.0)
+
+
+async def _sse_deltas(resp: httpx.Response) -> AsyncGenerator[str, None]:
+    """chat/completions SSE akışından içerik parçaları. [DONE] sonrası da gövde sonuna
+    kadar okunur; yarım bırakılan yanıtın bağlantısı havuza dönmez."""
+    async for line in resp.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            continue
+        try:
+            choices = json.loads(data).get("choices") or []
+        except json.JSONDecodeError:
+            continue
+        if choices:
+            delta = (choices[0].get("delta") or {}).get("content")
+            if delta:
+                yield delta
+
+
+def pct(xs, p: float) -> float:
+    xs = sorted(xs)
+    return round(xs[min(len(xs) - 1, int(p * len(xs)))], 1) if xs else 0.0
+
+
+class Provider:
+    def __init__(self, cfg: ProviderConfig):
+        self.cfg = cfg
+        self.name = cfg.name
+        self.model = cfg.model
+        # Olay döngüsüne bağlı; ilk kullanımda (döngü içinde) açılır
+        self._http: Optional[httpx.AsyncClient] = None
+
+        # Metrikler
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.wins = 0          # ilk parçayı veren istek (hedge/yedek geçişte kazanan)
+        self.cancelled = 0     # kaybedip iptal edilen istek
+        self.ttft: Deque[float] = deque(maxlen=256)     # istek → ilk token (ms)
+        self.total: Deque[float] = deque(maxlen=256)    # istek → son token / tam yanıt (ms)
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            headers = {"Authorization": f"Bearer {self.cfg.api_key}"} if self.cfg.api_key else {}
+            self._http = httpx.AsyncClient(
+                base_url=self.cfg.base_url,
+                http2=_http2_enabled(),
+                timeout=httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=OPENAI_POOL_SIZE,
+                                    max_keepalive_connections=OPENAI_POOL_SIZE,
+                                    keepalive_expiry=120.0),
+                headers=headers,
+            )
+        return self._http
+
+    async def warm_up(self) -> None:
+        """TCP/TLS (ve HTTP/2) el sıkışmasını ilk sorudan önce yap; token harcamaz."""
+        try:
+            resp = await self._client().get("/models")
+            print(f"[llm] {self.name} connection ready "
+                  f"({resp.http_version}, {resp.elapsed.total_seconds() * 1000:.0f} ms)")
+        except httpx.HTTPError as e:
+            print(f"[llm] {self.name} warm-up failed: {e!r}")
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def post(self, path: str, body: dict) -> Tuple[int, str]:
+        """Geçici hatalarda (bağlantı, zaman aşımı, 429/5xx) jitter'lı üstel geri çekilme."""
+        body = dict(body, model=self.model)
+        self.calls += 1
+        t0 = time.perf_counter()
+        for attempt in range(OPENAI_RETRIES + 1):
+            try:
+                resp = await self._client().post(path, json=body)
+            except httpx.TransportError as e:
+                if attempt == OPENAI_RETRIES:
+                    self.failures += 1
+                    return 0, repr(e)
+                print(f"[llm] {self.name}: {e!r}, retry {attempt + 1}/{OPENAI_RETRIES}")
+                delay = _retry_delay(attempt)
+            else:
+                if resp.status_code not in _RETRY_STATUS or attempt == OPENAI_RETRIES:
+                    if resp.status_code == 200:
+                        self.total.append((time.perf_counter() - t0) * 1000)
+                    else:
+                        self.failures += 1
+                    return resp.status_code, resp.text
+                print(f"[llm] {self.name}: HTTP {resp.status_code}, retry {attempt + 1}/{OPENAI_RETRIES}")
+                delay = _retry_delay(attempt, resp)
+            self.retries += 1
+            await asyncio.sleep(delay)
+        return 0, ""
+
+    async def stream(self, body: dict) -> AsyncGenerator[str, None]:
+        """SSE içerik parçaları. Yeniden deneme yalnız ilk parçadan önce; hiç parça
+        gelmeden vazgeçilirse ``ProviderError``, akış yarıda koparsa ``StreamInterrupted``."""
+        body = dict(body, model=self.model, stream=True)
+        self.calls += 1
+        t0 = time.perf_counter()
+        got = False
+        for attempt in range(OPENAI_RETRIES + 1):
+            try:
+                async with self._client().stream("POST", "/chat/completions", json=body) as resp:
+                    if resp.status_code == 200:
+                        async for delta in _sse_deltas(resp):
+                            if not got:
+                                got = True
+                                self.ttft.append((time.perf_counter() - t0) * 1000)
+                            yield delta
+                        self.total.append((time.perf_counter() - t0) * 1000)
+                        return
+                    data = (await resp.aread()).decode("utf-8", "replace")
+                    if resp.status_code not in _RETRY_STATUS or attempt == OPENAI_RETRIES:
+                        self.failures += 1
+                        raise ProviderError(f"HTTP {resp.status_code}: {data[:200]}")
+                    print(f"[llm] {self.name}: HTTP {resp.status_code}, retry {attempt + 1}/{OPENAI_RETRIES}")
+                    delay = _retry_delay(attempt, resp)
+            except httpx.TransportError as e:
+                if got:
+                    self.failures += 1
+                    raise StreamInterrupted(repr(e)) from e
+                if attempt == OPENAI_RETRIES:
+                    self.failures += 1
+                    raise ProviderError(repr(e)) from e
+                print(f"[llm] {self.name}: {e!r}, retry {attempt + 1}/{OPENAI_RETRIES}")
+                delay = _retry_delay(attempt)
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "wins": self.wins,
+            "cancelled": self.cancelled,
+            "ttft_ms_p50": pct(self.ttft, 0.5),
+            "ttft_ms_p95": pct(self.ttft, 0.95),
+            "ttft_ms_p99": pct(self.ttft, 0.99),
+            "total_ms_p50": pct(self.total, 0.5),
+            "total_ms_p95": pct(self.total, 0.95),
+        }
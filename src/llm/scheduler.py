@@ -0,0 +1,229 @@
+# src/llm/scheduler.py
+"""NLU ile LLM arasındaki istek zamanlayıcısı.
+
+- Tek uçuş: aynı (grup, anahtar) için kuyrukta/uçuşta iş varsa yenisi ona eklenir.
+- Eskiyen iş iptali: grup başına en yeni ``keep`` iş yaşar, eskiler (kuyrukta ya da
+  çalışıyor) iptal edilir; üç soru art arda gelirse ilk ikisinin cevabı beklenmez.
+- Eşzamanlılık sınırı ve API limitlerine göre iki token kovası (istek/dk, token/dk).
+- Öncelik: yüksek ``priority`` önce, eşitse en yeni soru önce.
+Her iş için kuyrukta bekleme süresi ölçülür ve raporlanır.
+"""
+import os
+import time
+import asyncio
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+LLM_RPM = float(os.getenv("LLM_RPM", "500"))        # istek / dakika (0 = sınırsız)
+LLM_TPM = float(os.getenv("LLM_TPM", "30000"))      # token / dakika (0 = sınırsız)
+LLM_KEEP_LATEST = int(os.getenv("LLM_KEEP_LATEST", "1"))   # grup başına yaşayan en yeni iş
+_BURST_SEC = 10.0                                   # kova kapasitesi = bu kadar saniyelik hak
+
+PRIORITY_ANSWER = 1      # final soru
+PRIORITY_SPEC = 0        # kısmi metinden spekülatif çağrı
+PRIORITY_SUMMARY = -1    # arka plan bağlam özeti
+
+
+def estimate_tokens(*texts: str, completion: int = 150) -> int:
+    """Kaba token tahmini (≈4 karakter/token) + sistem istemi + cevap üst sınırı."""
+    return sum(len(t) for t in texts) // 4 + 100 + completion
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst_sec: float = _BURST_SEC):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_sec)
+        self.tokens = self.capacity
+        self._t = time.monotonic()
+
+    def delay(self, n: float) -> float:
+        """``n`` hak için beklenecek süre (sn); 0 ise hemen alınabilir."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._t) * self.rate)
+        self._t = now
+        n = min(n, self.capacity)   # kapasiteden büyük iş sonsuza dek beklemesin
+        return 0.0 if self.tokens >= n else (n - self.tokens) / self.rate
+
+    def take(self, n: float) -> None:
+        self.tokens -= min(n, self.capacity)
+
+
+class Job:
+    """Zamanlanmış iş; beklenebilir, ``cancel()`` ile kuyruktan düşer ya da uçuşta iptal edilir."""
+
+    __slots__ = ("key", "group", "priority", "cost", "fn", "seq", "future", "task",
+                 "t_submit", "t_start", "merged")
+
+    def __init__(self, fn: Callable[[], Awaitable[Any]], key: Optional[str], group: str,
+                 priority: int, cost: int, seq: int):
+        self.fn = fn
+        self.key = key
+        self.group = group
+        self.priority = priority
+        self.cost = cost
+        self.seq = seq
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.task: Optional[asyncio.Task] = None
+        self.t_submit = time.perf_counter()
+        self.t_start: Optional[float] = None
+        self.merged = 0
+
+    @property
+    def wait_ms(self) -> Optional[float]:
+        return None if self.t_start is None else (self.t_start - self.t_submit) * 1000
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+    def cancel(self) -> bool:
+        return self.future.cancel()
+
+    def result(self):
+        return self.future.result()
+
+    def add_done_callback(self, fn) -> None:
+        self.future.add_done_callback(lambda _f: fn(self))
+
+    def __await__(self):
+        return self.future.__await__()
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, rpm: float = LLM_RPM,
+                 tpm: float = LLM_TPM, keep_latest: int = LLM_KEEP_LATEST):
+        self.max_concurrency = max(1, max_concurrency)
+        self.keep_latest = keep_latest
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._queue: List[Job] = []
+        self._alive: Dict[str, List[Job]] = defaultdict(list)      # grup → bitmemiş işler
+        self._by_key: Dict[Tuple[str, str], Job] = {}
+        self._running = 0
+        self._seq = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrikler
+        self.submitted = 0
+        self.merged = 0
+        self.superseded = 0
+        self.cancelled = 0
+        self.completed = 0
+        self.failed = 0
+        self._wait: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=256))
+
+    def submit(self, fn: Callable[[], Awaitable[Any]], key: Optional[str] = None,
+               group: str = "answer", priority: int = PRIORITY_ANSWER, cost: int = 0) -> Job:
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._dispatch())
+        if key is not None:
+            job = self._by_key.get((group, key))
+            if job is not None and not job.done():
+                job.merged += 1
+                self.merged += 1
+                return job
+        self._seq += 1
+        self.submitted += 1
+        job = Job(fn, key, group, priority, cost, self._seq)
+        job.add_done_callback(self._on_done)
+        if key is not None:
+            self._by_key[(group, key)] = job
+        alive = self._alive[group]
+        alive.append(job)
+        self._queue.append(job)
+        if self.keep_latest > 0:
+            for old in alive[:-self.keep_latest]:
+                if old.cancel():
+                    self.superseded += 1
+        self._wake.set()
+        return job
+
+    def _on_done(self, job: Job) -> None:
+        alive = self._alive[job.group]
+        if job in alive:
+            alive.remove(job)
+        if job.key is not None and self._by_key.get((job.group, job.key)) is job:
+            del self._by_key[(job.group, job.key)]
+        if job in self._queue:
+            self._queue.remove(job)
+        if job.cancelled():
+            self.cancelled += 1
+            if job.task is not None:
+                job.task.cancel()
+
+    def _pick(self) -> Job:
+        return max(self._queue, key=lambda j: (j.priority, j.seq))
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._queue or self._running >= self.max_concurrency:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            d = self._requests.delay(1) if self._requests else 0.0
+            if d <= 0 and self._tokens:
+                d = self._tokens.delay(self._pick().cost)
+            if d > 0:
+                await asyncio.sleep(d)   # beklerken gelen daha öncelikli iş sonra seçilir
+                continue
+            job = self._pick()
+            self._queue.remove(job)
+            if job.done():   # iptal geri çağrısı henüz işlenmedi
+                continue
+            if self._requests:
+                self._requests.take(1)
+            if self._tokens:
+                self._tokens.take(job.cost)
+            job.t_start = time.perf_counter()
+            self._wait[job.group].append(job.wait_ms)
+            self._running += 1
+            job.task = asyncio.ensure_future(self._run(job))
+
+    async def _run(self, job: Job) -> None:
+        try:
+            result = await job.fn()
+        except asyncio.CancelledError:
+            job.cancel()
+        except Exception as e:
+            self.failed += 1
+            if not job.done():
+                job.future.set_exception(e)
+        else:
+            self.completed += 1
+            if not job.done():
+                job.future.set_result(result)
+        finally:
+            self._running -= 1
+            self._wake.set()
+
+    def close(self) -> None:
+        for jobs in list(self._alive.values()):
+            for job in list(jobs):
+                job.cancel()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        def pct(xs, p):
+            xs = sorted(xs)
+            return round(xs[min(len(xs) - 1, int(p * len(xs)))], 1) if xs else 0.0
+        out = {
+            "submitted": self.submitted,
+            "merged": self.merged,
+            "superseded": self.superseded,
+            "cancelled": self.cancelled,          # eskiyenler dahil
+            "completed": self.completed,
+            "failed": self.failed,
+            "queued": len(self._queue),
+            "running": self._running,
+        }
+        for group, xs in self._wait.items():
+            out[f"{group}_wait_ms_p50"] = pct(xs, 0.5)
+            out[f"{group}_wait_ms_p95"] = pct(xs, 0.95)
+        return out
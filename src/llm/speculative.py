@@ -0,0 +1,151 @@
+# src/llm/speculative.py
+"""Kısmi transcript'ten spekülatif cevap: soru gibi görünen kısmi metinde LLM
+çağrısı hemen başlar, metin anlamlı değişirse iptal edilip yeniden başlatılır,
+final metin eşleşirse sonucu kullanılır (terfi).
+
+Kazanç = spekülatif çağrının süresi − finalden sonra beklenen kısım.
+Boşa giden çağrı = iptal edilen ya da bitip kullanılmayan spekülatif çağrı.
+"""
+import os
+import re
+import time
+import asyncio
+from difflib import SequenceMatcher
+from typing import Callable, List, Optional
+
+from ..nlu.question_detect import is_question
+from .scheduler import PRIORITY_SPEC, LLMScheduler, estimate_tokens
+
+SPEC_ENABLED = os.getenv("SPECULATIVE_ANSWERS", "0") == "1"   # isteğe bağlı: çağrıların bir kısmı boşa gider
+SPEC_MIN_WORDS = int(os.getenv("SPEC_MIN_WORDS", "3"))             # daha kısa kısmi metinde başlama
+SPEC_SIMILARITY = float(os.getenv("SPEC_SIMILARITY", "0.85"))      # altı = anlamlı değişiklik
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def similar(a: List[str], b: List[str]) -> float:
+    """Kelime dizileri benzerliği (0..1); noktalama ve büyük/küçük harf yok sayılır."""
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+class _Spec:
+    __slots__ = ("words", "task", "t_start", "t_done")
+
+    def __init__(self, words: List[str], task):   # asyncio.Task ya da scheduler.Job
+        self.words = words
+        self.task = task
+        self.t_start = time.perf_counter()
+        self.t_done: Optional[float] = None
+
+
+class SpeculativeAnswerer:
+    """Konuşma başına tek spekülatif çağrı tutar; ``promote`` finalde onu terfi ettirir."""
+
+    def __init__(self, client, min_words: int = SPEC_MIN_WORDS, similarity: float = SPEC_SIMILARITY,
+                 detect: Callable[[str], bool] = is_question, scheduler: Optional[LLMScheduler] = None):
+        self.client = client
+        self.scheduler = scheduler
+        self.min_words = min_words
+        self.similarity = similarity
+        self.detect = detect
+        self._spec: Optional[_Spec] = None
+
+        # Metrikler
+        self.started = 0
+        self.restarts = 0
+        self.promoted = 0
+        self.cancelled = 0          # uçuştayken iptal
+        self.unused = 0             # bitti ama final eşleşmedi
+        self.direct = 0             # spekülasyonsuz (ya da eşleşmeyen) çağrı
+        self.saved_ms: List[float] = []
+
+    def _launch(self, words: List[str], context: str, question: str, lang: str) -> None:
+        if self.scheduler is not None:
+            # final sorulardan düşük öncelikli; yeni spekülasyon eskisini zamanlayıcıda da eskitir
+            task = self.scheduler.submit(lambda: self.client.short_reply(context, question, lang),
+                                         key=" ".join(words), group="spec", priority=PRIORITY_SPEC,
+                                         cost=estimate_tokens(context, question))
+        else:
+            task = asyncio.ensure_future(self.client.short_reply(context, question, lang))
+        spec = _Spec(words, task)
+        task.add_done_callback(lambda _t: setattr(spec, "t_done", time.perf_counter()))
+        self._spec = spec
+        self.started += 1
+
+    def _drop(self) -> None:
+        spec, self._spec = self._spec, None
+        if spec is None:
+            return
+        if spec.task.done():
+            self.unused += 1
+        else:
+            spec.task.cancel()
+            self.cancelled += 1
+
+    def on_partial(self, text: str, context: str, lang: str) -> None:
+        """Kısmi metin: gerekirse spekülatif çağrıyı başlat / yeniden başlat."""
+        words = _words(text)
+        if len(words) < self.min_words or not self.detect(text):
+            self._drop()
+            return
+        if self._spec is not None:
+            if similar(self._spec.words, words) >= self.similarity:
+                return
+            self._drop()
+            self.restarts += 1
+        self._launch(words, context, text, lang)
+
+    def discard(self) -> None:
+        """Final soru değilse: bekleyen spekülasyonu bırak."""
+        self._drop()
+
+    async def promote(self, text: str) -> Optional[str]:
+        """Soru olan final metin: eşleşen spekülasyonun cevabı, yoksa None (çağıran
+        cevabı kendisi ister; ``direct`` sayılır)."""
+        spec = self._spec
+        t_final = time.perf_counter()
+        if spec is not None and similar(spec.words, _words(text)) >= self.similarity:
+            self._spec = None
+            try:
+                reply = await spec.task
+            except asyncio.CancelledError:
+                if not spec.task.cancelled():   # bizi iptal ettiler, spekülasyonu değil
+                    raise
+                print("[spec] speculative call was cancelled, retrying")
+            except Exception as e:
+                print(f"[spec] speculative call failed, retrying: {e}")
+            else:
+                t_done = spec.t_done or time.perf_counter()
+                call_ms = (t_done - spec.t_start) * 1000
+                waited_ms = max(0.0, (t_done - t_final) * 1000)
+                self.promoted += 1
+                self.saved_ms.append(call_ms - waited_ms)
+                print(f"[spec] promoted: saved {call_ms - waited_ms:.0f} ms of {call_ms:.0f} ms")
+                return reply
+        self._drop()
+        self.direct += 1
+        return None
+
+    def close(self) -> None:
+        self._drop()
+
+    def stats(self) -> dict:
+        xs = sorted(self.saved_ms)
+        wasted = self.cancelled + self.unused
+        return {
+            "started": self.started,
+            "restarts": self.restarts,
+            "promoted": self.promoted,
+            "direct": self.direct,
+            "wasted": wasted,
+            "wasted_cancelled": self.cancelled,
+            "wasted_unused": self.unused,
+            "waste_ratio": round(wasted / self.started, 2) if self.started else 0.0,
+            "saved_ms_total": round(sum(xs)),
+            "saved_ms_p50": round(xs[len(xs) // 2]) if xs else 0,
+        }
@@ -1,20 +1,29 @@
 # src/main.py
 import os
+import re
+import time
+import asyncio
 import threading
 import anyio
 from dotenv import load_dotenv
-from typing import List
 
 from src.nlu.question_detect import is_question
-from src.llm.openai_client import OpenAIClient
+from src.nlu.context import ContextStore
+from src.llm.openai_client import ERROR_REPLIES, OpenAIClient
+from src.llm.providers import StreamInterrupted
+from src.llm.answer_cache import ANSWER_CACHE, AnswerCache, normalize
+from src.llm.scheduler import PRIORITY_SUMMARY, LLMScheduler, estimate_tokens
+from src.llm.speculative import SPEC_ENABLED, SpeculativeAnswerer
 from src.ui.subtitles import (
     start_subtitles_main_thread,
     run_subtitles_mainloop_blocking,
     show_subtitle,
     show_answer,
+    abort_answer,
 )
 from src.hotkey.global_hotkey import start_hotkey
-from src.tts.say import speak
+from src.tts.say import speak_queued, stats as tts_stats
+from src.pipeline import Stage
 
 load_dotenv(override=True)
 
@@ -26,14 +35,166 @@ def choose_stt():
     elif backend == "whisper":
         from src.stt.whisper_fallback import stream_text
         return stream_text
+    elif backend == "local":
+        from src.stt.whisper_local import stream_text
+        return stream_text
     else:
         raise RuntimeError(f"Unknown STT_BACKEND: {backend}")
 
+_SENTENCE_END = re.compile(r"[.!?…](?=\s)")
+
+# Aşama kuyrukları: boy + dolunca politika (block | drop_oldest | skip), bkz. src/pipeline.py
+PIPELINE_DISPLAY_QUEUE = int(os.getenv("PIPELINE_DISPLAY_QUEUE", "64"))
+PIPELINE_DISPLAY_POLICY = os.getenv("PIPELINE_DISPLAY_POLICY", "drop_oldest").lower()
+PIPELINE_DETECT_QUEUE = int(os.getenv("PIPELINE_DETECT_QUEUE", "64"))
+PIPELINE_DETECT_POLICY = os.getenv("PIPELINE_DETECT_POLICY", "drop_oldest").lower()
+PIPELINE_LLM_QUEUE = int(os.getenv("PIPELINE_LLM_QUEUE", "4"))
+PIPELINE_LLM_POLICY = os.getenv("PIPELINE_LLM_POLICY", "drop_oldest").lower()
+PIPELINE_LLM_CONCURRENCY = int(os.getenv("PIPELINE_LLM_CONCURRENCY", "0"))   # 0 = zamanlayıcıdan türet
+PIPELINE_PRESENT_QUEUE = int(os.getenv("PIPELINE_PRESENT_QUEUE", "32"))
+PIPELINE_PRESENT_POLICY = os.getenv("PIPELINE_PRESENT_POLICY", "block").lower()
+
+
+def _llm_stage_concurrency(sched: LLMScheduler) -> int:
+    """LLM aşaması zamanlayıcının çalıştırabildiğinden fazlasını almaz; +1 yuva yalnız
+    bekler: yeni soru zamanlayıcıya ulaşıp uçuştaki eskisini iptal edebilsin."""
+    limit = sched.max_concurrency + 1
+    return min(PIPELINE_LLM_CONCURRENCY, limit) if PIPELINE_LLM_CONCURRENCY > 0 else limit
+
+
+def _is_partial(item) -> bool:
+    return not item[1]
+
+
+def _is_answer_update(event) -> bool:
+    return event[0] == "partial"
+
+
+def present(event) -> None:
+    """Sunum aşaması: ("partial" | "final" | "abort" | "speak", metin)."""
+    kind, text = event
+    if kind == "partial":
+        show_answer(text, final=False)
+    elif kind == "final":
+        show_answer(text, copy_clipboard=True)
+    elif kind == "abort":
+        abort_answer(text)
+    else:
+        speak_queued(text)
+
+
+async def stream_answer(client: OpenAIClient, out: Stage, ctx: str, question: str,
+                        lang: str) -> str:
+    """Cevabı parça parça sunum aşamasına yollar; her tamamlanan cümle TTS'e,
+    tam metin akış bitince panoya gider. İptal edilir ya da akış koparsa ekrandaki
+    kısmi metin panoya gitmeden kaybolur."""
+    t0 = time.perf_counter()
+    ttft = None
+    text, spoken = "", 0
+    try:
+        async for delta in client.stream_reply(ctx, question, lang):
+            if ttft is None:
+                ttft = (time.perf_counter() - t0) * 1000
+            text += delta
+            await out.put(("partial", text))
+            ends = [m.end() for m in _SENTENCE_END.finditer(text, spoken)]
+            if ends:
+                await out.put(("speak", text[spoken:ends[-1]].strip()))
+                spoken = ends[-1]
+    except (asyncio.CancelledError, StreamInterrupted):
+        if text:
+            await out.put(("abort", text))
+        raise
+    if text[spoken:].strip():
+        await out.put(("speak", text[spoken:].strip()))
+    text = text.strip()
+    await out.put(("final", text))
+    print(f"[llm] ttft={ttft or 0:.0f}ms total={(time.perf_counter() - t0) * 1000:.0f}ms")
+    return text
+
+
 async def run_async_worker():
+    """STT → altyazı → soru tespiti → LLM → sunum/TTS; aşamalar sınırlı kuyruklarla
+    bağlı, yavaş LLM/TTS altyazıyı bekletmez."""
     start_hotkey()
     client = OpenAIClient()
+    # bağlantıyı STT açılırken ısıt; ilk sorunun el sıkışma maliyeti olmasın
+    warm = asyncio.ensure_future(client.warm_up())
+    sched = LLMScheduler()
+    spec = SpeculativeAnswerer(client, scheduler=sched) if SPEC_ENABLED else None
+    cache = AnswerCache() if ANSWER_CACHE else None
+    # eski transcript arka planda özete katlanır; özet çağrıları en düşük öncelikte
+    context = ContextStore(summarize=lambda prev, text, words: sched.submit(
+        lambda: client.summarize(prev, text, words), group="summary", priority=PRIORITY_SUMMARY,
+        cost=estimate_tokens(prev, text, completion=words * 2)))
+    lang = "EN"  # kısa cevaplar İngilizce
+
+    async def answer(item):
+        txt, ctx = item
+        reply = await spec.promote(txt) if spec is not None else None
+        if reply is not None:
+            await presenter.put(("final", reply))
+            await presenter.put(("speak", reply))
+        else:
+            # aynı soru uçuştaysa ona katılır; yeni soru gelirse bu iş eskir ve iptal edilir
+            job = sched.submit(lambda: stream_answer(client, presenter, ctx, txt, lang),
+                               key=normalize(txt), cost=estimate_tokens(ctx, txt))
+            try:
+                reply = await job
+            except asyncio.CancelledError:
+                if not job.cancelled():
+                    raise
+                print(f"[sched] superseded: {txt}")
+                return
+            except StreamInterrupted as e:
+                # eksik cevap önbelleğe ve panoya gitmez
+                print(f"[llm] answer interrupted, not cached: {e}")
+                return
+            print(f"[sched] queue wait {job.wait_ms or 0:.0f} ms")
+        if cache is not None and reply not in ERROR_REPLIES:
+            cache.put(txt, ctx, reply)
+
+    async def detect(item):
+        txt, final = item
+        context.add(txt, final=final)
+        if not final:
+            # soru gibi görünen kısmi metinde cevabı şimdiden iste (önbellekte yoksa)
+            if spec is not None:
+                ctx = context.text()
+                if cache is None or cache.get(txt, ctx, touch=False) is None:
+                    spec.on_partial(txt, ctx, lang)
+            return
+
+        if is_question(txt):
+            ctx = context.text()
+            reply = cache.get(txt, ctx) if cache is not None else None
+            if reply is not None:
+                print("[cache] hit")
+                if spec is not None:
+                    spec.discard()
+                await presenter.put(("final", reply))
+                await presenter.put(("speak", reply))
+            else:
+                await llm.put((txt, ctx))
+        elif spec is not None:
+            spec.discard()
+
+    async def display(item):
+        txt, final = item
+        show_subtitle(txt)
+        print(f"[transcript]{' (final)' if final else ''}: {txt}")
+        await detector.put(item)
+
+    presenter = Stage("present", present, PIPELINE_PRESENT_QUEUE, PIPELINE_PRESENT_POLICY,
+                      coalesce=_is_answer_update).start()
+    llm = Stage("llm", answer, PIPELINE_LLM_QUEUE, PIPELINE_LLM_POLICY,
+                concurrency=_llm_stage_concurrency(sched)).start()
+    detector = Stage("detect", detect, PIPELINE_DETECT_QUEUE, PIPELINE_DETECT_POLICY,
+                     coalesce=_is_partial).start()
+    displayer = Stage("display", display, PIPELINE_DISPLAY_QUEUE, PIPELINE_DISPLAY_POLICY,
+                      coalesce=_is_partial).start()
+    stages = (displayer, detector, llm, presenter)
 
-    context_buffer: List[str] = []
     stream_fn = choose_stt()
     stream_iter = stream_fn()
 
@@ -41,27 +202,30 @@ async def run_async_worker():
         raise TypeError("stream_text() async generator döndürmeli.")
 
     try:
+        # STT aşaması: yalnız okur ve altyazı kuyruğuna bırakır, hiçbir aşamayı beklemez
         async for chunk in stream_iter:
             txt = (chunk.text or "").strip()
-            if not txt:
-                continue
-
-            # Altyazıyı güncelle
-            show_subtitle(txt)
-            print(f"[transcript]{' (final)' if chunk.is_final else ''}: {txt}")
-
-            context_buffer.append(txt)
-            if len(" ".join(context_buffer)) > 800:
-                context_buffer[:] = context_buffer[-5:]
-
-            if chunk.is_final and is_question(txt):
-                ctx = " ".join(context_buffer)[-600:]
-                lang = "EN"  # kısa cevaplar İngilizce
-                reply = await client.short_reply(ctx, txt, lang)
-                show_answer(reply, copy_clipboard=True)
-                speak(reply)
+            if txt:
+                await displayer.put((txt, chunk.is_final))
     except RuntimeError as e:
         print(f"[audio][ERROR] {e}")
+    finally:
+        for stage in stages:
+            await stage.close()
+            print(f"[pipeline] {stage.name}: {stage.stats()}")
+        print(f"[tts] {tts_stats()}")
+        if spec is not None:
+            spec.close()
+            print(f"[spec] {spec.stats()}")
+        await context.close()
+        print(f"[context] {context.stats()}")
+        sched.close()
+        print(f"[sched] {sched.stats()}")
+        if cache is not None:
+            print(f"[cache] {cache.stats()}")
+        print(f"[llm] {client.stats()}")
+        warm.cancel()
+        await client.aclose()
 
 def _asyncio_thread():
     anyio.run(run_async_worker)
@@ -0,0 +1,143 @@
+# src/nlu/context.py
+"""Token bütçeli, kayan toplantı bağlamı.
+
+Final transcript'ler segment olarak eklenir; karakter/token sayıları ekleme ve
+çıkarmada güncellenir (O(1)). Son segmentler ``budget_tokens``'ı aşınca en eskiler
+``fold_tokens`` kadar ayrılır ve arka planda özete katlanır (tek seferde bir katlama;
+özetleyici yoksa ya da hata verirse metnin sonu kırpılarak özete eklenir).
+``text()`` = özet + katlanmayı bekleyen metnin kırpılmış sonu + son segmentler + o anki
+kısmi metin; birleştirme yalnız içerik değişince yapılır. Katlama iptal edilirse
+metni bekleyenlere geri döner.
+"""
+import os
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, Tuple
+
+CONTEXT_TOKENS = int(os.getenv("CONTEXT_TOKENS", "300"))                  # son segmentler
+CONTEXT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "120"))  # özet üst sınırı
+CONTEXT_FOLD_TOKENS = int(os.getenv("CONTEXT_FOLD_TOKENS", "150"))        # katlama başına
+
+Summarizer = Callable[[str, str, int], Awaitable[str]]   # (özet, yeni metin, en çok kelime)
+
+
+def count_tokens(text: str) -> int:
+    """Kaba tahmin (≈4 karakter/token); tokenizer gerektirmez."""
+    return len(text) // 4 + 1
+
+
+class ContextStore:
+    def __init__(self, budget_tokens: int = CONTEXT_TOKENS,
+                 summary_tokens: int = CONTEXT_SUMMARY_TOKENS,
+                 fold_tokens: int = CONTEXT_FOLD_TOKENS,
+                 summarize: Optional[Summarizer] = None):
+        self.budget_tokens = budget_tokens
+        self.summary_tokens = summary_tokens
+        self.fold_tokens = min(fold_tokens, budget_tokens)
+        self.summarize = summarize
+        self.summary = ""
+        self.partial = ""
+        self._segments: Deque[Tuple[str, int]] = deque()
+        self._pending: Deque[str] = deque()          # özete katlanmayı bekleyen
+        self._folding = ""                           # şu an özetlenen metin
+        self._fold_task: Optional[asyncio.Task] = None
+        self._recent: Optional[str] = ""             # son segmentlerin birleşimi (None = kirli)
+
+        # O(1) sayaçlar
+        self.tokens = 0
+        self.chars = 0
+
+        # Metrikler
+        self.folds = 0
+        self.folded_tokens = 0
+        self.fold_failures = 0
+
+    def add(self, text: str, final: bool = True) -> None:
+        text = text.strip()
+        if not final:
+            self.partial = text
+            return
+        self.partial = ""
+        if not text:
+            return
+        n = count_tokens(text)
+        self._segments.append((text, n))
+        self.tokens += n
+        self.chars += len(text) + 1
+        self._recent = None
+        if self.tokens > self.budget_tokens:
+            self._fold()
+
+    def _fold(self) -> None:
+        freed = 0
+        # en yeni segment her zaman kalır
+        while len(self._segments) > 1 and (freed < self.fold_tokens or self.tokens > self.budget_tokens):
+            text, n = self._segments.popleft()
+            self.tokens -= n
+            self.chars -= len(text) + 1
+            freed += n
+            self._pending.append(text)
+        self._recent = None
+        if self._fold_task is None or self._fold_task.done():
+            self._fold_task = asyncio.ensure_future(self._fold_pending())
+
+    async def _fold_pending(self) -> None:
+        while self._pending:
+            text = self._folding = " ".join(self._pending)
+            self._pending.clear()
+            words = max(10, int(self.summary_tokens * 0.75))
+            summary = None
+            if self.summarize is not None:
+                try:
+                    summary = (await self.summarize(self.summary, text, words)).strip()
+                except asyncio.CancelledError:
+                    self._pending.appendleft(text)   # metin kaybolmasın
+                    self._folding = ""
+                    raise
+                except Exception as e:
+                    self.fold_failures += 1
+                    print(f"[context] summary failed, keeping tail: {e!r}")
+            if not summary:
+                summary = f"{self.summary} {text}".strip()
+            self.summary = summary[-self.summary_tokens * 4:]   # bütçe her durumda korunur
+            self._folding = ""
+            self.folds += 1
+            self.folded_tokens += count_tokens(text)
+
+    def text(self) -> str:
+        """LLM'e gidecek sınırlı bağlam."""
+        if self._recent is None:
+            self._recent = " ".join(t for t, _ in self._segments)
+        parts = []
+        if self.summary:
+            parts.append(f"[Earlier: {self.summary}]")
+        if self._folding or self._pending:
+            # özet henüz gelmedi: ayrılan segmentler düşmesin, özet bütçesi kadar sonu
+            waiting = " ".join([self._folding, *self._pending]).strip()
+            parts.append(waiting[-self.summary_tokens * 4:])
+        if self._recent:
+            parts.append(self._recent)
+        if self.partial:
+            parts.append(self.partial)
+        return " ".join(parts)
+
+    async def close(self) -> None:
+        if self._fold_task is not None:
+            self._fold_task.cancel()
+            try:
+                await self._fold_task
+            except asyncio.CancelledError:
+                pass
+            self._fold_task = None
+
+    def stats(self) -> dict:
+        return {
+            "segments": len(self._segments),
+            "tokens": self.tokens,
+            "chars": self.chars,
+            "summary_tokens": count_tokens(self.summary) if self.summary else 0,
+            "folds": self.folds,
+            "folded_tokens": self.folded_tokens,
+            "fold_failures": self.fold_failures,
+            "pending_fold": len(self._pending),
+        }
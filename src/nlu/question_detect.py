@@ -1,26 +1,78 @@
 # src/nlu/question_detect.py
 import os
+import re
+from typing import Iterable, Optional
 
-# Türkçe soru kalıpları (çünkü transcript Türkçe gelecek)
-TR_QUESTION_PATTERNS = [
-    " mı", " mi", " mu", " mü", " mısın", " misin", " misiniz",
-    " olur mu", " olabilir mi", " anlatır mısınız", " nedir", " nasıl", " ne zaman",
-    "ne", "neden", "nasıl", "kim", "nerede", "ne zaman", "hangi", "kaç"
+# Kelime sınırlı, ekleri bilen soru kalıpları (dil başına). Hepsi tek regex'te derlenir;
+# "ne"/"kim" gibi kısa kökler artık "genel", "kimya", "önemli" içinde eşleşmez.
+_V = "[ıiuü]"   # Türkçe dar ünlüler (ünlü uyumu)
+
+TR_PATTERNS = [
+    # soru eki: mı/mi/mu/mü + şahıs/zaman ekleri (mısınız, miydi, mudur, müymüş ...)
+    rf"m{_V}(?:y{_V}m|s{_V}n(?:{_V}z)?|y{_V}z|d{_V}r|l[ae]r|yd{_V}(?:m|n|k|n{_V}z|l[ae]r)?|ym{_V}ş)?",
+    # ne (ünlem "ne güzel" ve "ne ... ne" hariç) ve ekli halleri
+    r"ne(?!\s+(?:güzel|hoş|harika|iyi\s+ki|yazık))",
+    r"ne(?:dir|ydi|ymiş|yi|ye|yin|yle|ler|leri|lerdi|si|reye|rede|reden|resi|reli|resinde)",
+    r"neden(?!\s+ol(?:du|ur|acak|abilir|muş)\b)", r"niye", r"niçin",
+    r"nasıl\w*",
+    r"kim(?:i(?!\s+zaman)|e|in|den|le|ler\w*|dir|di)?",   # "kimse", "kimi zaman" hariç
+    r"hangi\w*",
+    r"kaç(?:a|ta|tan|ıncı\w*|ar|ı|ınız|ımız)?",  # "kaçırdım", "kaçmak" hariç
+    r"acaba",
 ]
 
+_EN_OPEN = r"(?:^|(?<=[.!?]\s))"
+# cümle "." ya da "!" ile bitmiyor ("3.5" gibi sayı içi nokta sınır değil)
+_EN_ASKS = r"(?=(?:[^.!?]|[.!?](?=\S))*(?:\?|$))"
+_EN_SUBJECT = (r"(?:i|you|we|they|he|she|it|there|this|that|these|those|the|"
+               r"our|your|my|his|her|their|its|any\w*|some\w*|every\w*)")
 
-def is_question(txt: str) -> bool:
-    """Türkçe metinde soru var mı kontrol et (çünkü transcript Türkçe)"""
-    t = (txt or "").strip().lower()
-    if not t:
-        return False
+EN_PATTERNS = [
+    # cümle başında soru sözcüğü ("What a great idea!", "How nice" ünlem, soru değil)
+    _EN_OPEN + r"(?:what(?!\s+an?\s)|why|how(?!\s+(?:nice|great|cool|lovely|kind|sweet)\b)|"
+    r"when|where|who|whom|whose|which)" + _EN_ASKS,
+    # cümle başında yardımcı fiil + özne: "Do the report by Friday.", "Should be fine." soru değil
+    _EN_OPEN + r"(?:can|could|would|will|shall|should|do|does|did|is|are|was|were|have|has|"
+    r"may|might)\s+" + _EN_SUBJECT + _EN_ASKS,
+    # cümle içinde de soru olan kalıplar
+    r"(?:can|could|would|will|do|did|have|are|were)\s+(?:you|we|they)",
+    r"is\s+there", r"are\s+there", r"any\s+(?:idea|thoughts|questions)",
+    r"what\s+about", r"how\s+about", r"wondering",
+    r"(?:right|isn't\s+it|aren't\s+they|don't\s+you)\s*$",
+]
+
+PATTERNS = {"tr": TR_PATTERNS, "en": EN_PATTERNS}
+# Kalıpların olası ilk harfleri; kelime başında ön eleme (kalıp eklerken güncelleyin)
+FIRST_LETTERS = {"tr": "mnkha", "en": "wchdiasmr"}
+QUESTION_LANGS = [x.strip() for x in os.getenv("QUESTION_LANGS", "tr,en").lower().split(",") if x.strip()]
+
+
+class QuestionDetector:
+    """Dil kalıplarını tek, büyük/küçük harf duyarsız regex'te derler."""
 
-    # Soru işareti varsa kesin soru
-    if t.endswith("?"):
-        return True
+    def __init__(self, langs: Iterable[str] = QUESTION_LANGS):
+        self.langs = [l for l in langs if l in PATTERNS]
+        parts = [p for lang in self.langs for p in PATTERNS[lang]]
+        first = "".join(sorted({c for lang in self.langs for c in FIRST_LETTERS[lang]}))
+        # kelime başı + ilk harf ön elemesi, alternatiflerin çoğu hiç denenmez
+        self._re = re.compile(r"\?|\b(?=[" + first + r"])(?:" + "|".join(parts) + r")(?!\w)",
+                              re.IGNORECASE)
 
-    # Türkçe soru kalıpları
-    return any(pattern in t for pattern in TR_QUESTION_PATTERNS)
+    def match(self, txt: str) -> Optional[str]:
+        """Eşleşen ilk ipucu (hata ayıklama için) ya da None."""
+        m = self._re.search((txt or "").strip())
+        return m.group(0) if m else None
+
+    def is_question(self, txt: str) -> bool:
+        return self._re.search((txt or "").strip()) is not None
+
+
+_DETECTOR = QuestionDetector()
+
+
+def is_question(txt: str) -> bool:
+    """Metinde soru var mı (soru işareti ya da TR/EN soru kalıbı)"""
+    return _DETECTOR.is_question(txt)
 
 
 def decide_lang(context: str, question: str = "") -> str:
@@ -32,4 +84,4 @@ def decide_lang(context: str, question: str = "") -> str:
         return "TR"
 
     # Default: AI yanıtı İngilizce
-    return "EN"
\ No newline at end of file
+    return "EN"
@@ -0,0 +1,167 @@
+# src/pipeline.py
+"""Aşamalı işlem hattı: her aşama kendi görevinde, önündeki sınırlı kuyruktan okur.
+
+Yavaş bir aşama yalnız kendi kuyruğunu doldurur; kuyruk dolunca aşamanın politikası
+uygulanır: ``block`` üreticiyi bekletir (geri basınç), ``drop_oldest`` en eski
+bekleyeni atar, ``skip`` yeni öğeyi reddeder. ``coalesce(item)`` verilirse kuyruğun
+sonundaki öğe ve yeni öğe ikisi de birleştirilebilir olduğunda (örn. aynı cümlenin
+kısmi metinleri) sondaki yenisiyle değiştirilir; yalnız en güncel hali işlenir.
+Aşama başına bekleme (kuyrukta) ve toplam (kuyruğa giriş → iş bitişi) gecikmesi ile
+kuyruk derinliği ölçülür.
+"""
+import time
+import asyncio
+import inspect
+from collections import deque
+from typing import Any, Callable, Deque, Optional, Set, Tuple
+
+POLICIES = ("block", "drop_oldest", "skip")
+
+
+def _pct(xs, p: float) -> float:
+    xs = sorted(xs)
+    return round(xs[min(len(xs) - 1, int(p * len(xs)))], 1) if xs else 0.0
+
+
+class StageQueue:
+    def __init__(self, maxsize: int, policy: str = "drop_oldest",
+                 coalesce: Optional[Callable[[Any], bool]] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown queue policy: {policy} ({' | '.join(POLICIES)})")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.coalesce = coalesce
+        self._items: Deque[Tuple[Any, float]] = deque()   # (öğe, kuyruğa giriş zamanı)
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+
+        # Metrikler
+        self.put_count = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.blocked = 0
+        self.max_depth = 0
+
+    async def put(self, item: Any) -> bool:
+        """``block`` dışındaki politikalarda beklemez. Öğe reddedildiyse False."""
+        self.put_count += 1
+        if self.coalesce is not None and self._items and \
+                self.coalesce(self._items[-1][0]) and self.coalesce(item):
+            self._items[-1] = (item, time.perf_counter())
+            self.coalesced += 1
+            return True
+        if len(self._items) >= self.maxsize:
+            if self.policy == "skip":
+                self.skipped += 1
+                return False
+            if self.policy == "block":
+                self.blocked += 1
+                while len(self._items) >= self.maxsize:
+                    self._writable.clear()
+                    await self._writable.wait()
+            else:
+                while len(self._items) >= self.maxsize:
+                    self._items.popleft()
+                    self.dropped += 1
+        self._items.append((item, time.perf_counter()))
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._readable.set()
+        return True
+
+    async def get(self) -> Tuple[Any, float]:
+        while not self._items:
+            self._readable.clear()
+            await self._readable.wait()
+        entry = self._items.popleft()
+        self._writable.set()
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class Stage:
+    """``handler(item)`` (senkron ya da async) çalıştıran aşama. ``concurrency`` > 1 ise
+    işler ayrı görevlerde, en çok o kadarı aynı anda yürür (örn. LLM akışları)."""
+
+    def __init__(self, name: str, handler: Callable[[Any], Any], maxsize: int,
+                 policy: str = "drop_oldest", coalesce: Optional[Callable[[Any], bool]] = None,
+                 concurrency: int = 1):
+        self.name = name
+        self.handler = handler
+        self.queue = StageQueue(maxsize, policy, coalesce)
+        self.concurrency = max(1, concurrency)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+        # Metrikler
+        self.done = 0
+        self.errors = 0
+        self._wait: Deque[float] = deque(maxlen=512)      # kuyrukta bekleme (ms)
+        self._latency: Deque[float] = deque(maxlen=512)   # kuyruğa giriş → iş bitişi (ms)
+
+    def start(self) -> "Stage":
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def put(self, item: Any) -> bool:
+        return await self.queue.put(item)
+
+    async def _run(self) -> None:
+        while True:
+            item, t_in = await self.queue.get()
+            if self.concurrency == 1:
+                await self._handle(item, t_in)
+                continue
+            await self._slots.acquire()
+            task = asyncio.ensure_future(self._handle(item, t_in))
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._slots.release()
+
+    async def _handle(self, item: Any, t_in: float) -> None:
+        t0 = time.perf_counter()
+        self._wait.append((t0 - t_in) * 1000)
+        try:
+            result = self.handler(item)
+            if inspect.isawaitable(result):
+                await result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:   # tek öğenin hatası aşamayı durdurmasın
+            self.errors += 1
+            print(f"[pipeline][{self.name}][ERROR] {e!r}")
+        else:
+            self.done += 1
+        self._latency.append((time.perf_counter() - t_in) * 1000)
+
+    async def close(self) -> None:
+        tasks = list(self._running) + ([self._task] if self._task is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    def stats(self) -> dict:
+        q = self.queue
+        return {
+            "depth": len(q) + len(self._running),
+            "max_depth": q.max_depth,
+            "in": q.put_count,
+            "done": self.done,
+            "errors": self.errors,
+            "dropped": q.dropped,
+            "skipped": q.skipped,
+            "coalesced": q.coalesced,
+            "blocked": q.blocked,
+            "wait_ms_p50": _pct(self._wait, 0.5),
+            "wait_ms_p95": _pct(self._wait, 0.95),
+            "latency_ms_p50": _pct(self._latency, 0.5),
+            "latency_ms_p95": _pct(self._latency, 0.95),
+        }
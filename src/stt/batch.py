@@ -0,0 +1,316 @@
+# src/stt/batch.py
+"""Toplantı sonrası yüksek kaliteli yeniden transkripsiyon (çevrimdışı, süreç havuzu).
+
+Kayıtlar sessizliklerden ≤ ``--max-seg`` saniyelik parçalara bölünür; parçalar
+tüm dosyalardan tek bir süreç havuzuna dağıtılır (işçiler sesi dosyadan kendisi
+okur, pickle edilen yalnız yol + örnek aralığı). Sonuçlar zaman damgalarıyla
+sırayla birleştirilir.
+
+Kaldığı yerden devam: her dosya için ``<ad>.segments.jsonl`` biten parçaları
+tutar; yeniden çalıştırınca yalnız eksik parçalar çözülür. ``<ad>.txt`` varsa
+dosya tamamen atlanır.
+
+Çalıştır:  python -m src.stt.batch recordings/ --out transcripts/ --workers 4
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..audio.ring import downmix_into
+from ..audio.resample import PolyphaseResampler
+from ..audio.source import open_pcm
+from .rtf import decode_levels
+
+WHISPER_BATCH_MODEL = os.getenv("WHISPER_BATCH_MODEL", "small")
+_SR = 16000
+_EXTS = (".wav", ".pcm")
+
+
+@dataclass
+class SplitConfig:
+    frame_ms: int = 30
+    min_silence_sec: float = 0.5     # bu kadar sessizlik parça sınırı olabilir
+    margin_db: float = 10.0          # gürültü tabanının bu kadar üstü konuşma
+    min_db: float = -50.0
+    max_db: float = -35.0            # eşik tavanı: sessizliği az kayıtta konuşma eşiğin altında kalmasın
+    floor_win_sec: float = 2.0       # gürültü tabanı en sessiz pencereden kestirilir
+    max_seg_sec: float = 28.0        # whisper penceresi 30 sn
+    target_seg_sec: float = 20.0     # kısa parçalar bu boya kadar birleştirilir
+    pad_sec: float = 0.2
+
+
+def _frame_db(data: np.memmap, hop: int, rows: int = 20000) -> np.ndarray:
+    """Çerçeve başına enerji (dBFS); dosya parça parça okunur."""
+    n = data.shape[0] // hop
+    out = np.empty(n, dtype=np.float32)
+    for i in range(0, n, rows):
+        k = min(rows, n - i)
+        blk = data[i * hop:(i + k) * hop].astype(np.float32).mean(axis=1) / 32768.0
+        blk = blk.reshape(k, hop)
+        out[i:i + k] = 10.0 * np.log10(np.einsum("ij,ij->i", blk, blk) / hop + 1e-10)
+    return out
+
+
+def _noise_floor(db: np.ndarray, win: int) -> float:
+    """Pencere başına 10. yüzdelik, en sessiz pencereninki. Dosya geneli yüzdelik
+    sessizliği az kayıtta konuşmaya denk gelir; tek bir duraklama bile tabanı verir."""
+    n = db.size // win
+    if n < 2:
+        return float(np.percentile(db, 10))
+    return float(np.percentile(db[:n * win].reshape(n, win), 10, axis=1).min())
+
+
+def split_on_silence(data: np.memmap, rate: int, cfg: SplitConfig = SplitConfig()) -> List[Tuple[int, int]]:
+    """Konuşma içeren (başlangıç, bitiş) örnek aralıkları, sırayla."""
+    hop = max(1, int(rate * cfg.frame_ms / 1000))
+    db = _frame_db(data, hop)
+    if db.size == 0:
+        return []
+    fps = 1000.0 / cfg.frame_ms
+    floor = _noise_floor(db, max(1, int(cfg.floor_win_sec * fps)))
+    thr = min(cfg.max_db, max(cfg.min_db, floor + cfg.margin_db))
+    voiced = db > thr
+    min_sil = max(1, int(cfg.min_silence_sec * fps))
+    max_len = int(cfg.max_seg_sec * fps)
+    pad = int(cfg.pad_sec * fps)
+
+    # konuşma koşuları; aradaki sessizlik kısaysa birleştir
+    idx = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    runs: List[List[int]] = []
+    for s, e in zip(idx[::2], idx[1::2]):
+        if runs and s - runs[-1][1] < min_sil:
+            runs[-1][1] = e
+        else:
+            runs.append([int(s), int(e)])
+    if not runs and float(db.max()) > cfg.min_db:
+        # hiçbir çerçeve eşiği geçmedi ama dosya sessiz değil: sabit boylu parçalara düş
+        runs = [[0, int(db.size)]]
+
+    # çok uzun koşuları en sessiz çerçeveden böl; (başlangıç, bitiş, baş kesik, son kesik)
+    segs: List[Tuple[int, int, bool, bool]] = []
+    for s, e in runs:
+        forced = False
+        while e - s > max_len:
+            lo = s + max_len // 2
+            cut = lo + int(np.argmin(db[lo:s + max_len]))
+            segs.append((s, cut, forced, True))
+            s, forced = cut, True
+        segs.append((s, e, forced, False))
+
+    # kısa komşuları hedef boya kadar birleştir (bağlam + daha az çağrı)
+    merged: List[list] = []
+    target = int(cfg.target_seg_sec * fps)
+    for s, e, cut_s, cut_e in segs:
+        if merged and e - merged[-1][0] <= target:
+            merged[-1][1], merged[-1][3] = e, cut_e
+        else:
+            merged.append([s, e, cut_s, cut_e])
+
+    # pay yalnız sessizlik sınırlarına: zorunlu kesimde komşu parçalar örtüşmesin
+    n = data.shape[0]
+    return [(max(0, (s - (0 if cut_s else pad)) * hop), min(n, (e + (0 if cut_e else pad)) * hop))
+            for s, e, cut_s, cut_e in merged]
+
+
+# ---- İşçi süreç ----
+_OPTS: Optional[dict] = None
+
+
+def _init_worker(model_size: str, threads: int) -> None:
+    global _OPTS
+    from . import whisper_local as wl
+    if threads > 0:
+        import torch
+        torch.set_num_threads(threads)
+    _OPTS = decode_levels(model_size)[0]    # en yüksek kalite kademesi
+    wl.load_whisper_model(model_size)
+
+
+def _transcribe_segment(path: str, start: int, end: int) -> Tuple[str, float]:
+    from . import whisper_local as wl
+    data, rate = open_pcm(path)
+    seg = np.empty(end - start, dtype=np.int16)
+    downmix_into(data[start:end], seg)
+    pcm = memoryview(seg).cast("B")
+    if rate != _SR:
+        pcm = PolyphaseResampler(rate, _SR).process_pcm16(pcm)
+    audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    t = time.perf_counter()
+    text = wl.decode(audio, opts=_OPTS, strict=True)   # hata kaydedilmesin, tekrar denensin
+    return text, time.perf_counter() - t
+
+
+# ---- Dosya durumu ----
+def _stamp(sec: float) -> str:
+    h, rem = divmod(sec, 3600)
+    m, s = divmod(rem, 60)
+    return f"{int(h):02d}:{int(m):02d}:{s:06.3f}"
+
+
+def _out_path(path: str, out_dir: str, suffix: str) -> str:
+    return os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + suffix)
+
+
+class _FileJob:
+    def __init__(self, path: str, out_dir: str, cfg: SplitConfig, model: str):
+        self.path = path
+        self.txt_path = _out_path(path, out_dir, ".txt")
+        self.log_path = _out_path(path, out_dir, ".segments.jsonl")
+        data, self.rate = open_pcm(path)
+        self.audio_sec = data.shape[0] / self.rate
+        self.segments = split_on_silence(data, self.rate, cfg)
+        del data
+        # plan değişirse (ayar/model/dosya) eski ilerleme geçersiz
+        key = json.dumps([os.path.getsize(path), self.segments, model, cfg.__dict__], sort_keys=True)
+        self.plan = hashlib.sha1(key.encode()).hexdigest()[:12]
+        self.done: Dict[int, str] = {}
+        self._log = None
+
+    def resume(self) -> None:
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            if lines and lines[0].get("plan") == self.plan:
+                self.done = {r["i"]: r["text"] for r in lines[1:] if "i" in r}
+            else:
+                os.remove(self.log_path)
+        new = not os.path.exists(self.log_path)
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        if new:
+            self._log.write(json.dumps({"plan": self.plan, "path": self.path}) + "\n")
+            self._log.flush()
+
+    def record(self, i: int, text: str) -> None:
+        s, e = self.segments[i]
+        self.done[i] = text
+        self._log.write(json.dumps({"i": i, "start": round(s / self.rate, 3),
+                                    "end": round(e / self.rate, 3), "text": text},
+                                   ensure_ascii=False) + "\n")
+        self._log.flush()
+
+    @property
+    def complete(self) -> bool:
+        return len(self.done) == len(self.segments)
+
+    def finish(self) -> None:
+        tmp = self.txt_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for i, (s, e) in enumerate(self.segments):
+                text = self.done.get(i, "")
+                if text:
+                    f.write(f"[{_stamp(s / self.rate)} --> {_stamp(e / self.rate)}] {text}\n")
+        os.replace(tmp, self.txt_path)
+        self.close()
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def _inputs(paths: List[str]) -> List[str]:
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            out += sorted(os.path.join(p, f) for f in os.listdir(p) if f.lower().endswith(_EXTS))
+        else:
+            out.append(p)
+    return out
+
+
+def run(paths: List[str], out_dir: str, workers: int, threads: int,
+        model: str = WHISPER_BATCH_MODEL, cfg: SplitConfig = SplitConfig()) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    t0 = time.perf_counter()
+    jobs: List[_FileJob] = []
+    skipped = 0
+    for path in _inputs(paths):
+        if os.path.exists(_out_path(path, out_dir, ".txt")):
+            skipped += 1
+            continue
+        job = _FileJob(path, out_dir, cfg, model)
+        job.resume()
+        jobs.append(job)
+        print(f"[batch] {path}: {job.audio_sec / 60:.1f} min, {len(job.segments)} segments, "
+              f"{len(job.done)} already done")
+
+    todo = [(j, i) for j in jobs for i in range(len(j.segments)) if i not in j.done]
+    total_audio = sum(j.audio_sec for j in jobs)
+    seg_audio = 0.0
+    decode_sec = 0.0
+    failed = 0
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(model, threads)) as ex:
+        futs = {ex.submit(_transcribe_segment, j.path, *j.segments[i]): (j, i) for j, i in todo}
+        for n, fut in enumerate(as_completed(futs), 1):
+            j, i = futs[fut]
+            try:
+                text, dt = fut.result()
+            except Exception as e:
+                # kaydedilmez: dosya tamamlanmaz, yeniden çalıştırınca bu parça tekrar çözülür
+                failed += 1
+                print(f"[batch][ERROR] {j.path} segment {i}: {e!r}")
+                continue
+            j.record(i, text)
+            s, e = j.segments[i]
+            seg_audio += (e - s) / j.rate
+            decode_sec += dt
+            if n % 10 == 0 or n == len(futs):
+                wall = time.perf_counter() - t0
+                print(f"[batch] {n}/{len(futs)} segments, {seg_audio / 60:.1f} min audio, "
+                      f"x{seg_audio / wall:.1f} realtime")
+            if j.complete:
+                j.finish()
+                print(f"[batch] wrote {j.txt_path}")
+    for j in jobs:
+        if j.complete and j._log is not None:
+            j.finish()   # tüm parçaları önceki çalıştırmada bitmiş dosyalar
+        j.close()
+
+    wall = time.perf_counter() - t0
+    return {
+        "files": len(jobs),
+        "skipped_files": skipped,
+        "segments": len(todo),
+        "failed_segments": failed,
+        "audio_sec": round(total_audio, 1),
+        "decoded_audio_sec": round(seg_audio, 1),
+        "wall_sec": round(wall, 1),
+        "rtf": round(wall / seg_audio, 3) if seg_audio else 0.0,          # duvar saati / ses
+        "x_realtime": round(seg_audio / wall, 1) if wall else 0.0,
+        "worker_rtf": round(decode_sec / seg_audio, 3) if seg_audio else 0.0,  # işçi başına
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Post-meeting re-transcription")
+    ap.add_argument("inputs", nargs="+", help="WAV/PCM dosyaları ya da dizinler")
+    ap.add_argument("--out", default="transcripts")
+    ap.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    ap.add_argument("--threads", type=int, default=2, help="işçi başına torch thread")
+    ap.add_argument("--model", default=WHISPER_BATCH_MODEL)
+    ap.add_argument("--max-seg", type=float, default=28.0)
+    ap.add_argument("--min-silence", type=float, default=0.5)
+    args = ap.parse_args()
+    cfg = SplitConfig(max_seg_sec=args.max_seg, min_silence_sec=args.min_silence,
+                      target_seg_sec=min(SplitConfig.target_seg_sec, args.max_seg))
+    try:
+        st = run(args.inputs, args.out, args.workers, args.threads, args.model, cfg)
+    except KeyboardInterrupt:
+        print("\n[batch] interrupted; rerun the same command to resume")
+        sys.exit(130)
+    print(f"[batch] {st}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 # src/stt/realtime.py
 import os
 import time
-import asyncio, base64, json, inspect, sys
+import asyncio, json, inspect, sys
 from asyncio import Queue
+from collections import deque
+from typing import Optional
 
 # Akan transcript hızını ayarla (ms)
 REALTIME_PARTIAL_EMIT_MS = int(os.getenv("REALTIME_PARTIAL_EMIT_MS", "250"))
@@ -13,6 +15,25 @@ TRANSLATE_TO = (os.getenv("TRANSLATE_TO", "") or "").lower().strip()
 REALTIME_ONLY_TEXT = os.getenv("REALTIME_ONLY_TEXT", "1") == "1"
 REALTIME_DEBUG = os.getenv("REALTIME_DEBUG", "0") == "1"
 FORCE_COMMIT_MS = int(os.getenv("FORCE_COMMIT_MS", "0"))
+# Yerel VAD: sessizliği websocket'e hiç göndermez (server_vad yine çalışır)
+REALTIME_LOCAL_VAD = os.getenv("REALTIME_LOCAL_VAD", "0") == "1"
+# Hat üzerindeki ses biçimi: pcm16 (varsayılan) ya da g711_ulaw (8 kHz, ~1/3 bayt)
+REALTIME_AUDIO_FORMAT = os.getenv("REALTIME_AUDIO_FORMAT", "pcm16").lower()
+# Oturum devri: 30 dk sınırından önce yeni oturum aç, sessizlikte (en geç +grace) geç
+REALTIME_ROLLOVER_SEC = float(os.getenv("REALTIME_ROLLOVER_SEC", "1680"))
+REALTIME_ROLLOVER_GRACE_SEC = float(os.getenv("REALTIME_ROLLOVER_GRACE_SEC", "60"))
+REALTIME_REPLAY_MAX_SEC = float(os.getenv("REALTIME_REPLAY_MAX_SEC", "20"))   # commit edilmemiş ses tamponu
+REALTIME_DRAIN_SEC = float(os.getenv("REALTIME_DRAIN_SEC", "10"))             # eski oturumun yanıtını bekle
+# Gelen ham event'leri JSONL olarak kaydet (bench/realtime_events.py ile tekrar oynatılır)
+REALTIME_EVENT_LOG = os.getenv("REALTIME_EVENT_LOG", "")
+REALTIME_PCM_RATE = 24000   # pcm16 girişi sabit 24 kHz mono
+
+# orjson varsa daha hızlı decode
+try:
+    import orjson as _orjson
+    _json_loads = _orjson.loads
+except Exception:
+    _json_loads = json.loads
 
 # websockets sürüm uyumluluğu
 try:
@@ -20,7 +41,11 @@ try:
 except Exception:
     from websockets.client import connect as _ws_connect          # type: ignore
 
-from ..audio.capture import AudioCapture, CaptureConfig
+from ..audio.source import AudioSource, CaptureConfig, open_source
+from ..audio.resample import PolyphaseResampler
+from ..audio.vad import VadGate
+from ..audio.g711 import G711_RATE, UlawEncoder
+from .sender import AppendSender
 from ..app_types import TranscriptChunk
 
 REALTIME_URL = os.getenv(
@@ -29,6 +54,153 @@ REALTIME_URL = os.getenv(
 )
 API_KEY = os.getenv("OPENAI_API_KEY", "")
 
+_COMMIT_MSG = json.dumps({"type": "input_audio_buffer.commit"})
+_RESPONSE_CREATE_MSG = json.dumps({"type": "response.create", "response": {"modalities": ["text"]}})
+
+# Akan metin (çeşitli adlarla gelebilir) / final metin event adları
+DELTA_EVENTS = (
+    "response.text.delta",
+    "response.output_text.delta",
+    "response.delta",
+    "transcript.delta",
+    "response.audio_transcript.delta",
+)
+DONE_EVENTS = (
+    "response.text.done",
+    "response.output_text.done",
+    "response.completed",
+    "transcript.completed",
+    "response.output_item.done",
+    "response.done",
+    "response.audio_transcript.done",
+)
+
+class EventAssembler:
+    """Sunucu event'lerini tip → işleyici tablosuyla dağıtır, TranscriptChunk üretir.
+
+    Kısmi metin parça listesinde birikir; yalnız yayınlanırken birleştirilir.
+    """
+
+    def __init__(self, partial_emit_ms: int = REALTIME_PARTIAL_EMIT_MS):
+        self.partial_emit_ms = partial_emit_ms
+        self.in_flight = False        # transcript yanıtı sürüyor mu
+        self.speaking = False         # server_vad konuşma içinde mi
+        self.committed_ms = 0         # server_vad'in kapattığı son konuşmanın sonu (oturum zamanı)
+        self.commits = 0              # sunucunun onayladığı commit sayısı (input_audio_buffer.committed)
+        self.responses = 0            # başlayan yanıt sayısı (response.created)
+        self.answered = 0             # tamamlanan yanıt sayısı (response.done)
+        self.expired = False          # oturum süresi doldu / sunucu kapattı
+        self._parts: list = []
+        self._last_emit = 0.0
+        self.events = 0
+        self._dispatch = {
+            "error": self._on_error,
+            "response.created": self._on_created,
+            "input_audio_buffer.speech_started": self._on_speech_started,
+            "input_audio_buffer.speech_stopped": self._on_speech_stopped,
+            "input_audio_buffer.committed": self._on_committed,
+        }
+        for t in DELTA_EVENTS:
+            self._dispatch[t] = self._on_delta
+        for t in DONE_EVENTS:
+            self._dispatch[t] = self._on_done
+        self._dispatch["response.done"] = self._on_response_done
+
+    @property
+    def partial(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, raw) -> Optional[TranscriptChunk]:
+        self.events += 1
+        try:
+            data = _json_loads(raw)
+        except Exception:
+            if REALTIME_DEBUG:
+                print("[realtime][raw]", raw)
+            return None
+        t = data.get("type", "")
+        fn = self._dispatch.get(t)
+        if fn is not None:
+            return fn(data)
+        # Sesli event'leri yok say
+        if REALTIME_DEBUG:
+            if t.startswith("response.audio"):
+                print(f"[realtime][skip audio event] {t}")
+            else:
+                print(f"[realtime][event] {t}: {data}")
+        return None
+
+    def _on_error(self, data) -> None:
+        err = data.get("error") or data
+        print("[realtime][ERROR]", err)
+        code = str(err.get("code", "") if isinstance(err, dict) else "")
+        msg = str(err.get("message", "") if isinstance(err, dict) else err)
+        if code == "session_expired" or "maximum duration" in msg:
+            self.expired = True
+        return None
+
+    def _on_speech_started(self, data) -> None:
+        self.speaking = True
+        return None
+
+    def _on_speech_stopped(self, data) -> None:
+        self.speaking = False
+        self.committed_ms = max(self.committed_ms, int(data.get("audio_end_ms") or 0))
+        return None
+
+    def _on_committed(self, data) -> None:
+        self.commits += 1
+        return None
+
+    def _on_created(self, data) -> None:
+        # transcript yanıtı başlatıldı → kilit
+        self.in_flight = True
+        self.responses += 1
+        return None
+
+    def _on_delta(self, data) -> Optional[TranscriptChunk]:
+        delta = (
+            data.get("delta")
+            or data.get("text")
+            or data.get("output_text")
+            or data.get("transcript")
+            or ""
+        )
+        if not delta:
+            return None
+        self._parts.append(delta)
+        if REALTIME_DEBUG:
+            sys.stdout.write("\r[partial] " + self.partial.replace("\n", " ")[:140] + "   ")
+            sys.stdout.flush()
+        now = time.monotonic()
+        if (now - self._last_emit) * 1000 >= self.partial_emit_ms:
+            self._last_emit = now
+            if len(self._parts) > 1:
+                self._parts[:] = ["".join(self._parts)]
+            return TranscriptChunk(text=self._parts[0], is_final=False)
+        return None
+
+    def _on_done(self, data) -> Optional[TranscriptChunk]:
+        # Final metin → kilidi bırak
+        text = (
+            data.get("text")
+            or data.get("output_text")
+            or data.get("transcript")
+            or self.partial
+            or ""
+        ).strip()
+        self._parts.clear()
+        self._last_emit = 0.0
+        self.in_flight = False
+        if text:
+            return TranscriptChunk(text=text, is_final=True)
+        return None
+
+    def _on_response_done(self, data) -> Optional[TranscriptChunk]:
+        # yanıtın son event'i (iptal edilmiş olsa da): karşılığı olan ses artık gerekmez
+        self.answered += 1
+        return self._on_done(data)
+
 def _connect(url: str, headers: dict, **kw):
     sig = inspect.signature(_ws_connect)
     if "extra_headers" in sig.parameters:
@@ -36,173 +208,349 @@ def _connect(url: str, headers: dict, **kw):
     else:
         return _ws_connect(url, additional_headers=headers, **kw)
 
-async def stream_text():
+def _session_payload(ulaw: bool, lang: str = STT_LANG, translate_to: str = TRANSLATE_TO) -> dict:
+    # --- Talimat inşası: verbatim transcript mi, TR çeviri mi? ---
+    if translate_to:
+        instr = (
+            f"You will hear {lang} speech. Translate it into {translate_to}. "
+            "Output ONLY the translation of what was said. "
+            "Do not add apologies, prefaces, labels, or extra words."
+        )
+    else:
+        instr = (
+            "Transcribe ONLY what you hear. "
+            "Return verbatim transcript in the original language. "
+            "Do not translate, summarize, apologize, or add words."
+        )
+
+    # EN konuşmayı TR'ye çevir (veya verbatim) — yalnız metin dön
+    session_payload = {
+        "turn_detection": {
+            "type": "server_vad",
+            "threshold": 0.3,
+            "silence_duration_ms": 250,
+            "create_response": True,      # konuşma bitince otomatik 'response'
+            "interrupt_response": True,
+            "prefix_padding_ms": 300,
+        },
+        "input_audio_format": "g711_ulaw" if ulaw else "pcm16",
+        "input_audio_transcription": {
+            "model": "gpt-4o-transcribe",
+            "language": lang
+        },
+        "instructions": instr,
+    }
+    if REALTIME_ONLY_TEXT:
+        session_payload["modalities"] = ["text"]
+    return session_payload
+
+class _Session:
+    """Tek realtime websocket oturumu: gönderici, event işleyici ve yanıtlanmamış ses tamponu.
+
+    ``replay`` bu oturuma gönderilmiş ve transcript'i henüz gelmemiş sesi tutar: commit
+    edilen ses yanıtı (response.done) gelene kadar tamponda kalır. Oturum değişince
+    ``handoff_audio()`` yeni oturuma önce yollanır.
+    """
+
+    def __init__(self, ws, samplerate: int, sample_bytes: int, seq: int,
+                 partial_emit_ms: int = REALTIME_PARTIAL_EMIT_MS):
+        self.ws = ws
+        self.seq = seq
+        self.opened = time.monotonic()
+        self.events = EventAssembler(partial_emit_ms)
+        self.sender = AppendSender(ws, samplerate, sample_bytes=sample_bytes)
+        self._bytes_per_ms = samplerate * sample_bytes / 1000.0
+        self._align = ~(sample_bytes - 1)
+        self._replay_max = int(REALTIME_REPLAY_MAX_SEC * 1000 * self._bytes_per_ms) & self._align
+        self.replay = bytearray()
+        self._replay_base = 0          # replay[0]'ın oturum akışındaki bayt konumu
+        self.sent = 0                  # oturuma verilen toplam bayt
+        self._commit_marks: deque = deque()   # zorunlu commit'lerin akıştaki bayt konumu
+        self._committed = 0            # sunucunun commit ettiği sesin sonu (bayt konumu)
+        self._answering: deque = deque()      # uçuştaki yanıt başına kapsadığı sesin sonu
+        self.dead = False
+        self.tasks: list = []
+
+    def start(self, out_q: Queue) -> None:
+        self.tasks = [
+            asyncio.create_task(self._send()),
+            asyncio.create_task(self._recv(out_q)),
+        ]
+
+    async def _send(self) -> None:
+        try:
+            await self.sender.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # bağlantı koptu: ses replay tamponunda birikmeye devam eder
+            print(f"[realtime] session #{self.seq} send failed: {e}")
+            self.dead = True
+
+    def feed(self, data) -> None:
+        if not self.dead:
+            self.sender.feed(data)
+        self.replay += data
+        self.sent += len(data)
+        over = len(self.replay) - self._replay_max
+        if over > 0:
+            del self.replay[:over]
+            self._replay_base += over
+
+    async def commit(self) -> None:
+        """Zorunlu commit: o ana kadar verilen ses commit edilir, yanıtı gelince tampondan düşer."""
+        # onay send_control beklenirken gelebilir → konum gönderimden önce kaydedilir
+        self._commit_marks.append(self.sent)
+        await self.sender.send_control(_COMMIT_MSG)
+        await self.ws.send(_RESPONSE_CREATE_MSG)
+
+    def _mark_committed(self, pos: int) -> None:
+        self._committed = max(self._committed, pos)
+
+    @property
+    def unanswered(self) -> bool:
+        """Commit edilmiş ama transcript'i gelmemiş ses var mı."""
+        return self._committed > self._replay_base
+
+    def handoff_audio(self) -> bytes:
+        """Yeni oturuma yollanacak ses. Oturum çalışıyorsa yalnız commit edilmemiş kısım
+        (commit edilenlerin yanıtı emekliye ayrılırken buradan gelir); öldüyse ya da süresi
+        dolduysa yanıtı gelmemiş commit'ler de, yoksa o konuşmalar kaybolur."""
+        start = self._committed if self.usable else self._replay_base
+        return bytes(self.replay[max(0, start - self._replay_base):])
+
+    def _trim_to(self, pos: int) -> None:
+        drop = min(pos - self._replay_base, len(self.replay))
+        if drop > 0:
+            del self.replay[:drop]
+            self._replay_base += drop
+
+    async def _recv(self, out_q: Queue) -> None:
+        log = open(REALTIME_EVENT_LOG, "a", encoding="utf-8") if REALTIME_EVENT_LOG else None
+        events = self.events
+        try:
+            async for raw in self.ws:
+                if log is not None:
+                    log.write(raw if isinstance(raw, str) else raw.decode("utf-8", "replace"))
+                    log.write("\n")
+                committed, commits = events.committed_ms, events.commits
+                responses, answered = events.responses, events.answered
+                chunk = events.feed(raw)
+                if events.committed_ms != committed:
+                    self._mark_committed(int(events.committed_ms * self._bytes_per_ms) & self._align)
+                if events.commits != commits and self._commit_marks:
+                    # server_vad commit'leri de bu event'i yollar; bekleyen zorunlu commit
+                    # zaten gönderildiği için işaretine kadar olan ses sunucuda commit edilir
+                    self._mark_committed(self._commit_marks.popleft())
+                if events.responses != responses:
+                    # yanıt o ana kadar commit edilen sesi kapsar
+                    self._answering.append(self._committed)
+                if events.answered != answered and self._answering:
+                    # transcript geldi: ancak şimdi tampondan düşer; önce düşerse oturum
+                    # yanıt ortasında koptuğunda bu konuşma yeni oturuma yollanamaz
+                    self._trim_to(self._answering.popleft())
+                if chunk is not None:
+                    await out_q.put(chunk)
+        except Exception as e:
+            print(f"[realtime] session #{self.seq} closed: {e}")
+        finally:
+            self.dead = True
+            if log is not None:
+                log.close()
+
+    @property
+    def usable(self) -> bool:
+        return not self.dead and not self.events.expired
+
+    async def retire(self) -> None:
+        """Yeni oturuma geçildi: commit edilmiş sesin yanıtlarını bekle, sonra kapat."""
+        deadline = time.monotonic() + REALTIME_DRAIN_SEC
+        while ((self.events.in_flight or self.unanswered) and not self.dead
+               and time.monotonic() < deadline):
+            await asyncio.sleep(0.1)
+        await self.close()
+
+    async def close(self) -> None:
+        for t in self.tasks:
+            t.cancel()
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+
+async def stream_text(source: Optional[AudioSource] = None):
+    """Realtime STT; ``source`` verilmezse AUDIO_SOURCE (cihaz ya da dosya) açılır.
+
+    Capture tek sefer açılır; websocket oturumu süre dolmadan ya da koparsa
+    arka planda yenilenir ve commit edilmemiş ses yeni oturuma tekrar gönderilir.
+    """
     if not API_KEY:
         raise RuntimeError("OPENAI_API_KEY missing")
 
-    cfg = CaptureConfig()
-    cap = AudioCapture(cfg)
-    cap.start()
+    cap = source or open_source(CaptureConfig())
+    cfg = cap.cfg
 
     headers = {
         "Authorization": f"Bearer {API_KEY}",
         "OpenAI-Beta": "realtime=v1",
     }
 
-    out_q: Queue[TranscriptChunk] = Queue()
-    in_flight = False  # yanıt üretimi devam ediyor mu (transcript yanıtı)
-
-    async with _connect(REALTIME_URL, headers, ping_interval=20) as ws:
-        # --- Talimat inşası: verbatim transcript mi, TR çeviri mi? ---
-        if TRANSLATE_TO:
-            instr = (
-                f"You will hear {STT_LANG} speech. Translate it into {TRANSLATE_TO}. "
-                "Output ONLY the translation of what was said. "
-                "Do not add apologies, prefaces, labels, or extra words."
-            )
-        else:
-            instr = (
-                "Transcribe ONLY what you hear. "
-                "Return verbatim transcript in the original language. "
-                "Do not translate, summarize, apologize, or add words."
-            )
-
-        # EN konuşmayı TR'ye çevir (veya verbatim) — yalnız metin dön
-        session_payload = {
-            "turn_detection": {
-                "type": "server_vad",
-                "threshold": 0.3,
-                "silence_duration_ms": 250,
-                "create_response": True,      # konuşma bitince otomatik 'response'
-                "interrupt_response": True,
-                "prefix_padding_ms": 300,
-            },
-            "input_audio_format": "pcm16",
-            "input_audio_transcription": {
-                "model": "gpt-4o-transcribe",
-                "language": STT_LANG
-            },
-            "instructions": instr,
-        }
-        if REALTIME_ONLY_TEXT:
-            session_payload["modalities"] = ["text"]
+    # Kaynak 24 kHz değilse (dışarıdan verilen kaynak, AUDIO_SAMPLE_RATE) burada çevir
+    rs = PolyphaseResampler(cap.samplerate, REALTIME_PCM_RATE) \
+        if cap.samplerate != REALTIME_PCM_RATE else None
+    block_frames = max(1, REALTIME_PCM_RATE * cfg.block_ms // 1000)
+    vad = VadGate(REALTIME_PCM_RATE, block_frames) if REALTIME_LOCAL_VAD else None
+    # g711_ulaw: VAD PCM üzerinde çalışır, kodlama gönderimden hemen önce
+    ulaw = UlawEncoder(REALTIME_PCM_RATE) if REALTIME_AUDIO_FORMAT == "g711_ulaw" else None
+    wire_rate, sample_bytes = (G711_RATE, 1) if ulaw else (REALTIME_PCM_RATE, 2)
+    # Oda başına ayarlar (ManagedStream.spec); verilmeyenler env varsayılanı
+    spec = getattr(cap, "spec", None)
+    lang = (getattr(spec, "lang", None) or STT_LANG).lower()
+    translate_to = (getattr(spec, "translate_to", None) or TRANSLATE_TO).lower().strip()
+    partial_emit_ms = getattr(spec, "partial_emit_ms", None) or REALTIME_PARTIAL_EMIT_MS
+    payload = json.dumps({"type": "session.update",
+                          "session": _session_payload(bool(ulaw), lang, translate_to)})
+
+    out_q: Queue = Queue()
+    seq = 0
+
+    async def open_session() -> _Session:
+        nonlocal seq
+        ws = await _connect(REALTIME_URL, headers, ping_interval=20)
+        await ws.send(payload)
+        seq += 1
+        sess = _Session(ws, wire_rate, sample_bytes, seq, partial_emit_ms)
+        sess.start(out_q)
+        mode = "translate" if translate_to else "transcribe"
+        fmt = "g711_ulaw" if ulaw else "pcm16"
+        print(f"[realtime] session #{seq} updated (server_vad + {mode} + text-only, {fmt})")
+        return sess
+
+    # Önce oturum: ilk bağlantı başarısızsa cihaz açılmamış olur (sızıntı yok)
+    current = await open_session()
+    try:
+        cap.start()
+    except BaseException:
+        await current.close()
+        raise
+    retiring: set = set()
+    swaps = 0
+
+    async def send_audio():
+        nonlocal current, swaps
+        last_commit = time.monotonic()
+        sent_since_commit = 0
+        pending: Optional[asyncio.Task] = None
+        retry_at = 0.0
+        backoff = 1.0
+
+        def swap_ready(age: float) -> bool:
+            return (not current.usable or not current.events.speaking
+                    or age >= REALTIME_ROLLOVER_SEC + REALTIME_ROLLOVER_GRACE_SEC)
 
-        await ws.send(json.dumps({"type": "session.update", "session": session_payload}))
-        mode = "translate" if TRANSLATE_TO else "transcribe"
-        print(f"[realtime] session updated (server_vad + {mode} + text-only)")
+        async def frames():
+            async for view in cap.frames():
+                yield rs.process_pcm16(view) if rs else view
 
-        partial_buf = ""
-        last_emit = 0.0
+        source = vad.filter(frames()) if vad else frames()
+        try:
+            async for chunk in source:
+                now = time.monotonic()
+                age = now - current.opened
 
-        async def send_audio():
-            nonlocal in_flight
-            last_commit = time.monotonic()
-            sent_since_commit = 0
+                # --- Oturum devri: önceden aç, sessizlikte (ya da zorunlu) geç ---
+                want_new = not current.usable or (
+                    REALTIME_ROLLOVER_SEC > 0 and age >= REALTIME_ROLLOVER_SEC)
+                if want_new and pending is None and now >= retry_at:
+                    pending = asyncio.create_task(open_session())
+                if pending is not None and pending.done():
+                    err = pending.exception()
+                    if err is not None:
+                        print(f"[realtime][ERROR] replacement session failed: {err}")
+                        pending = None
+                        retry_at = now + backoff
+                        backoff = min(backoff * 2, 30.0)
+                    elif swap_ready(age):
+                        new = pending.result()
+                        pending = None
+                        backoff = 1.0
+                        old = current
+                        replay = old.handoff_audio()
+                        if replay:
+                            new.feed(replay)
+                        current = new
+                        swaps += 1
+                        print(f"[realtime] switched to session #{new.seq} (replayed "
+                              f"{len(replay) / sample_bytes / wire_rate:.2f}s unanswered audio)")
+                        t = asyncio.create_task(old.retire())
+                        retiring.add(t)
+                        t.add_done_callback(retiring.discard)
 
-            async for chunk in cap.frames():
-                b64 = base64.b64encode(chunk).decode("utf-8")
-                await ws.send(json.dumps({"type": "input_audio_buffer.append", "audio": b64}))
+                # kopyalanıp kuyruğa alınır; gönderim görevi tıkanıklığa göre birleştirir
+                current.feed(ulaw.encode(chunk) if ulaw else chunk)
                 sent_since_commit += len(chunk)
 
                 # Opsiyonel: zorunlu commit (aba güvencesi)
-                if FORCE_COMMIT_MS > 0 and not in_flight:
-                    now = time.monotonic()
+                if FORCE_COMMIT_MS > 0 and current.usable and not current.events.in_flight:
                     if (now - last_commit) * 1000 >= FORCE_COMMIT_MS and sent_since_commit > 0:
-                        await ws.send(json.dumps({"type": "input_audio_buffer.commit"}))
-                        await ws.send(json.dumps({
-                            "type": "response.create",
-                            "response": {"modalities": ["text"]}
-                        }))
+                        try:
+                            await current.commit()
+                        except asyncio.CancelledError:
+                            raise
+                        except Exception as e:
+                            # bağlantı koptu / gönderim takıldı: oturumu bırak, devir başlasın
+                            print(f"[realtime] session #{current.seq} commit failed: {e!r}")
+                            current.dead = True
                         last_commit = now
                         sent_since_commit = 0
+        finally:
+            # açılmış ama devralınmamış oturumu sızdırma
+            if pending is not None:
+                if pending.done() and not pending.cancelled() and pending.exception() is None:
+                    asyncio.ensure_future(pending.result().close())
+                else:
+                    pending.cancel()
 
-        async def recv_events():
-            nonlocal partial_buf, last_emit, in_flight
-            async for raw in ws:
-                try:
-                    data = json.loads(raw)
-                except Exception:
-                    if REALTIME_DEBUG:
-                        print("[realtime][raw]", raw)
-                    continue
-
-                t = data.get("type", "")
-
-                if t == "error":
-                    print("[realtime][ERROR]", data.get("error") or data)
-                    continue
-
-                # transcript yanıtı başlatıldı → kilit
-                if t in ("response.created",):
-                    in_flight = True
-
-                # Akan metin (çeşitli adlarla gelebilir)
-                if t in (
-                    "response.text.delta",
-                    "response.output_text.delta",
-                    "response.delta",
-                    "transcript.delta",
-                    "response.audio_transcript.delta",
-                ):
-                    delta = (
-                        data.get("delta")
-                        or data.get("text")
-                        or data.get("output_text")
-                        or data.get("transcript")
-                        or ""
-                    )
-                    if delta:
-                        partial_buf += delta
-                        now = time.monotonic()
-                        if (now - last_emit) * 1000 >= REALTIME_PARTIAL_EMIT_MS:
-                            await out_q.put(TranscriptChunk(text=partial_buf, is_final=False))
-                            last_emit = now
-                        if REALTIME_DEBUG:
-                            sys.stdout.write("\r[partial] " + partial_buf.replace("\n", " ")[:140] + "   ")
-                            sys.stdout.flush()
-                    continue
-
-                # Final metin → kilidi bırak
-                if t in (
-                    "response.text.done",
-                    "response.output_text.done",
-                    "response.completed",
-                    "transcript.completed",
-                    "response.output_item.done",
-                    "response.done",
-                    "response.audio_transcript.done",
-                ):
-                    text = (
-                        data.get("text")
-                        or data.get("output_text")
-                        or data.get("transcript")
-                        or partial_buf
-                        or ""
-                    ).strip()
-                    if text:
-                        await out_q.put(TranscriptChunk(text=text, is_final=True))
-                    partial_buf = ""
-                    last_emit = 0.0
-                    in_flight = False
-                    continue
-
-                # Sesli event'leri yok say
-                if t.startswith("response.audio"):
-                    if REALTIME_DEBUG:
-                        print(f"[realtime][skip audio event] {t}")
-                    continue
-
-                if REALTIME_DEBUG:
-                    print(f"[realtime][event] {t}: {data}")
-
-        sender = asyncio.create_task(send_audio())
-        receiver = asyncio.create_task(recv_events())
-
+    async def pump():
         try:
-            while True:
-                item = await out_q.get()
-                yield item
-        finally:
-            sender.cancel()
-            receiver.cancel()
-            cap.stop()
+            await send_audio()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await out_q.put(e)   # tüketiciye ilet
+
+    async def report_stats():
+        while True:
+            await asyncio.sleep(5.0)
+            st = current.sender.stats()
+            src = cap.stats()
+            print(f"[realtime][send] #{current.seq} q={st['queue_ms']}ms inflight={st['in_flight_bytes']}B "
+                  f"avg_batch={st['avg_batch_ms']}ms dropped={st['dropped_sec']}s "
+                  f"replay={len(current.replay)}B capture_overruns={src.get('overruns', 0)}")
+
+    tasks = [asyncio.create_task(pump())]
+    if REALTIME_DEBUG:
+        tasks.append(asyncio.create_task(report_stats()))
+
+    try:
+        while True:
+            item = await out_q.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for t in tasks:
+            t.cancel()
+        for t in list(retiring):
+            t.cancel()
+        cap.stop()
+        st = current.sender.stats()
+        await current.close()
+        print(f"[realtime][send] sessions={seq} swaps={swaps} messages={st['messages']} "
+              f"sent={st['sent_sec']}s wire={st['wire_bytes']}B avg_batch={st['avg_batch_ms']}ms "
+              f"dropped={st['dropped_sec']}s capture_overruns={cap.stats().get('overruns', 0)}")
+        if vad:
+            st = vad.stats()
+            print(f"[realtime][vad] suppressed {st['suppressed_bytes']} bytes "
+                  f"({st['suppressed_sec']}s, {st['suppressed_ratio']:.0%}), "
+                  f"segments={st['segments']} keepalive={st['keepalive_bytes']}B")
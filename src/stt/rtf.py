@@ -0,0 +1,112 @@
+# src/stt/rtf.py
+"""Gerçek zaman oranına (RTF) göre whisper çözümleme ayarlarını kademeli düşüren denetleyici.
+
+RTF = çözme süresi / işin kapsadığı yeni ses süresi (işçi sayısına bölünmüş).
+Geride kalınca (RTF hedefin üstünde ya da bekleyen ses birikiyor) bir kademe
+aşağı: önce beam/best_of, sonra sıcaklık geri dönüşü, en son model boyu.
+Uzun süre boşluk varsa bir kademe yukarı.
+"""
+import os
+from typing import List, Optional
+
+WHISPER_RTF_CONTROL = os.getenv("WHISPER_RTF_CONTROL", "1") == "1"
+WHISPER_RTF_TARGET = float(os.getenv("WHISPER_RTF_TARGET", "0.8"))       # bunun üstü: geride kalıyoruz
+WHISPER_RTF_LOW = float(os.getenv("WHISPER_RTF_LOW", "0.45"))            # bunun altı: kalite artırılabilir
+WHISPER_RTF_BACKLOG_SEC = float(os.getenv("WHISPER_RTF_BACKLOG_SEC", "4"))
+WHISPER_RTF_MIN_MODEL = os.getenv("WHISPER_RTF_MIN_MODEL", "tiny")
+
+MODEL_SIZES = ["large", "medium", "small", "base", "tiny"]   # büyükten küçüğe
+TEMPERATURE_FALLBACK = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+def decode_levels(model_size: str, min_model: str = WHISPER_RTF_MIN_MODEL) -> List[dict]:
+    """Kademe 0 en iyi kalite; her kademe bir öncekinden ucuz."""
+    levels = [
+        {"model": model_size, "beam_size": 5, "best_of": 5, "temperature": TEMPERATURE_FALLBACK},
+        {"model": model_size, "beam_size": 3, "best_of": 3, "temperature": TEMPERATURE_FALLBACK},
+        {"model": model_size, "beam_size": None, "best_of": 1, "temperature": TEMPERATURE_FALLBACK},
+        {"model": model_size, "beam_size": None, "best_of": 1, "temperature": 0.0},
+    ]
+    base = model_size.split(".")[0]   # "base.en" → "base"
+    if base in MODEL_SIZES and min_model in MODEL_SIZES:
+        suffix = model_size[len(base):]
+        for size in MODEL_SIZES[MODEL_SIZES.index(base) + 1:MODEL_SIZES.index(min_model) + 1]:
+            levels.append({"model": size + suffix, "beam_size": None, "best_of": 1, "temperature": 0.0})
+    return levels
+
+
+def describe(opts: dict) -> str:
+    t = opts["temperature"]
+    return (f"model={opts['model']} beam={opts['beam_size'] or 1} best_of={opts['best_of']} "
+            f"fallback={'on' if isinstance(t, tuple) else 'off'}")
+
+
+class RtfController:
+    def __init__(self, levels: List[dict], target: float = WHISPER_RTF_TARGET,
+                 low: float = WHISPER_RTF_LOW, backlog_max_sec: float = WHISPER_RTF_BACKLOG_SEC,
+                 cooldown: int = 3, hold: int = 6, alpha: float = 0.4):
+        self.levels = levels
+        self.target = target
+        self.low = low
+        self.backlog_max_sec = backlog_max_sec
+        self.cooldown = cooldown      # değişiklikten sonra yeni kademeyi ölçmek için beklenen iş
+        self.hold = hold              # yukarı çıkmak için art arda rahat iş
+        self.alpha = alpha
+        self.level = 0
+        self.rtf: Optional[float] = None      # son işin RTF'i
+        self.ema: Optional[float] = None
+        self.backlog_sec = 0.0
+        self._since = 0
+        self._calm = 0
+        self.downs = 0
+        self.ups = 0
+
+    @property
+    def options(self) -> dict:
+        return self.levels[self.level]
+
+    def observe(self, audio_sec: float, decode_sec: float, backlog_sec: float,
+                workers: int = 1) -> bool:
+        """Bir işin ölçümü; kademe değiştiyse True."""
+        if audio_sec <= 0:
+            return False
+        self.rtf = decode_sec / audio_sec / max(1, workers)
+        self.ema = self.rtf if self.ema is None else self.alpha * self.rtf + (1 - self.alpha) * self.ema
+        self.backlog_sec = backlog_sec
+        self._since += 1
+        if self._since < self.cooldown:
+            return False
+        behind = self.ema > self.target or backlog_sec > self.backlog_max_sec
+        if behind and self.level < len(self.levels) - 1:
+            self._step(+1)
+            return True
+        if self.ema < self.low and backlog_sec <= 0.0:
+            self._calm += 1
+            if self._calm >= self.hold and self.level > 0:
+                self._step(-1)
+                return True
+        else:
+            self._calm = 0
+        return False
+
+    def _step(self, d: int) -> None:
+        self.level += d
+        if d > 0:
+            self.downs += 1
+        else:
+            self.ups += 1
+        self._since = 0
+        self._calm = 0
+        self.ema = None   # yeni kademe kendi ölçümüyle değerlendirilir
+
+    def stats(self) -> dict:
+        return {
+            "level": self.level,
+            "levels": len(self.levels),
+            "decode": describe(self.options),
+            "rtf": round(self.rtf, 2) if self.rtf is not None else None,
+            "rtf_ema": round(self.ema, 2) if self.ema is not None else None,
+            "backlog_sec": round(self.backlog_sec, 2),
+            "downs": self.downs,
+            "ups": self.ups,
+        }
@@ -0,0 +1,148 @@
+# src/stt/sender.py
+import os
+import asyncio
+import binascii
+from typing import Optional
+
+# Uyarlamalı birleştirme ayarları
+BATCH_MAX_MS = int(os.getenv("REALTIME_BATCH_MAX_MS", "400"))        # tek append'te en fazla ses
+SEND_QUEUE_MS = int(os.getenv("REALTIME_SEND_QUEUE_MS", "3000"))     # bekleyen ses üst sınırı (üstü atılır)
+CONGEST_BYTES = int(os.getenv("REALTIME_CONGEST_BYTES", str(64 * 1024)))  # ws yazma tamponu eşiği
+CONGEST_WAIT_MS = int(os.getenv("REALTIME_CONGEST_WAIT_MS", "40"))   # tıkanıkta biriktirme süresi
+FLUSH_TIMEOUT_SEC = float(os.getenv("REALTIME_FLUSH_TIMEOUT_SEC", "5"))  # commit öncesi boşaltma üst sınırı
+
+# input_audio_buffer.append zarfı: dict + json.dumps yerine hazır şablon
+_APPEND_PREFIX = '{"type":"input_audio_buffer.append","audio":"'
+_APPEND_SUFFIX = '"}'
+
+
+def append_message(pcm) -> str:
+    """Ses baytlarını (pcm16 ya da g711) tek seferde base64 + hazır zarfa sar."""
+    return _APPEND_PREFIX + binascii.b2a_base64(pcm, newline=False).decode("ascii") + _APPEND_SUFFIX
+
+
+class AppendSender:
+    """Realtime websocket'e ses append'lerini uyarlamalı toplu gönderir.
+
+    ``feed()`` bloklamaz; gönderim görevi (``run()``) önceki mesaj yoldayken
+    biriken sesi tek append'te yollar. Websocket yazma tamponu ``CONGEST_BYTES``'ı
+    aşınca biraz daha biriktirir; boşta her bloğu hemen gönderir. Bekleyen ses
+    ``SEND_QUEUE_MS``'i aşarsa en eskisi atılır ve sayılır.
+    """
+
+    def __init__(self, ws, samplerate: int, max_batch_ms: int = BATCH_MAX_MS,
+                 max_queue_ms: int = SEND_QUEUE_MS, congest_bytes: int = CONGEST_BYTES,
+                 sample_bytes: int = 2):
+        self.ws = ws
+        self.samplerate = samplerate
+        self.sample_bytes = sample_bytes      # pcm16: 2, g711: 1
+        self._align = ~(sample_bytes - 1)
+        self._bytes_per_ms = samplerate * sample_bytes / 1000.0
+        self._max_batch = max(sample_bytes, int(max_batch_ms * self._bytes_per_ms) & self._align)
+        self._max_queue = max(self._max_batch, int(max_queue_ms * self._bytes_per_ms) & self._align)
+        self._congest = congest_bytes
+
+        self._buf = bytearray()
+        self._have = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._sending = False
+        self.error: Optional[BaseException] = None   # gönderim görevi bununla durdu
+
+        # Metrikler
+        self.messages = 0
+        self.sent_bytes = 0          # ham PCM
+        self.wire_bytes = 0          # base64 + zarf
+        self.dropped_bytes = 0
+        self.congested = 0
+        self.max_batch_seen = 0
+
+    # ---- Üretici ----
+    def feed(self, chunk) -> None:
+        self._buf += chunk
+        over = len(self._buf) - self._max_queue
+        if over > 0:
+            over = -(-over // self.sample_bytes) * self.sample_bytes   # örnek hizası
+            del self._buf[:over]
+            self.dropped_bytes += over
+        self._idle.clear()
+        self._have.set()
+
+    # ---- Durum ----
+    def queue_bytes(self) -> int:
+        return len(self._buf)
+
+    def in_flight(self) -> int:
+        """Websocket'in işletim sistemine henüz yazamadığı bayt (transport tamponu)."""
+        tr = getattr(self.ws, "transport", None)
+        try:
+            return int(tr.get_write_buffer_size()) if tr is not None else 0
+        except Exception:
+            return 0
+
+    # ---- Gönderim ----
+    async def _send_pending(self) -> None:
+        n = min(len(self._buf), self._max_batch) & self._align
+        if n <= 0:
+            return
+        with memoryview(self._buf) as mv, mv[:n] as part:
+            msg = append_message(part)
+        # gönderim sırasında feed() baştan atabilir → beklemeden önce çıkar
+        del self._buf[:n]
+        self._sending = True
+        try:
+            await self.ws.send(msg)
+        finally:
+            self._sending = False
+        self.messages += 1
+        self.sent_bytes += n
+        self.wire_bytes += len(msg)
+        self.max_batch_seen = max(self.max_batch_seen, n)
+
+    async def run(self) -> None:
+        try:
+            while True:
+                await self._have.wait()
+                if self.in_flight() > self._congest and len(self._buf) < self._max_batch:
+                    # tıkanık: küçük mesaj yığmak yerine biraz daha biriktir
+                    self.congested += 1
+                    await asyncio.sleep(CONGEST_WAIT_MS / 1000.0)
+                await self._send_pending()
+                if not self._buf:
+                    self._have.clear()
+                    self._idle.set()
+        except BaseException as e:
+            # flush() bekleyen varsa takılı kalmasın: hatayı kaydet ve uyandır
+            self.error = e
+            self._idle.set()
+            raise
+
+    async def flush(self, timeout: float = FLUSH_TIMEOUT_SEC) -> None:
+        """Bekleyen tüm sesi gönderilmiş hale getir (commit öncesi sıra için).
+        Gönderim görevi durduysa ``ConnectionError``, süre dolarsa ``TimeoutError``."""
+        async def drained():
+            while (self._buf or self._sending) and self.error is None:
+                await self._idle.wait()
+
+        await asyncio.wait_for(drained(), timeout)
+        if self.error is not None:
+            raise ConnectionError(f"sender stopped: {self.error!r}") from self.error
+
+    async def send_control(self, msg: str) -> None:
+        """Ses sırasını bozmadan kontrol mesajı (commit vb.) gönder."""
+        await self.flush()
+        await self.ws.send(msg)
+
+    def stats(self) -> dict:
+        avg = self.sent_bytes / self.messages if self.messages else 0
+        return {
+            "messages": self.messages,
+            "queue_ms": round(len(self._buf) / self._bytes_per_ms, 1),
+            "in_flight_bytes": self.in_flight(),
+            "sent_sec": round(self.sent_bytes / self.sample_bytes / self.samplerate, 2),
+            "wire_bytes": self.wire_bytes,
+            "avg_batch_ms": round(avg / self._bytes_per_ms, 1),
+            "max_batch_ms": round(self.max_batch_seen / self._bytes_per_ms, 1),
+            "dropped_sec": round(self.dropped_bytes / self.sample_bytes / self.samplerate, 3),
+            "congested": self.congested,
+        }
@@ -1,30 +1,254 @@
+# src/stt/whisper_fallback.py
+"""Çevrimdışı STT: faster-whisper (CTranslate2, int8) ile CPU'da toplu çözümleme.
+
+Süreçteki tüm akışların bekleyen pencereleri tek bir ``generate`` çağrısında
+toplanır (``WHISPER_FB_BATCH``); CTranslate2 GIL'i bıraktığı için çözümleme bir
+iş parçacığında yapılır. Her toplu çağrı için pencere başına verim yazılır.
+
+Kurulum: ``pip install "meeting-copilot[fallback]"``
+"""
+import os
+import time
 import asyncio
-from typing import AsyncGenerator
-from ..audio.capture import AudioCapture, CaptureConfig
+from collections import deque
+from typing import AsyncGenerator, Deque, List, Optional
+
+import numpy as np
+
+from ..audio.source import AudioSource, CaptureConfig, open_source
+from ..audio.resample import PolyphaseResampler
 from ..app_types import TranscriptChunk
 
-def _transcribe_block(audio_bytes: bytes, sr: int) -> str:
-    return ""  # Sprint-2: faster-whisper entegrasyonu
+FB_SAMPLE_RATE = 16000
+WHISPER_FB_MODEL = os.getenv("WHISPER_FB_MODEL", "base")            # tiny, base, small, ... ya da CT2 dizini
+WHISPER_FB_COMPUTE = os.getenv("WHISPER_FB_COMPUTE", "int8")        # int8, int8_float32, float32
+WHISPER_FB_THREADS = int(os.getenv("WHISPER_FB_THREADS", "0"))      # 0 = CTranslate2 varsayılanı
+WHISPER_FB_BATCH = int(os.getenv("WHISPER_FB_BATCH", "8"))          # tek çağrıdaki en fazla pencere
+WHISPER_FB_BATCH_WAIT_MS = int(os.getenv("WHISPER_FB_BATCH_WAIT_MS", "30"))  # pencere toplama süresi
+WHISPER_FB_WINDOW_SEC = float(os.getenv("WHISPER_FB_WINDOW_SEC", "2.0"))
+WHISPER_FB_BEAM = int(os.getenv("WHISPER_FB_BEAM", "1"))
+WHISPER_FB_STATS = os.getenv("WHISPER_FB_STATS", "0") == "1"        # her toplu çağrıyı yazdır
+STT_LANG = os.getenv("STT_LANG", "en").lower()
+_NO_SPEECH = 0.6
+_MAX_SEC = 30.0   # whisper penceresi
+
+
+class _Window:
+    __slots__ = ("audio", "fut", "t_submit")
+
+    def __init__(self, audio: np.ndarray, fut: asyncio.Future):
+        self.audio = audio
+        self.fut = fut
+        self.t_submit = time.perf_counter()
+
+
+class FallbackBatcher:
+    """Akışlardan gelen pencereleri toplayıp tek çağrıda çözen süreç içi kuyruk."""
+
+    def __init__(self, model_size: str = WHISPER_FB_MODEL, compute_type: str = WHISPER_FB_COMPUTE,
+                 threads: int = WHISPER_FB_THREADS, batch: int = WHISPER_FB_BATCH,
+                 wait_ms: int = WHISPER_FB_BATCH_WAIT_MS, beam_size: int = WHISPER_FB_BEAM,
+                 language: str = STT_LANG):
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.threads = threads
+        self.batch = max(1, batch)
+        self.wait_ms = wait_ms
+        self.beam_size = max(1, beam_size)
+        self.language = language
+        self._model = None
+        self._tokenizer = None
+        self._pending: Deque[_Window] = deque()
+        self._have: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrikler
+        self.windows = 0
+        self.batches = 0
+        self.audio_sec = 0.0
+        self.decode_sec = 0.0
+        self.load_sec = 0.0
+        self._lat: Deque[float] = deque(maxlen=512)      # gönderim → sonuç (ms)
+        self._xrt: Deque[float] = deque(maxlen=512)      # pencere başına x gerçek zaman
+
+    # ---- Model ----
+    def _load(self) -> None:
+        try:
+            from faster_whisper import WhisperModel
+            from faster_whisper.tokenizer import Tokenizer
+        except ImportError as e:
+            raise RuntimeError(
+                "faster-whisper is not installed: pip install \"meeting-copilot[fallback]\"") from e
+        t = time.perf_counter()
+        kw = {"cpu_threads": self.threads} if self.threads > 0 else {}
+        print(f"[whisper-fb] Loading {self.model_size} ({self.compute_type}, "
+              f"threads={self.threads or 'auto'}, batch={self.batch})")
+        self._model = WhisperModel(self.model_size, device="cpu", compute_type=self.compute_type, **kw)
+        self._tokenizer = Tokenizer(self._model.hf_tokenizer, self._model.model.is_multilingual,
+                                    task="transcribe", language=self.language)
+        # ısınma: ilk gerçek pencerede bellek ayırma/kernel seçimi gecikmesi olmasın
+        self._decode([np.zeros(FB_SAMPLE_RATE, dtype=np.float32)])
+        self.load_sec = time.perf_counter() - t
+        print(f"[whisper-fb] Ready in {self.load_sec:.2f}s")
+
+    def _decode(self, audios: List[np.ndarray]) -> List[str]:
+        """Tek CTranslate2 çağrısında N pencere (her biri ≤ 30 sn)."""
+        from faster_whisper.audio import pad_or_trim
+
+        model, tok = self._model, self._tokenizer
+        feats = np.stack([pad_or_trim(model.feature_extractor(a)) for a in audios])
+        encoded = model.encode(feats)
+        prompt = list(tok.sot_sequence) + [tok.no_timestamps]
+        results = model.model.generate(
+            encoded, [prompt] * len(audios),
+            beam_size=self.beam_size,
+            max_length=224,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+            return_no_speech_prob=True,
+        )
+        out = []
+        for r in results:
+            if r.no_speech_prob > _NO_SPEECH:
+                out.append("")
+                continue
+            ids = [t for t in r.sequences_ids[0] if t < tok.eot]
+            out.append(tok.decode(ids).strip())
+        return out
 
-async def stream_text() -> AsyncGenerator[TranscriptChunk, None]:
-    cfg = CaptureConfig()
-    cap = AudioCapture(cfg)
+    # ---- Kuyruk ----
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._have = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.to_thread(self._load)
+        except BaseException:
+            self._task.cancel()
+            self._task = None
+            raise
+
+    def submit(self, audio: np.ndarray) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append(_Window(audio[-int(_MAX_SEC * FB_SAMPLE_RATE):], fut))
+        self._have.set()
+        return fut
+
+    async def _run(self) -> None:
+        while True:
+            await self._have.wait()
+            if self._model is None:
+                await asyncio.sleep(0.05)
+                continue
+            # kısa süre bekle: diğer akışların pencereleri de aynı çağrıya girsin
+            if len(self._pending) < self.batch and self.wait_ms > 0:
+                await asyncio.sleep(self.wait_ms / 1000.0)
+            batch = [self._pending.popleft() for _ in range(min(self.batch, len(self._pending)))]
+            if not self._pending:
+                self._have.clear()
+            batch = [w for w in batch if not w.fut.done()]
+            if not batch:
+                continue
+            t = time.perf_counter()
+            try:
+                texts = await asyncio.to_thread(self._decode, [w.audio for w in batch])
+            except Exception as e:
+                print(f"[whisper-fb][ERROR] {e}")
+                texts = [""] * len(batch)
+            self._account(batch, time.perf_counter() - t)
+            for w, text in zip(batch, texts):
+                if not w.fut.done():
+                    w.fut.set_result(text)
+
+    def _account(self, batch: List[_Window], dt: float) -> None:
+        now = time.perf_counter()
+        audio = sum(w.audio.shape[0] for w in batch) / FB_SAMPLE_RATE
+        self.batches += 1
+        self.windows += len(batch)
+        self.audio_sec += audio
+        self.decode_sec += dt
+        share = dt / len(batch)   # toplu çağrının pencere başına payı
+        for w in batch:
+            self._lat.append((now - w.t_submit) * 1000)
+            self._xrt.append(w.audio.shape[0] / FB_SAMPLE_RATE / share if share > 0 else 0.0)
+        if WHISPER_FB_STATS:
+            print(f"[whisper-fb] batch={len(batch)} audio={audio:.2f}s decode={dt * 1000:.0f}ms "
+                  f"per_window={share * 1000:.0f}ms x{audio / dt if dt > 0 else 0:.1f} realtime")
+
+    def backlog(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        def pct(xs, p):
+            xs = sorted(xs)
+            return round(xs[min(len(xs) - 1, int(p * len(xs)))], 1) if xs else 0.0
+        return {
+            "model": self.model_size,
+            "compute_type": self.compute_type,
+            "threads": self.threads,
+            "load_sec": round(self.load_sec, 2),
+            "windows": self.windows,
+            "batches": self.batches,
+            "avg_batch": round(self.windows / self.batches, 2) if self.batches else 0.0,
+            "audio_sec": round(self.audio_sec, 1),
+            "decode_sec": round(self.decode_sec, 2),
+            "x_realtime": round(self.audio_sec / self.decode_sec, 1) if self.decode_sec else 0.0,
+            "window_x_realtime_p50": pct(self._xrt, 0.5),
+            "window_ms_p50": pct(self._lat, 0.5),
+            "window_ms_p95": pct(self._lat, 0.95),
+            "backlog": self.backlog(),
+        }
+
+
+_BATCHER: Optional[FallbackBatcher] = None
+
+
+async def get_batcher() -> FallbackBatcher:
+    """Süreç başına tek toplayıcı; tüm akışlar aynı modeli ve kuyruğu paylaşır."""
+    global _BATCHER
+    if _BATCHER is None:
+        _BATCHER = FallbackBatcher()
+    await _BATCHER.start()
+    return _BATCHER
+
+
+def _as_float(pcm: bytes) -> np.ndarray:
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+async def stream_text(source: Optional[AudioSource] = None) -> AsyncGenerator[TranscriptChunk, None]:
+    batcher = await get_batcher()
+    cap = source or open_source(CaptureConfig(samplerate=FB_SAMPLE_RATE))
     cap.start()
+    rs = PolyphaseResampler(cap.samplerate, FB_SAMPLE_RATE) if cap.samplerate != FB_SAMPLE_RATE else None
 
     buf = bytearray()
-    block_time_sec = max(0.2, cfg.block_ms / 1000.0)
-    window_sec = 1.0
-    blocks_per_window = int(window_sec / block_time_sec)
+    bytes_per_window = int(FB_SAMPLE_RATE * WHISPER_FB_WINDOW_SEC) * 2
+    pending: Deque[asyncio.Future] = deque()   # sonuçlar sırayla yayınlanır
+
+    def ready() -> List[str]:
+        out = []
+        while pending and pending[0].done():
+            text = pending.popleft().result()
+            if text:
+                out.append(text)
+        return out
 
-    i = 0
     try:
         async for chunk in cap.frames():
-            buf.extend(chunk)
-            i += 1
-            if i % blocks_per_window == 0:
-                text = _transcribe_block(bytes(buf), cfg.samplerate)
+            buf.extend(rs.process_pcm16(chunk) if rs else chunk)
+            if len(buf) >= bytes_per_window:
+                pending.append(batcher.submit(_as_float(bytes(buf))))
                 buf.clear()
-                if text:
-                    yield TranscriptChunk(text=text, is_final=True)
+            for text in ready():
+                yield TranscriptChunk(text=text, is_final=True)
+        if len(buf) >= FB_SAMPLE_RATE:   # kalan ≥ 0.5 sn
+            pending.append(batcher.submit(_as_float(bytes(buf))))
+        while pending:
+            await asyncio.wait({pending[0]})
+            for text in ready():
+                yield TranscriptChunk(text=text, is_final=True)
     finally:
         cap.stop()
+        print(f"[whisper-fb] {batcher.stats()}")
@@ -1,103 +1,194 @@
 # src/stt/whisper_local.py
 import os
 import asyncio
+from collections import deque
 import numpy as np
-from typing import AsyncGenerator
-import whisper
-from ..audio.capture import AudioCapture, CaptureConfig
+from typing import AsyncGenerator, Optional
+from ..audio.source import AudioSource, CaptureConfig, open_source
+from ..audio.resample import PolyphaseResampler
 from ..app_types import TranscriptChunk
+from .window import SlidingWindow
+from .whisper_pool import get_pool
 
-# Whisper modelini yükle (bir kez)
+# Whisper modelini yükle (bir kez); RTF denetleyicisi küçük modellere geçebilir
 MODEL = None
+_MODELS: dict = {}
+# Whisper 16 kHz bekler; capture cihazın kendi hızından buraya yeniden örnekler
+WHISPER_SAMPLE_RATE = 16000
+# chunk: sabit WHISPER_CHUNK_DURATION parçaları; window: örtüşen kayan pencere + kesinleştirme
+WHISPER_STREAM_MODE = os.getenv("WHISPER_STREAM_MODE", "chunk").lower()
+WHISPER_STEP_MS = int(os.getenv("WHISPER_STEP_MS", "700"))              # bu kadar yeni seste yeniden çöz
+WHISPER_WINDOW_MAX_SEC = float(os.getenv("WHISPER_WINDOW_MAX_SEC", "15"))  # pencere üst sınırı
 
 
-def load_whisper_model():
+def load_whisper_model(model_size: Optional[str] = None):
     global MODEL
-    if MODEL is None:
-        model_size = os.getenv("WHISPER_MODEL", "base")  # tiny, base, small, medium, large
+    default = os.getenv("WHISPER_MODEL", "base")  # tiny, base, small, medium, large
+    model_size = model_size or default
+    model = _MODELS.get(model_size)
+    if model is None:
+        import whisper  # torch ile birlikte ağır: yalnız işçi süreçte / ilk kullanımda
         print(f"[whisper] Loading model: {model_size}")
-        MODEL = whisper.load_model(model_size)
+        model = _MODELS[model_size] = whisper.load_model(model_size)
         print(f"[whisper] Model loaded successfully")
-    return MODEL
+        if model_size == default:
+            MODEL = model
+    return model
 
 
-def transcribe_audio(audio_bytes: bytes, sr: int) -> str:
-    """Whisper ile ses->metin"""
-    try:
-        model = load_whisper_model()
+def warm_up(model_size: Optional[str] = None) -> None:
+    """İlk gerçek parçada gecikme olmasın: 1 sn sessizliği bir kez çöz."""
+    decode(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32), opts={"model": model_size} if model_size else None)
 
-        # bytes -> numpy array
-        audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
 
-        # Çok kısa ses varsa skip et
-        if len(audio_np) < sr * 0.5:  # 0.5 saniyeden kısa
-            return ""
+def decode(audio_np: np.ndarray, words: bool = False, prompt: str = "", opts: Optional[dict] = None,
+           strict: bool = False):
+    """float32 16 kHz ses → metin; ``words=True`` ise [(başlangıç, bitiş, kelime)].
 
-        # Whisper transkript et
+    ``opts``: RTF denetleyicisinin kademesi (model, beam_size, best_of, temperature).
+    ``strict``: hata boş sonuç yerine yükseltilir (toplu işte tekrar denensin diye).
+    """
+    opts = opts or {}
+    try:
+        model = load_whisper_model(opts.get("model"))
         result = model.transcribe(
             audio_np,
             language="tr",  # Türkçe
             task="transcribe",
             verbose=False,
-            word_timestamps=False,
+            word_timestamps=words,
+            # pencere modunda bağlam initial_prompt ile verilir
+            condition_on_previous_text=not words,
+            initial_prompt=prompt or None,
             fp16=False,  # CPU için
-            temperature=0.0,  # Deterministik
-            beam_size=5,  # Daha iyi kalite
-            best_of=5,
+            temperature=opts.get("temperature", 0.0),  # Deterministik
+            beam_size=opts.get("beam_size", 5),  # Daha iyi kalite
+            best_of=opts.get("best_of", 5),
             no_speech_threshold=0.6,
             logprob_threshold=-1.0
         )
-
-        text = result["text"].strip()
-        if text and text != "[BLANK_AUDIO]":
-            return text
-        return ""
-
     except Exception as e:
+        if strict:
+            raise
         print(f"[whisper][ERROR] {e}")
-        return ""
+        return [] if words else ""
 
+    if words:
+        return [(float(w["start"]), float(w["end"]), w["word"])
+                for seg in result.get("segments", []) for w in seg.get("words") or []]
+    text = result["text"].strip()
+    if text and text != "[BLANK_AUDIO]":
+        return text
+    return ""
 
-async def stream_text() -> AsyncGenerator[TranscriptChunk, None]:
-    """Local Whisper ile streaming transcription"""
-    cfg = CaptureConfig()
-    cap = AudioCapture(cfg)
-    cap._running = True  # Önemli!
+
+def transcribe_audio(audio_bytes: bytes, sr: int) -> str:
+    """Whisper ile ses->metin"""
+    # bytes -> numpy array
+    audio_np = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+
+    # Çok kısa ses varsa skip et
+    if len(audio_np) < sr * 0.5:  # 0.5 saniyeden kısa
+        return ""
+    return decode(audio_np)
+
+
+def transcribe_words(audio_np: np.ndarray, prompt: str = "") -> list:
+    """Pencereyi çöz → [(başlangıç, bitiş, kelime)] (pencereye göre saniye)."""
+    return decode(audio_np, words=True, prompt=prompt)
+
+
+async def _stream_window(cap: AudioSource, rs, pool) -> AsyncGenerator[TranscriptChunk, None]:
+    """Örtüşen pencere: çözüm sürerken ses birikmeye devam eder, bitince yeni geçiş."""
+    win = SlidingWindow(WHISPER_SAMPLE_RATE, WHISPER_STEP_MS, WHISPER_WINDOW_MAX_SEC)
+    job = None
+    base = 0.0
+    print(f"[whisper] Sliding window: step={WHISPER_STEP_MS}ms max={WHISPER_WINDOW_MAX_SEC}s")
+
+    async for audio_chunk in cap.frames():
+        win.add(rs.process_pcm16(audio_chunk) if rs else audio_chunk)
+        if job is not None and job.done():
+            words = job.result()
+            if words is not None:       # None: havuz işi attı
+                for chunk in win.apply(words, base):
+                    yield chunk
+            job = None
+        if job is None and win.ready():
+            audio, base, prompt = win.take()
+            job = pool.submit(audio, kind="words", prompt=prompt, span_sec=win.last_new_sec)
+
+    # kaynak bitti: süren geçişi bekle, kalan metni final yap
+    if job is not None:
+        words = await job
+        for chunk in win.apply(words or [], base):
+            yield chunk
+    tail = win.flush()
+    if tail is not None:
+        yield tail
+
+
+async def stream_text(source: Optional[AudioSource] = None) -> AsyncGenerator[TranscriptChunk, None]:
+    """Local Whisper ile streaming transcription (çözümleme ısınmış işçi süreçlerde)"""
+    # model işçilerde capture açılmadan önce yüklenir ve ısınır
+    pool = await get_pool()
+    cap = source or open_source(CaptureConfig(samplerate=WHISPER_SAMPLE_RATE))
     cap.start()
+    # Dışarıdan verilen kaynak 16 kHz değilse burada çevir
+    rs = PolyphaseResampler(cap.samplerate, WHISPER_SAMPLE_RATE) \
+        if cap.samplerate != WHISPER_SAMPLE_RATE else None
+
+    if WHISPER_STREAM_MODE == "window":
+        try:
+            async for chunk in _stream_window(cap, rs, pool):
+                if chunk.is_final:
+                    print(f"[whisper] Transcript: {chunk.text}")
+                yield chunk
+        except Exception as e:
+            print(f"[whisper][ERROR] {e}")
+        finally:
+            cap.stop()
+        return
 
     buf = bytearray()
     chunk_duration = float(os.getenv("WHISPER_CHUNK_DURATION", "2.0"))  # 2 saniye
-    bytes_per_chunk = int(cfg.samplerate * chunk_duration * 2)  # int16 = 2 bytes
+    bytes_per_chunk = int(WHISPER_SAMPLE_RATE * chunk_duration * 2)  # int16 = 2 bytes
 
     print(f"[whisper] Starting with {chunk_duration}s chunks, {bytes_per_chunk} bytes each")
 
+    pending: deque = deque()   # sıradaki sonuçlar (sıra korunur)
+
+    def ready_results():
+        while pending and pending[0].done():
+            text = pending.popleft().result()
+            if text is None:
+                print(f"[whisper] Chunk dropped (behind, backlog={pool.backlog()})")
+            elif text:
+                print(f"[whisper] Transcript: {text}")
+                yield TranscriptChunk(text=text, is_final=True)
+            else:
+                print("[whisper] No speech detected")
+
     try:
         async for audio_chunk in cap.frames():
-            buf.extend(audio_chunk)
+            buf.extend(rs.process_pcm16(audio_chunk) if rs else audio_chunk)
+            for chunk in ready_results():
+                yield chunk
 
-            # Yeterli veri birikince transkript et
+            # Yeterli veri birikince işçiye gönder; capture beklemeden devam eder
             if len(buf) >= bytes_per_chunk:
                 audio_bytes = bytes(buf)
                 buf.clear()
-
                 print(f"[whisper] Processing {len(audio_bytes)} bytes...")
+                pending.append(pool.submit(audio_bytes, kind="text"))
 
-                # CPU-intensive işlemi executor'da çalıştır
-                loop = asyncio.get_event_loop()
-                text = await loop.run_in_executor(
-                    None,
-                    transcribe_audio,
-                    audio_bytes,
-                    cfg.samplerate
-                )
-
-                if text:
-                    print(f"[whisper] Transcript: {text}")
-                    yield TranscriptChunk(text=text, is_final=True)
-                else:
-                    print("[whisper] No speech detected")
+        # kaynak bitti: bekleyenleri sırayla topla
+        while pending:
+            await asyncio.wait({pending[0]})
+            for chunk in ready_results():
+                yield chunk
 
     except Exception as e:
         print(f"[whisper][ERROR] {e}")
     finally:
-        cap.stop()
\ No newline at end of file
+        cap.stop()
+        print(f"[whisper][pool] {pool.stats()}")
@@ -0,0 +1,390 @@
+# src/stt/whisper_pool.py
+"""Kalıcı, ısınmış whisper işçi süreçleri.
+
+Her işçi modeli başlangıçta yükler ve bir kez ısıtır; ses ona pickle yerine
+işçiye ait paylaşımlı bellek tamponuyla (float32, 16 kHz) gider, boru hattından
+yalnız (iş no, örnek sayısı, tür, istem) geçer. Böylece çözümleme ana sürecin
+GIL'ini tutmaz, capture/UI iş parçacıkları takılmaz.
+
+Bekleyen iş kuyruğu sınırlıdır: ``drop_oldest`` en eski bekleyeni atar,
+``skip`` yeni işi reddeder (geride kalınca atla). Atılan işin sonucu ``None``.
+"""
+import os
+import time
+import atexit
+import asyncio
+import threading
+import multiprocessing as mp
+from collections import deque
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait as _conn_wait
+from typing import Deque, List, Optional
+
+import numpy as np
+
+from .rtf import WHISPER_RTF_CONTROL, RtfController, decode_levels, describe
+
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", "1"))
+WHISPER_QUEUE_MAX = int(os.getenv("WHISPER_QUEUE_MAX", "2"))                     # bekleyen iş üst sınırı
+WHISPER_QUEUE_POLICY = os.getenv("WHISPER_QUEUE_POLICY", "drop_oldest").lower()  # drop_oldest | skip
+WHISPER_SHM_SEC = float(os.getenv("WHISPER_SHM_SEC", "30"))                      # işçi başına en uzun iş
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", "0"))                         # işçi başına torch thread (0 = varsayılan)
+WHISPER_RTF_PRELOAD = os.getenv("WHISPER_RTF_PRELOAD", "0") == "1"               # küçük modelleri de baştan yükle
+_SR = 16000
+
+
+def _worker_main(conn, shm_name: str, max_frames: int, model_size: str, threads: int,
+                 preload: List[str]):
+    """İşçi süreç: modeli yükle + ısıt, sonra paylaşımlı tampondaki işleri çöz."""
+    from . import whisper_local as wl
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    audio = np.ndarray((max_frames,), dtype=np.float32, buffer=shm.buf)
+    try:
+        t0 = time.perf_counter()
+        try:
+            if threads > 0:
+                import torch
+                torch.set_num_threads(threads)
+            os.environ["WHISPER_MODEL"] = model_size
+            wl.load_whisper_model()
+            for size in preload:
+                wl.load_whisper_model(size)
+            t1 = time.perf_counter()
+            wl.warm_up()
+        except Exception as e:
+            conn.send(("error", repr(e)))
+            return
+        conn.send(("ready", t1 - t0, time.perf_counter() - t1))
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            job_id, n, kind, prompt, opts = msg
+            if opts:
+                wl.load_whisper_model(opts.get("model"))   # model değişimi çözme süresine sayılmaz
+            t = time.perf_counter()
+            if kind == "text" and n < _SR * 0.5:
+                res = ""    # 0.5 saniyeden kısa: transcribe_audio gibi atla
+            else:
+                res = wl.decode(audio[:n], words=(kind == "words"), prompt=prompt, opts=opts)
+            conn.send(("done", job_id, res, time.perf_counter() - t))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del audio
+        shm.close()
+
+
+class _Job:
+    __slots__ = ("id", "data", "kind", "prompt", "fut", "span", "opts", "t_submit", "t_start")
+
+    def __init__(self, job_id, data, kind, prompt, fut, span):
+        self.id = job_id
+        self.data = data
+        self.kind = kind
+        self.prompt = prompt
+        self.fut = fut
+        self.span = span              # işin kapsadığı yeni ses (sn)
+        self.opts = None
+        self.t_submit = time.perf_counter()
+        self.t_start = 0.0
+
+
+class _Worker:
+    def __init__(self, idx: int, ctx, max_frames: int, model_size: str, preload: List[str], loop):
+        self.idx = idx
+        self.max_frames = max_frames
+        self.shm = shared_memory.SharedMemory(create=True, size=max_frames * 4)
+        self.audio = np.ndarray((max_frames,), dtype=np.float32, buffer=self.shm.buf)
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(
+            target=_worker_main, name=f"whisper-{idx}", daemon=True,
+            args=(child, self.shm.name, max_frames, model_size, WHISPER_THREADS, preload),
+        )
+        self.proc.start()
+        child.close()
+        self.ready = loop.create_future()
+        self.job: Optional[_Job] = None
+        self.dead = False
+        self.load_sec = 0.0
+        self.warm_sec = 0.0
+
+    def load(self, job: _Job) -> int:
+        """İşin sesini paylaşımlı tampona yaz (uzunsa son ``max_frames``)."""
+        data = job.data
+        if isinstance(data, np.ndarray):
+            src = data[-self.max_frames:]
+            n = src.shape[0]
+            self.audio[:n] = src
+        else:
+            src = np.frombuffer(data, dtype=np.int16)[-self.max_frames:]
+            n = src.shape[0]
+            dst = self.audio[:n]
+            dst[:] = src
+            dst *= 1.0 / 32768.0
+        return n
+
+    def release(self):
+        if self.audio is None:
+            return
+        self.audio = None
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class WhisperPool:
+    """N ısınmış whisper süreci + sınırlı iş kuyruğu; ``submit()`` asyncio Future döner."""
+
+    def __init__(self, workers: int = WHISPER_WORKERS, model_size: Optional[str] = None,
+                 queue_max: int = WHISPER_QUEUE_MAX, policy: str = WHISPER_QUEUE_POLICY,
+                 shm_sec: float = WHISPER_SHM_SEC, rtf_control: bool = WHISPER_RTF_CONTROL):
+        self.n_workers = max(1, workers)
+        self.model_size = model_size or os.getenv("WHISPER_MODEL", "base")
+        self.queue_max = max(0, queue_max)
+        self.policy = policy
+        self.max_frames = int(shm_sec * _SR)
+        self._ctx = mp.get_context("spawn")  # fork + torch iş parçacıkları güvenli değil
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[_Worker] = []
+        self._workers_lock = threading.Lock()   # okuyucu thread listeyi loop'tan bağımsız okur
+        self._queue: Deque[_Job] = deque()
+        self._next_id = 0
+        self._closing = False
+        self._reader: Optional[threading.Thread] = None
+        self.startup_sec = 0.0
+        # geride kalınca çözümleme kademesini düşürür (kapalıysa whisper_local varsayılanları)
+        self.rtf = RtfController(decode_levels(self.model_size)) if rtf_control else None
+        self._preload = [lv["model"] for lv in self.rtf.levels if lv["model"] != self.model_size] \
+            if self.rtf is not None and WHISPER_RTF_PRELOAD else []
+        self._preload = list(dict.fromkeys(self._preload))
+
+        # Metrikler
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.truncated = 0
+        self.crashes = 0
+        self._lat: Deque[tuple] = deque(maxlen=512)   # (bekleme, çözme, toplam) ms
+
+    # ---- Yaşam döngüsü ----
+    async def start(self) -> None:
+        t0 = time.perf_counter()
+        self._loop = asyncio.get_running_loop()
+        workers = [self._spawn(i) for i in range(self.n_workers)]
+        with self._workers_lock:
+            self._workers = workers
+        self._reader = threading.Thread(target=self._read_loop, name="whisper-pool", daemon=True)
+        self._reader.start()
+        try:
+            await asyncio.gather(*(w.ready for w in self._workers))
+        except BaseException:
+            self.close()
+            raise
+        self.startup_sec = time.perf_counter() - t0
+        loads = ", ".join(f"#{w.idx} load={w.load_sec:.2f}s warm={w.warm_sec:.2f}s" for w in self._workers)
+        print(f"[whisper][pool] {self.n_workers} worker(s) ready in {self.startup_sec:.2f}s ({loads})")
+
+    def _spawn(self, idx: int) -> _Worker:
+        return _Worker(idx, self._ctx, self.max_frames, self.model_size, self._preload, self._loop)
+
+    def close(self) -> None:
+        if self._closing:
+            return
+        self._closing = True
+        for w in self._workers:
+            try:
+                w.conn.send(None)
+            except Exception:
+                pass
+        for w in self._workers:
+            w.proc.join(timeout=2.0)
+            if w.proc.is_alive():
+                w.proc.terminate()
+                w.proc.join(timeout=1.0)
+            w.release()
+        for job in self._queue:
+            try:
+                self._resolve(job, None)
+            except RuntimeError:
+                pass   # loop zaten kapalı (atexit)
+        self._queue.clear()
+
+    # ---- İş gönderimi ----
+    def submit(self, audio, kind: str = "text", prompt: str = "",
+               span_sec: Optional[float] = None) -> asyncio.Future:
+        """``audio``: PCM16 bayt ya da float32 dizi (16 kHz). ``kind``: text | words.
+
+        ``span_sec``: işin getirdiği yeni ses (kayan pencerede pencere boyundan kısa);
+        verilmezse sesin tamamı. RTF ve bekleyen ses buna göre hesaplanır.
+        """
+        fut = self._loop.create_future()
+        self._next_id += 1
+        self.submitted += 1
+        if span_sec is None:
+            span_sec = (audio.shape[0] if isinstance(audio, np.ndarray) else len(audio) // 2) / _SR
+        job = _Job(self._next_id, audio, kind, prompt, fut, span_sec)
+        self._queue.append(job)
+        self._dispatch()
+        if len(self._queue) > self.queue_max:
+            if self.policy == "skip":
+                self._queue.pop()
+                self.skipped += 1
+            else:
+                job = self._queue.popleft()
+                self.dropped += 1
+            self._resolve(job, None)
+        return fut
+
+    def _dispatch(self) -> None:
+        for w in self._workers:
+            if not self._queue:
+                return
+            if w.job is not None or w.dead or not w.ready.done() or w.ready.exception():
+                continue
+            job = self._queue.popleft()
+            if job.fut.done():      # çağıran vazgeçti
+                continue
+            n = w.load(job)
+            if n < (len(job.data) if isinstance(job.data, np.ndarray) else len(job.data) // 2):
+                self.truncated += 1
+            job.data = None
+            job.opts = self.rtf.options if self.rtf is not None else None
+            job.t_start = time.perf_counter()
+            w.job = job
+            w.conn.send((job.id, n, job.kind, job.prompt, job.opts))
+
+    @staticmethod
+    def _resolve(job: _Job, result) -> None:
+        if not job.fut.done():
+            job.fut.set_result(result)
+
+    # ---- İşçi mesajları (okuyucu thread → loop) ----
+    def _read_loop(self) -> None:
+        while not self._closing:
+            with self._workers_lock:
+                conns = {w.conn: w for w in self._workers if not w.dead}
+            if not conns:
+                time.sleep(0.1)
+                continue
+            try:
+                ready = _conn_wait(list(conns), timeout=0.5)
+            except OSError:
+                continue
+            for c in ready:
+                w = conns[c]
+                try:
+                    msg = c.recv()
+                except (EOFError, OSError):
+                    w.dead = True
+                    msg = ("exit",)
+                try:
+                    self._loop.call_soon_threadsafe(self._on_message, w, msg)
+                except RuntimeError:
+                    return   # loop kapandı
+
+    def _on_message(self, w: _Worker, msg) -> None:
+        kind = msg[0]
+        if kind == "done":
+            _, job_id, res, decode_sec = msg
+            job, w.job = w.job, None
+            if job is not None and job.id == job_id:
+                now = time.perf_counter()
+                self.completed += 1
+                self._lat.append(((job.t_start - job.t_submit) * 1000, decode_sec * 1000,
+                                  (now - job.t_submit) * 1000))
+                self._resolve(job, res)
+                rtf = self.rtf
+                # kademe değişmeden önce gönderilmiş işlerin ölçümü yeni kademeye sayılmaz
+                if rtf is not None and job.opts is rtf.options and \
+                        rtf.observe(job.span, decode_sec, self.backlog_sec(), self.n_workers):
+                    st = rtf.stats()
+                    print(f"[whisper][rtf] level {st['level']}/{st['levels'] - 1} ({describe(rtf.options)}) "
+                          f"rtf={rtf.rtf:.2f} backlog={st['backlog_sec']}s")
+        elif kind == "ready":
+            w.load_sec, w.warm_sec = msg[1], msg[2]
+            if not w.ready.done():
+                w.ready.set_result(None)
+        elif kind == "error":
+            print(f"[whisper][pool][ERROR] worker #{w.idx} failed to load: {msg[1]}")
+            if not w.ready.done():
+                w.ready.set_exception(RuntimeError(msg[1]))
+        elif kind == "exit" and not self._closing:
+            self._on_exit(w)
+        self._dispatch()
+
+    def _on_exit(self, w: _Worker) -> None:
+        self.crashes += 1
+        w.proc.join(timeout=0.1)
+        print(f"[whisper][pool][ERROR] worker #{w.idx} exited (code={w.proc.exitcode}); respawning")
+        if w.job is not None:
+            self._resolve(w.job, None)
+            w.job = None
+        w.release()
+        if not w.ready.done():
+            w.ready.set_exception(RuntimeError(f"worker #{w.idx} exited while loading"))
+            return
+        if w.ready.exception():
+            return   # yükleme hatası: tekrar deneme döngüsüne girme
+        new = self._spawn(w.idx)
+        with self._workers_lock:
+            self._workers[self._workers.index(w)] = new
+
+    # ---- Durum ----
+    def backlog(self) -> int:
+        return len(self._queue) + sum(1 for w in self._workers if w.job is not None)
+
+    def backlog_sec(self) -> float:
+        """Kuyrukta ve işçilerde bekleyen yeni ses (sn)."""
+        return sum(j.span for j in self._queue) + sum(w.job.span for w in self._workers if w.job is not None)
+
+    def stats(self) -> dict:
+        def pct(i, p):
+            xs = sorted(x[i] for x in self._lat)
+            return round(xs[min(len(xs) - 1, int(p * len(xs)))], 1) if xs else 0.0
+        return {
+            "workers": self.n_workers,
+            "startup_sec": round(self.startup_sec, 2),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+            "truncated": self.truncated,
+            "crashes": self.crashes,
+            "backlog": self.backlog(),
+            "backlog_sec": round(self.backlog_sec(), 2),
+            "rtf": self.rtf.stats() if self.rtf is not None else None,
+            "wait_ms_p50": pct(0, 0.5),
+            "decode_ms_p50": pct(1, 0.5),
+            "total_ms_p50": pct(2, 0.5),
+            "total_ms_p95": pct(2, 0.95),
+        }
+
+
+_POOL: Optional[WhisperPool] = None
+_POOL_STARTING: Optional[asyncio.Future] = None
+
+
+async def get_pool() -> WhisperPool:
+    """Süreç başına tek, ısınmış havuz (ilk çağıran başlatır, diğerleri bekler)."""
+    global _POOL, _POOL_STARTING
+    if _POOL is None:
+        _POOL = WhisperPool()
+        _POOL_STARTING = asyncio.ensure_future(_POOL.start())
+        atexit.register(_POOL.close)
+    pool = _POOL
+    try:
+        await asyncio.shield(_POOL_STARTING)
+    except Exception:
+        if _POOL is pool:
+            _POOL = None   # sonraki çağrı yeniden dener
+        raise
+    return pool
@@ -0,0 +1,149 @@
+# src/stt/window.py
+"""Kayan pencere ile yerel akış transkripsiyonu (modelden bağımsız kısım).
+
+Büyüyen pencere her ``step`` yeni seste baştan çözülür; ardışık iki geçişin
+ortak önekindeki kelimeler kesinleşir (LocalAgreement). Kesinleşen kelimeler
+kısmi, cümle sonuna ulaşınca final olarak yayınlanır ve pencere o kelimenin
+bitişine kırpılır.
+"""
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..app_types import TranscriptChunk
+
+_SENTENCE_END = (".", "?", "!", "…")
+_STRIP = ".,!?;:…\"'«»()"
+
+
+class Word(NamedTuple):
+    start: float   # akış başından mutlak saniye
+    end: float
+    text: str      # modelin verdiği haliyle (baştaki boşluk dahil)
+
+
+def _norm(w: Word) -> str:
+    return w.text.strip().lower().strip(_STRIP)
+
+
+class LocalAgreement:
+    """Ardışık iki hipotezde aynı kalan önek kesinleşir."""
+
+    def __init__(self, overlap_words: int = 5):
+        self.overlap_words = overlap_words
+        self.last_end = 0.0               # son kesinleşen kelimenin bitişi
+        self._tail: List[Word] = []       # son kesinleşenler (örtüşme kontrolü için)
+        self._prev: List[Word] = []       # önceki geçişin kesinleşmemiş kısmı
+
+    def insert(self, words: List[Word]) -> List[Word]:
+        """Yeni geçişin kelimeleri → bu geçişte kesinleşenler."""
+        new = [w for w in words if w.start > self.last_end - 0.1]
+        # pencere kesinleşmiş sesin bir kısmını hâlâ içeriyorsa tekrar eden n-gram'ı at
+        if new and self._tail and abs(new[0].start - self.last_end) < 1.0:
+            for n in range(min(len(self._tail), len(new)), 0, -1):
+                if [_norm(w) for w in self._tail[-n:]] == [_norm(w) for w in new[:n]]:
+                    new = new[n:]
+                    break
+        agreed: List[Word] = []
+        for a, b in zip(self._prev, new):
+            if _norm(a) != _norm(b):
+                break
+            agreed.append(b)
+        self._prev = new[len(agreed):]
+        if agreed:
+            self.last_end = agreed[-1].end
+            self._tail = (self._tail + agreed)[-self.overlap_words:]
+        return agreed
+
+    def pending(self) -> List[Word]:
+        return list(self._prev)
+
+
+def _text(words: List[Word]) -> str:
+    return "".join(w.text for w in words).strip()
+
+
+class SlidingWindow:
+    """16 kHz PCM16 pencere + kesinleştirme durumu; çözümleme çağıranda yapılır.
+
+    Kullanım: ``add()`` ile ses ekle, ``ready()`` olunca ``take()`` ile pencereyi al,
+    modelin (başlangıç, bitiş, kelime) listesini ``apply()``'a ver.
+    """
+
+    def __init__(self, samplerate: int, step_ms: int, max_sec: float,
+                 min_sec: float = 1.0, prompt_chars: int = 200):
+        self.samplerate = samplerate
+        self._step = int(samplerate * step_ms / 1000) * 2
+        self._min = int(samplerate * min_sec) * 2
+        self.max_sec = max_sec
+        self.prompt_chars = prompt_chars
+        self.buf = bytearray()
+        self.offset = 0.0            # buf[0]'ın akış zamanı
+        self._new = 0                # son take()'ten beri eklenen bayt
+        self.last_new_sec = 0.0      # son take()'in getirdiği yeni ses (RTF ölçümü için)
+        self.agree = LocalAgreement()
+        self.sentence: List[Word] = []   # kesinleşmiş, henüz final olmamış
+        self.passes = 0
+
+    @property
+    def seconds(self) -> float:
+        return len(self.buf) / 2 / self.samplerate
+
+    def add(self, pcm) -> None:
+        self.buf += pcm
+        self._new += len(pcm)
+
+    def ready(self) -> bool:
+        return self._new >= self._step and len(self.buf) >= self._min
+
+    def take(self) -> Tuple[np.ndarray, float, str]:
+        """(float32 pencere, pencere başlangıcı, bağlam istemi)."""
+        if self.seconds > self.max_sec and not self.sentence:
+            # uzun süre kesinleşme yok (gürültü/sessizlik): pencereyi yarıya indir
+            self.trim_to(self.offset + self.seconds - self.max_sec / 2)
+        self.last_new_sec = self._new / 2 / self.samplerate
+        self._new = 0
+        self.passes += 1
+        audio = np.frombuffer(bytes(self.buf), dtype=np.int16).astype(np.float32) / 32768.0
+        return audio, self.offset, _text(self.sentence)[-self.prompt_chars:]
+
+    def trim_to(self, t: float) -> None:
+        cut = int((t - self.offset) * self.samplerate) * 2
+        cut = max(0, min(cut, len(self.buf)))
+        del self.buf[:cut]
+        self.offset += cut / 2 / self.samplerate
+
+    def apply(self, words: List[Tuple[float, float, str]], base: float) -> List[TranscriptChunk]:
+        """Bir geçişin sonucunu işle; yayınlanacak kısmi/final parçaları döner."""
+        out: List[TranscriptChunk] = []
+        hyp = [Word(base + s, base + e, t) for s, e, t in words]
+        agreed = self.agree.insert(hyp)
+        if agreed:
+            self.sentence += agreed
+            # son cümle sonuna kadar olan kısım final
+            cut = -1
+            for i, w in enumerate(self.sentence):
+                if w.text.rstrip().endswith(_SENTENCE_END):
+                    cut = i
+            if cut >= 0:
+                done, self.sentence = self.sentence[:cut + 1], self.sentence[cut + 1:]
+                out.append(TranscriptChunk(text=_text(done), is_final=True))
+                self.trim_to(done[-1].end)
+            if self.sentence:
+                out.append(TranscriptChunk(text=_text(self.sentence), is_final=False))
+        if self.seconds > self.max_sec and self.sentence:
+            # cümle sonu gelmedi ama pencere doldu: kesinleşeni final yap
+            out.append(TranscriptChunk(text=_text(self.sentence), is_final=True))
+            self.trim_to(self.sentence[-1].end)
+            self.sentence = []
+        elif not hyp and self.seconds > 2.0:
+            # konuşma yok: yalnız son 1 sn bağlam olarak kalsın
+            self.trim_to(self.offset + self.seconds - 1.0)
+        return out
+
+    def flush(self) -> Optional[TranscriptChunk]:
+        """Akış bitti: kesinleşmemiş kuyruk dahil kalan metni final yap."""
+        words = self.sentence + self.agree.pending()
+        self.sentence = []
+        text = _text(words)
+        return TranscriptChunk(text=text, is_final=True) if text else None
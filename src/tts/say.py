@@ -1,8 +1,27 @@
 import os
+import time
+import queue
+import threading
+from collections import deque
+from typing import Optional
+
+TTS_QUEUE_MAX = int(os.getenv("TTS_QUEUE_MAX", "8"))   # dolunca en eski cümle atılır
+
+_q: Optional["queue.Queue[str]"] = None
+_q_lock = threading.Lock()
+
+# Metrikler
+_spoken = 0
+_dropped = 0
+_speak_ms: deque = deque(maxlen=256)
+
+
+def _enabled() -> bool:
+    return os.getenv("TTS_ENABLED", "false").lower() == "true"
+
 
 def speak(text: str):
-    enabled = os.getenv("TTS_ENABLED", "false").lower() == "true"
-    if not enabled or not text:
+    if not _enabled() or not text:
         return
     try:
         import pyttsx3
@@ -11,3 +30,46 @@ def speak(text: str):
         engine.runAndWait()
     except Exception:
         pass
+
+
+def _speaker_loop():
+    global _spoken
+    while True:
+        text = _q.get()
+        t0 = time.perf_counter()
+        speak(text)
+        _speak_ms.append((time.perf_counter() - t0) * 1000)
+        _spoken += 1
+
+
+def speak_queued(text: str):
+    """Bloklamadan sıraya ekle; cümleler tek arka plan thread'inde sırayla okunur.
+    Kuyruk doluysa (okuma cevaplara yetişemiyor) en eski bekleyen cümle atılır."""
+    global _q, _dropped
+    if not _enabled() or not text:
+        return
+    with _q_lock:
+        if _q is None:
+            _q = queue.Queue(maxsize=max(1, TTS_QUEUE_MAX))
+            threading.Thread(target=_speaker_loop, daemon=True).start()
+        while True:
+            try:
+                _q.put_nowait(text)
+                return
+            except queue.Full:
+                try:
+                    _q.get_nowait()
+                    _dropped += 1
+                except queue.Empty:
+                    pass
+
+
+def stats() -> dict:
+    xs = sorted(_speak_ms)
+    return {
+        "depth": _q.qsize() if _q is not None else 0,
+        "spoken": _spoken,
+        "dropped": _dropped,
+        "speak_ms_p50": round(xs[len(xs) // 2], 1) if xs else 0.0,
+        "speak_ms_p95": round(xs[min(len(xs) - 1, int(0.95 * len(xs)))], 1) if xs else 0.0,
+    }
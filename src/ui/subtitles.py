@@ -112,20 +112,23 @@ def show_subtitle(text: str):
                 _subtitle_var.set("")
         _safe_after(int(SUBTITLE_FADE_SEC * 1000), _clear)
 
-def show_answer(text: str, copy_clipboard: bool = True):
-    """Final sonrası kısa yanıt (sadece soruysa çağrılır)."""
+def show_answer(text: str, copy_clipboard: bool = True, final: bool = True):
+    """Kısa yanıt (sadece soruysa çağrılır). Akışta her parçada ``final=False`` ile
+    çağrılır: etiket güncellenir, pano ve kaybolma yalnız son çağrıda."""
     global _last_answer_text
     if not text:
         return
-    with _lock:
-        _last_answer_text = text
+    if final:
+        with _lock:
+            _last_answer_text = text
 
     if _root is None:
-        print(f"[answer] {text}")
+        if final:
+            print(f"[answer] {text}")
         return
 
     try:
-        if copy_clipboard:
+        if copy_clipboard and final:
             import pyperclip
             pyperclip.copy(text)
     except Exception:
@@ -135,12 +138,25 @@ def show_answer(text: str, copy_clipboard: bool = True):
         if _answer_var is not None:
             _answer_var.set(text)
     _safe_after(0, _upd)
+    if final:
+        _fade_answer(text)
 
+def _fade_answer(text: str):
     def _clear():
-        if _answer_var is not None:
+        # arada yeni bir cevap akmaya başladıysa onu silme
+        if _answer_var is not None and _answer_var.get() == text:
             _answer_var.set("")
     _safe_after(int(ANSWER_FADE_SEC * 1000), _clear)
 
+def abort_answer(text: str):
+    """Yarıda kalan (iptal edilen / kopan) akış: metin kaybolur, pano ve son cevap değişmez."""
+    if not text:
+        return
+    if _root is None:
+        print(f"[answer] (aborted) {text}")
+        return
+    _fade_answer(text)
+
 def get_last_answer() -> str:
     with _lock:
         return _last_answer_text
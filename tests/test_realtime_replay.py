@@ -0,0 +1,87 @@
+# tests/test_realtime_replay.py
+import asyncio
+import json
+
+from src.stt.realtime import _Session
+
+_BPMS = 48   # pcm16 24 kHz: ms başına bayt
+
+
+class _FakeWs:
+    """Verilen event'leri sırayla yollar; ``hang_up`` ise sonra bağlantıyı kapatır."""
+
+    def __init__(self, events, hang_up: bool):
+        self.events = [json.dumps(e) for e in events]
+        self.hang_up = hang_up
+        self.sent = []
+        self._closed = asyncio.Event()
+
+    async def send(self, msg):
+        self.sent.append(msg)
+
+    async def close(self):
+        self._closed.set()
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for raw in self.events:
+            yield raw
+        if not self.hang_up:
+            await self._closed.wait()
+
+
+def _audio(ms: int) -> bytes:
+    # her ms farklı bayt: hangi aralığın kaldığı içerikten okunur
+    return b"".join(bytes([i % 251]) * _BPMS for i in range(ms))
+
+
+def _utterance(end_ms: int) -> list:
+    return [{"type": "input_audio_buffer.speech_started", "audio_start_ms": 0},
+            {"type": "input_audio_buffer.speech_stopped", "audio_end_ms": end_ms},
+            {"type": "input_audio_buffer.committed"},
+            {"type": "response.created"},
+            {"type": "response.text.delta", "delta": "half a transcr"}]
+
+
+_EXPIRED = {"type": "error", "error": {"code": "session_expired",
+                                       "message": "Your session hit the maximum duration of 30 minutes."}}
+
+
+def _run(events, hang_up: bool, audio_ms: int = 1000):
+    async def go():
+        sess = _Session(_FakeWs(events, hang_up), 24000, 2, seq=1)
+        sess.feed(_audio(audio_ms))
+        out: asyncio.Queue = asyncio.Queue()
+        sess.start(out)
+        for _ in range(20):
+            await asyncio.sleep(0)
+        handoff = sess.handoff_audio()
+        unanswered = sess.unanswered
+        await sess.close()
+        return sess, handoff, unanswered
+    return asyncio.run(go())
+
+
+def test_expired_mid_response_hands_off_committed_utterance():
+    sess, handoff, unanswered = _run(_utterance(600) + [_EXPIRED], hang_up=True)
+    assert not sess.usable
+    assert unanswered
+    # transcript gelmeden oturum öldü: konuşma da yeni oturuma gider
+    assert handoff == _audio(1000)
+
+
+def test_answered_utterance_is_not_handed_off():
+    events = _utterance(600) + [{"type": "response.text.done", "text": "done"},
+                                {"type": "response.done"}, _EXPIRED]
+    _, handoff, unanswered = _run(events, hang_up=True)
+    assert not unanswered
+    assert handoff == _audio(1000)[600 * _BPMS:]
+
+
+def test_live_session_hands_off_only_uncommitted_audio():
+    # proaktif devir: yanıt eski oturumdan gelecek, yalnız commit edilmemiş ses taşınır
+    _, handoff, unanswered = _run(_utterance(600), hang_up=False)
+    assert unanswered
+    assert handoff == _audio(1000)[600 * _BPMS:]
@@ -0,0 +1,54 @@
+# tests/test_ring.py
+import numpy as np
+
+from src.audio.ring import PcmRingBuffer
+
+
+def _block(v: int) -> np.ndarray:
+    return np.full((4, 1), v, dtype=np.int16)
+
+
+def _drain(ring: PcmRingBuffer) -> list:
+    got = []
+    while (view := ring.read_nowait()) is not None:
+        got.append(int(np.frombuffer(view, dtype=np.int16)[0]))
+    return got
+
+
+def test_overrun_drops_oldest_pending():
+    ring = PcmRingBuffer(4, 4)
+    for v in range(1, 7):
+        ring.write(_block(v))
+    assert _drain(ring) == [3, 4, 5, 6]
+    assert ring.overruns == 2
+    assert ring.dropped_frames == 8
+
+
+def test_overrun_while_held_keeps_view_and_drops_oldest():
+    ring = PcmRingBuffer(3, 4)
+    ring.write(_block(1))
+    held = ring.read_nowait()
+    for v in (2, 3, 4, 5):
+        ring.write(_block(v))
+    # tutulan görünüm ezilmez; bekleyenlerden en eskiler (2, 3) atılır
+    assert np.frombuffer(held, dtype=np.int16).tolist() == [1, 1, 1, 1]
+    assert ring.overruns == 2
+    assert _drain(ring) == [4, 5]
+
+
+def test_held_slot_is_reused_after_next_read():
+    ring = PcmRingBuffer(3, 4)
+    for v in (1, 2, 3):
+        ring.write(_block(v))
+    assert _drain(ring) == [1, 2, 3]
+    for v in (4, 5):
+        ring.write(_block(v))
+    assert ring.overruns == 0
+    assert _drain(ring) == [4, 5]
+
+
+def test_downmix_multichannel():
+    ring = PcmRingBuffer(3, 4, channels=2)
+    block = np.array([[100, 300]] * 4, dtype=np.int16)
+    ring.write(block)
+    assert np.frombuffer(ring.read_nowait(), dtype=np.int16).tolist() == [200] * 4